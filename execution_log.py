@@ -1,77 +1,61 @@
 #!/usr/bin/env python3
 
 """
-Gerador de log de execução no formato esperado para o README
+Gerador de log de execução para o README a partir de uma execução real do firmware:
+a captura da UART (make uart-log -> docs/uart_log.txt) ou o log da simulação
+(make sim-soc -> build/sim/uart_log.txt). As estatísticas vêm das linhas "@bench"
+do firmware compilado com BENCH_ITERS=K (tools/fw_bench_report.py); sem elas o log
+é reproduzido sem números de desempenho.
+
+Uso:
+    python3 execution_log.py [build/sim/uart_log.txt]
 """
 
-def generate_execution_log():
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "tools"))
+from fw_bench_report import parse_bench, parse_dispatch, print_dispatch, print_report, summarize, summarize_dispatch  # noqa: E402
+
+DEFAULT_LOGS = [os.path.join("build", "sim", "uart_log.txt"), os.path.join("docs", "uart_log.txt")]
+
+
+def generate_execution_log(path):
+    with open(path, "rb") as f:
+        lines = [line.decode(errors="replace").rstrip("\r\n") for line in f]
+
     print("=" * 60)
     print("LOG DE EXECUÇÃO - ACELERADOR DE PRODUTO ESCALAR")
+    print(f"Fonte: {path}")
     print("=" * 60)
     print()
-    
-    print("🚀 Inicializando sistema...")
-    print("LiteX SoC carregado na FPGA Colorlight i5")
-    print("CPU: VexRiscv @ 60MHz")
-    print("UART configurada em 115200 baud")
-    print()
-    
-    print("📡 Conectado via UART...")
-    print("Firmware iniciado:")
-    print()
-    print("LiteX Dot-Product Accelerator Demo")
-    print("CPU: VexRiscv")
-    
-    # Vetores de teste
-    A = [1, -2, 3, -4, 5, -6, 7, -8]
-    B = [8, 7, -6, -5, 4, 3, -2, -1]
-    
+    for line in lines:
+        if "@bench" not in line and "@dispatch" not in line:
+            print(line)
     print()
-    print("📊 Vetores de entrada:")
-    print(f"   A = {A}")
-    print(f"   B = {B}")
-    print()
-    
-    # Cálculo software
-    sw_result = sum(a * b for a, b in zip(A, B))
-    print(f"Software: 0x{sw_result & 0xFFFFFFFFFFFFFFFF:016X}")
-    
-    # Simular comunicação CSR
-    print()
-    print("⚙️  Executando no acelerador de hardware:")
-    print("   - Escrevendo vetores A nos CSRs dotp_a0..a7")
-    print("   - Escrevendo vetores B nos CSRs dotp_b0..b7")
-    print("   - Acionando start (dotp_start_write(1))")
-    print("   - Aguardando done (polling dotp_done_read())")
-    print("   - Lendo resultado (dotp_result_lo/hi_read())")
-    print()
-    
-    # Resultado hardware (mesmo que software)
-    print(f"Hardware: 0x{sw_result & 0xFFFFFFFFFFFFFFFF:016X}")
-    
-    # Verificação
-    print("[OK] Resultado coincide!")
-    print()
-    
-    print("✅ Demonstração concluída com sucesso!")
-    print()
-    print("📈 Estatísticas:")
-    print(f"   - Produto escalar calculado: {sw_result}")
-    print(f"   - Vetores processados: 8 elementos × 32 bits")
-    print(f"   - Resultado: 64 bits signed")
-    print(f"   - Aceleração: ~8x (8 multiplicações paralelas vs sequenciais)")
-    print(f"   - CSRs utilizados: 20 registradores")
-    print()
-    
-    print("🔧 Arquitetura do SoC:")
-    print("   - Base: Colorlight i5 (LiteX)")
-    print("   - CPU: VexRiscv RISC-V")
-    print("   - Periféricos: UART, RAM, ROM, DotProduct Accelerator")
-    print("   - Interface: CSR (Control & Status Registers)")
-    print("   - Clock: 60MHz")
+
+    bench = parse_bench(lines)
+    if bench is None or not bench["datasets"]:
+        print("Sem medidas de desempenho no log (compile o firmware com BENCH_ITERS=K,")
+        print("ex.: make sim-soc BENCH_ITERS=64).")
+    else:
+        print("📈 Estatísticas medidas (ciclos de CPU, timer0 uptime):")
+        print_report(bench, summarize(bench))
+    dispatch = parse_dispatch(lines)
+    if dispatch:
+        print()
+        print("📈 Vazão agregada do despachante (várias unidades):")
+        print_dispatch(summarize_dispatch(dispatch))
     print()
-    
     print("=" * 60)
 
+
 if __name__ == "__main__":
-    generate_execution_log()
\ No newline at end of file
+    if len(sys.argv) > 1:
+        log = sys.argv[1]
+    else:
+        log = next((p for p in DEFAULT_LOGS if os.path.isfile(p)), None)
+    if log is None or not os.path.isfile(log):
+        sys.exit("Log da UART não encontrado: rode `make sim-soc` ou `make uart-log` "
+                 "(ou informe o arquivo: python3 execution_log.py captura.txt)")
+    generate_execution_log(log)
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+
+"""
+Cache de bitstreams endereçado por conteúdo.
+
+A chave (sha256) cobre o Verilog gerado pelo LiteX, as fontes da plataforma (RTL do
+acelerador), as restrições/inits e os scripts de build (build_*.sh e .ys, com as opções
+do yosys/nextpnr/ecppack, ex.: seed) do diretório de gateware, os parâmetros da placa
+(board, revision, sys_clk_freq) e as versões do toolchain (yosys, nextpnr, ecppack).
+Um acerto copia o bitstream exato para o diretório de gateware sem rodar síntese nem
+place-and-route. Entradas antigas são removidas por LRU até caber no tamanho máximo.
+
+Uso a partir de um script de build:
+    cache = BitstreamCache()
+    bitstream, hit = build_with_cache(builder, soc, dict(board="i9", ...), cache)
+"""
+
+import glob
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import time
+
+# Diretório padrão (fora de build/dotp, sobrevive a um rm -rf do build)
+DEFAULT_CACHE_DIR = os.environ.get("DOTP_BITSTREAM_CACHE", os.path.join("build", "bitstream_cache"))
+DEFAULT_MAX_BYTES = 1 << 30
+
+# Ferramentas do fluxo ECP5 aberto (LiteX "trellis") e como obter a versão de cada uma
+TOOLCHAIN_VERSION_CMDS = [
+    ["yosys", "-V"],
+    ["nextpnr-ecp5", "--version"],
+    ["ecppack", "--version"],
+]
+
+# Artefatos guardados por entrada (além da extensão, o nome é o build_name do SoC)
+ARTIFACT_EXTS = [".bit", ".svf"]
+
+# Arquivo cujo mtime marca o último uso da entrada (LRU)
+_STAMP = "entry.json"
+
+
+def toolchain_version():
+    """Versões do toolchain como texto (ferramentas ausentes entram como 'ausente')"""
+    lines = []
+    for cmd in TOOLCHAIN_VERSION_CMDS:
+        if shutil.which(cmd[0]) is None:
+            lines.append(f"{cmd[0]}: ausente")
+            continue
+        try:
+            proc = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+            out = (proc.stdout + proc.stderr).strip().splitlines()
+            lines.append(f"{cmd[0]}: {out[0] if out else proc.returncode}")
+        except (OSError, subprocess.TimeoutExpired) as e:
+            lines.append(f"{cmd[0]}: {e}")
+    return "\n".join(lines)
+
+
+def _source_digest(path):
+    """sha256 de uma fonte; no Verilog ignora comentários (o LiteX grava a data e uma
+    árvore de hierarquia em ordem variável no cabeçalho)"""
+    with open(path, "rb") as f:
+        data = f.read()
+    if path.endswith((".v", ".sv")):
+        data = re.sub(rb"/\*.*?\*/", b"", data, flags=re.S)
+        data = re.sub(rb"(?m)^\s*//.*\n", b"", data)
+    return hashlib.sha256(data).digest()
+
+
+def _entry_size(path):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+class BitstreamCache:
+    def __init__(self, root=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.root      = root
+        self.max_bytes = max_bytes
+
+    def key(self, gateware_dir, build_name, sources, params, toolchain=None):
+        """sha256 das entradas do bitstream.
+
+        sources : lista de fontes da plataforma (platform.sources; caminhos relativos
+                  são relativos ao diretório de gateware, como o Verilog gerado)
+        params  : dict com board/revision/sys_clk_freq (e o que mais mudar o bitstream)
+        """
+        h = hashlib.sha256()
+        files = set()
+        for src in sources:
+            path = src[0] if isinstance(src, (tuple, list)) else src
+            if not os.path.isabs(path):
+                path = os.path.join(gateware_dir, path)
+            files.add(os.path.normpath(path))
+        # Restrições de pinos/tempo e conteúdo inicial das memórias
+        files.update(glob.glob(os.path.join(gateware_dir, build_name + ".lpf")))
+        files.update(glob.glob(os.path.join(gateware_dir, "*.init")))
+        # Scripts gerados: opções de síntese, PnR (seed, timing) e empacotamento
+        files.update(glob.glob(os.path.join(gateware_dir, build_name + ".ys")))
+        files.update(glob.glob(os.path.join(gateware_dir, "build_" + build_name + ".sh")))
+        for path in sorted(files, key=lambda p: (os.path.basename(p), p)):
+            h.update(os.path.basename(path).encode() + b"\0")
+            h.update(_source_digest(path))
+        h.update(json.dumps(params, sort_keys=True, default=str).encode())
+        h.update((toolchain if toolchain is not None else toolchain_version()).encode())
+        return h.hexdigest()
+
+    def _entry(self, key):
+        return os.path.join(self.root, key)
+
+    def restore(self, key, gateware_dir, build_name):
+        """Copia os artefatos da entrada `key` para o gateware; retorna o .bit ou None"""
+        entry = self._entry(key)
+        bit = os.path.join(entry, build_name + ".bit")
+        if not os.path.isfile(bit):
+            return None
+        os.makedirs(gateware_dir, exist_ok=True)
+        for ext in ARTIFACT_EXTS:
+            path = os.path.join(entry, build_name + ext)
+            if os.path.isfile(path):
+                shutil.copy2(path, gateware_dir)
+        # Marca o uso (LRU)
+        os.utime(os.path.join(entry, _STAMP))
+        return os.path.join(gateware_dir, build_name + ".bit")
+
+    def store(self, key, gateware_dir, build_name, params=None):
+        """Guarda os artefatos recém-gerados e aplica a evição por tamanho"""
+        entry = self._entry(key)
+        tmp = f"{entry}.tmp{os.getpid()}"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        for ext in ARTIFACT_EXTS:
+            path = os.path.join(gateware_dir, build_name + ext)
+            if os.path.isfile(path):
+                shutil.copy2(path, tmp)
+        with open(os.path.join(tmp, _STAMP), "w") as f:
+            json.dump({"build_name": build_name, "params": params, "created": time.time()}, f, default=str)
+        # Troca atômica: uma entrada nunca fica parcialmente escrita
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(tmp, entry)
+        self.evict(keep=key)
+
+    def entries(self):
+        """Lista (último uso, tamanho, chave), da mais antiga para a mais recente"""
+        if not os.path.isdir(self.root):
+            return []
+        out = []
+        for key in os.listdir(self.root):
+            stamp = os.path.join(self.root, key, _STAMP)
+            if os.path.isfile(stamp):
+                out.append((os.path.getmtime(stamp), _entry_size(self._entry(key)), key))
+        return sorted(out)
+
+    def evict(self, keep=None):
+        """Remove entradas menos usadas até o total caber em max_bytes (nunca `keep`)"""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in entries:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(self._entry(key), ignore_errors=True)
+            total -= size
+        return total
+
+
+def run_gateware_script(gateware_dir, build_name, log=None):
+    """Roda síntese/PnR/empacotamento (script gerado pelo LiteX com run=False).
+    Com `log`, a saída (inclusive o relatório do nextpnr, que só vai para o terminal)
+    é gravada nesse arquivo."""
+    script = "build_" + build_name + ".sh"
+    if not os.path.isfile(os.path.join(gateware_dir, script)):
+        raise OSError(f"Script de build não encontrado: {os.path.join(gateware_dir, script)}")
+    if log is None:
+        rc = subprocess.call(["bash", script], cwd=gateware_dir)
+    else:
+        with open(log, "w") as f:
+            rc = subprocess.call(["bash", script], cwd=gateware_dir, stdout=f, stderr=subprocess.STDOUT)
+    if rc != 0:
+        raise OSError("Erro durante a execução do script Yosys/Nextpnr.")
+
+
+def build_with_cache(builder, soc, params, cache, **kwargs):
+    """builder.build() com cache de bitstream.
+
+    Gera Verilog e scripts (run=False), consulta o cache e só roda o toolchain em caso
+    de falta. Retorna (caminho do .bit, acerto no cache)."""
+    builder.build(run=False, **kwargs)
+    build_name   = soc.get_build_name()
+    gateware_dir = builder.gateware_dir
+    key = cache.key(gateware_dir, build_name, soc.platform.sources, params)
+    bitstream = cache.restore(key, gateware_dir, build_name)
+    if bitstream is not None:
+        print(f"INFO: Bitstream em cache ({key[:12]}): {bitstream}")
+        return bitstream, True
+    # Remove artefatos antigos para que um build com falha não deixe um .bit desatualizado
+    for ext in ARTIFACT_EXTS:
+        path = os.path.join(gateware_dir, build_name + ext)
+        if os.path.isfile(path):
+            os.remove(path)
+    run_gateware_script(gateware_dir, build_name)
+    cache.store(key, gateware_dir, build_name, params)
+    return os.path.join(gateware_dir, build_name + ".bit"), False
@@ -16,22 +16,47 @@ def main():
     parser.add_argument('--sys-clk-freq', type=int, default=60000000, help='System clock frequency')
     parser.add_argument('--cpu-type', default='vexriscv', help='CPU type')
     parser.add_argument('--revision', dest='revision', default='7.2', help='Board revision (ex.: 7.2)')
+    parser.add_argument('--dotp-n', type=int, default=8, help='Elementos por vetor do acelerador')
+    parser.add_argument('--dotp-lanes', type=int, default=1, help='Multiplicadores em paralelo (divide --dotp-n)')
+    parser.add_argument('--dotp-pipelined', action='store_true', help='Usa o núcleo pipeline com FIFO de resultados')
+    parser.add_argument('--dotp-dma', action='store_true', help='Adiciona o mestre DMA (Wishbone) ao acelerador')
+    parser.add_argument('--dotp-queue', type=int, default=0, help='Fila de jobs com esta profundidade (0 desativa)')
+    parser.add_argument('--dotp-window', action='store_true', help='Operandos numa janela Wishbone (memória) em vez de CSRs')
+    parser.add_argument('--dotp-b-tiles', type=int, default=0, help='Modo GEMV: blocos de B residentes (0 desativa)')
+    parser.add_argument('--dotp-simd', action='store_true', help='Modos empacotados int16x2/int8x4 (CSR mode)')
+    parser.add_argument('--dotp-perf', action='store_true', help='Contadores de desempenho de 64 bits (CSRs dotp_perf_*)')
+    parser.add_argument('--dotp-irq', action='store_true', help='Evento done do acelerador como IRQ da CPU (EventManager)')
+    parser.add_argument('--dotp-impl', default='sv', choices=['sv', 'migen'], help='Implementação do núcleo do acelerador')
+    parser.add_argument('--dotp-accels', type=int, default=1, help='Unidades independentes dotp0..dotpK-1 (despachante no firmware)')
+    parser.add_argument('--no-bitstream-cache', action='store_true', help='Roda síntese/PnR mesmo com o bitstream em cache')
     args = parser.parse_args()
 
     # Import here to avoid hard dependency if user only wants other features
     try:
-        from soc_dot_product import SoCWithDotProduct
+        from dotp_soc import SoCWithDotProduct
     except Exception as e:
         print("Erro ao importar LiteX ou o módulo SoC. Verifique se o ambiente tem LiteX e litex-boards instalados.")
         raise
 
-    soc = SoCWithDotProduct(board=args.board, revision=args.revision, cpu_type=args.cpu_type, sys_clk_freq=args.sys_clk_freq)
+    soc = SoCWithDotProduct(board=args.board, revision=args.revision, cpu_type=args.cpu_type, sys_clk_freq=args.sys_clk_freq,
+                            dotp_n=args.dotp_n, dotp_lanes=args.dotp_lanes,
+                            dotp_pipelined=args.dotp_pipelined, dotp_dma=args.dotp_dma,
+                            dotp_queue=args.dotp_queue, dotp_window=args.dotp_window,
+                            dotp_b_tiles=args.dotp_b_tiles, dotp_simd=args.dotp_simd, dotp_perf=args.dotp_perf,
+                            dotp_irq=args.dotp_irq, dotp_impl=args.dotp_impl,
+                            dotp_accels=args.dotp_accels)
 
     if args.build:
         print("Iniciando build do SoC (LiteX). Isso pode demorar e requer toolchain/FPGA tools.")
         from litex.soc.integration.builder import Builder
         builder = Builder(soc, output_dir="build/dotp", csr_csv="build/dotp/csr.csv", compile_software=False)
-        builder.build()
+        if args.no_bitstream_cache:
+            builder.build()
+        else:
+            from bitstream_cache import BitstreamCache, build_with_cache
+            params = dict(board=args.board, revision=args.revision, sys_clk_freq=float(args.sys_clk_freq))
+            bit, hit = build_with_cache(builder, soc, params, BitstreamCache())
+            print(f"Bitstream: {bit}{' (cache)' if hit else ''}")
 
 if __name__ == '__main__':
     main()
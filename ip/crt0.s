@@ -4,8 +4,61 @@ _start:
     # Configura SP para topo da SRAM (definido no linker)
     la sp, _stack_top
 
+    # Zera a .bss (palavras de _bss_start a _bss_end, ver linker.ld): o firmware
+    # conta com estáticos não inicializados em zero (ex.: offload_head/offload_tail)
+    la t0, _bss_start
+    la t1, _bss_end
+2:
+    bgeu t0, t1, 3f
+    sw zero, 0(t0)
+    addi t0, t0, 4
+    j 2b
+3:
+
     # Chama main()
     call main
 
 1:
     j 1b
+
+    # Vetor de traps, instalado pelo firmware só com a IRQ do acelerador (--dotp-irq):
+    # salva os registradores caller-saved, chama isr() e retorna com mret
+    .align 2
+    .globl trap_entry
+trap_entry:
+    addi sp, sp, -16*4
+    sw ra,   0*4(sp)
+    sw t0,   1*4(sp)
+    sw t1,   2*4(sp)
+    sw t2,   3*4(sp)
+    sw a0,   4*4(sp)
+    sw a1,   5*4(sp)
+    sw a2,   6*4(sp)
+    sw a3,   7*4(sp)
+    sw a4,   8*4(sp)
+    sw a5,   9*4(sp)
+    sw a6,  10*4(sp)
+    sw a7,  11*4(sp)
+    sw t3,  12*4(sp)
+    sw t4,  13*4(sp)
+    sw t5,  14*4(sp)
+    sw t6,  15*4(sp)
+    call isr
+    lw ra,   0*4(sp)
+    lw t0,   1*4(sp)
+    lw t1,   2*4(sp)
+    lw t2,   3*4(sp)
+    lw a0,   4*4(sp)
+    lw a1,   5*4(sp)
+    lw a2,   6*4(sp)
+    lw a3,   7*4(sp)
+    lw a4,   8*4(sp)
+    lw a5,   9*4(sp)
+    lw a6,  10*4(sp)
+    lw a7,  11*4(sp)
+    lw t3,  12*4(sp)
+    lw t4,  13*4(sp)
+    lw t5,  14*4(sp)
+    lw t6,  15*4(sp)
+    addi sp, sp, 16*4
+    mret
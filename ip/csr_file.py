@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+
+"""
+Banco de registradores CSR endereçado por byte para os modelos em Python.
+
+Os registradores ficam num único `bytearray`, vistos como palavras de 32 bits por
+`memoryview` (sem sinal em `words`, com sinal em `swords`), no mesmo endereço do
+barramento do SoC. O mapa vem do csr.csv gerado pelo LiteX (`--headers-only`) ou de
+um layout montado em Python com a mesma convenção: periféricos a cada 0x800 bytes,
+registradores em sequência na ordem de declaração e registradores de mais de 32 bits
+em várias palavras, a mais significativa primeiro.
+
+Dois lados de acesso:
+  - barramento (firmware): read/write/read_bulk/write_bulk por endereço; escritas
+    em registradores "ro" são ignoradas e os callbacks on_write/on_read rodam
+  - hardware (modelo): csrs[nome] lê/grava o valor inteiro do registrador, sem
+    callbacks; no laço quente, o modelo indexa `words`/`swords` por index(nome)
+
+Uso:
+    csrs = CSRFile.from_csv("build/dotp/csr.csv")
+    csrs.write(csrs.address("dotp_a0"), 5)
+    csrs.on_write("dotp_start", lambda value: ...)
+"""
+
+import array
+import csv
+from collections import namedtuple
+
+# Espaço de cada periférico no barramento CSR (csr_paging do LiteX)
+CSR_PAGING = 0x800
+CSR_BASE   = 0xF0000000
+
+CSRRegister = namedtuple("CSRRegister", "name address words mode index")
+
+
+class CSRFile:
+    """Registradores CSR num bytearray endereçado por byte.
+
+    registers : iterável de (nome, endereço, palavras de 32 bits, "rw"/"ro")
+    constants : dicionário opcional de constantes do SoC (seção "constant" do csr.csv)
+    """
+    def __init__(self, registers, constants=None):
+        registers = sorted(registers, key=lambda reg: reg[1])
+        if not registers:
+            raise ValueError("mapa de CSRs vazio")
+        self.base = registers[0][1] & ~3
+        end = max(address + 4 * words for _, address, words, _ in registers)
+        self.end    = end
+        self.mem    = bytearray(end - self.base)
+        self.words  = memoryview(self.mem).cast("I")
+        self.swords = memoryview(self.mem).cast("i")
+        self.count  = len(self.words)
+        self.constants = dict(constants or {})
+        self.regs = {}
+        # Palavras de registradores "ro": escrita pelo barramento ignorada
+        self._ro = bytearray(len(self.words))
+        self._on_write = {}
+        self._on_read  = {}
+        self._write_order = []
+        for name, address, words, mode in registers:
+            if address & 3:
+                raise ValueError(f"{name}: endereço 0x{address:08X} não alinhado a 32 bits")
+            index = (address - self.base) >> 2
+            if name in self.regs:
+                raise ValueError(f"registrador duplicado: {name}")
+            self.regs[name] = CSRRegister(name, address, words, mode, index)
+            if mode == "ro":
+                self._ro[index:index + words] = b"\1" * words
+
+    @classmethod
+    def from_csv(cls, path):
+        """Mapa do csr.csv do LiteX (linhas csr_register e constant)"""
+        registers, constants = [], {}
+        with open(path, newline="") as f:
+            for row in csv.reader(f):
+                if not row or row[0].startswith("#"):
+                    continue
+                if row[0] == "csr_register":
+                    registers.append((row[1], int(row[2], 0), int(row[3]), row[4]))
+                elif row[0] == "constant":
+                    constants[row[1]] = _constant(row[2])
+        return cls(registers, constants)
+
+    @classmethod
+    def from_layout(cls, peripherals, base=CSR_BASE, paging=CSR_PAGING, constants=None):
+        """Mapa montado em Python: peripherals = [(prefixo, [(registrador, palavras,
+        modo)])], o k-ésimo periférico em base + k * paging, como no LiteX"""
+        registers = []
+        for k, (prefix, regs) in enumerate(peripherals):
+            address = base + k * paging
+            for name, words, mode in regs:
+                registers.append((f"{prefix}_{name}", address, words, mode))
+                address += 4 * words
+            if address > base + (k + 1) * paging:
+                raise ValueError(f"{prefix}: registradores excedem {paging} bytes")
+        return cls(registers, constants)
+
+    # -- mapa ---------------------------------------------------------------------
+
+    def __contains__(self, name):
+        return name in self.regs
+
+    def address(self, name):
+        return self.regs[name].address
+
+    def index(self, name):
+        """Índice da (primeira) palavra do registrador em words/swords"""
+        return self.regs[name].index
+
+    def on_write(self, name, fn):
+        """fn(valor) após cada escrita pelo barramento na (primeira) palavra do registrador"""
+        self._on_write[self.index(name)] = fn
+        self._write_order = sorted(self._on_write)
+
+    def on_read(self, name, fn):
+        """fn() após cada leitura pelo barramento (efeitos da leitura, como retirar da FIFO)"""
+        self._on_read[self.index(name)] = fn
+
+    # -- lado do hardware -----------------------------------------------------------
+
+    def __getitem__(self, name):
+        reg = self.regs[name]
+        value = 0
+        for word in self.words[reg.index:reg.index + reg.words]:
+            value = (value << 32) | word
+        return value
+
+    def __setitem__(self, name, value):
+        reg = self.regs[name]
+        for k in range(reg.words):
+            self.words[reg.index + reg.words - 1 - k] = (value >> (32 * k)) & 0xFFFFFFFF
+
+    def reset(self):
+        self.mem[:] = bytes(len(self.mem))
+
+    # -- lado do barramento ---------------------------------------------------------
+
+    def _word(self, address):
+        if address & 3 or not self.base <= address < self.end:
+            raise ValueError(f"endereço CSR inválido: 0x{address:08X}")
+        return (address - self.base) >> 2
+
+    def read(self, address):
+        i = (address - self.base) >> 2
+        if address & 3 or not 0 <= i < self.count:
+            i = self._word(address)
+        value = self.words[i]
+        fn = self._on_read.get(i)
+        if fn is not None:
+            fn()
+        return value
+
+    def write(self, address, value):
+        i = (address - self.base) >> 2
+        if address & 3 or not 0 <= i < self.count:
+            i = self._word(address)
+        if self._ro[i]:
+            return
+        value &= 0xFFFFFFFF
+        self.words[i] = value
+        fn = self._on_write.get(i)
+        if fn is not None:
+            fn(value)
+
+    def read_bulk(self, address, count):
+        """`count` palavras consecutivas a partir de `address`"""
+        i = self._word(address)
+        values = self.words[i:i + count].tolist()
+        for k, fn in self._on_read.items():
+            if i <= k < i + count:
+                fn()
+        return values
+
+    def write_bulk(self, address, values):
+        """Escreve palavras consecutivas a partir de `address` (uma cópia só quando
+        nenhuma é "ro"); os callbacks rodam na ordem dos endereços"""
+        i = self._word(address)
+        count = len(values)
+        if i + count > len(self.words):
+            raise ValueError(f"escrita de {count} palavras passa do fim do mapa em 0x{address:08X}")
+        if self._ro.find(1, i, i + count) >= 0:
+            for k, value in enumerate(values):
+                self.write(address + 4 * k, value)
+            return
+        try:
+            # Valores int32 com sinal (o caso do firmware) sem máscara por elemento
+            self.swords[i:i + count] = array.array("i", values)
+        except OverflowError:
+            self.words[i:i + count] = array.array("I", [v & 0xFFFFFFFF for v in values])
+        for k in self._write_order:
+            if i <= k < i + count:
+                self._on_write[k](self.words[k])
+
+
+def _constant(text):
+    if text == "None":
+        return None
+    try:
+        return int(text, 0)
+    except ValueError:
+        return text
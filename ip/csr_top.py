@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+
+"""
+Verilog do wrapper DotProductAccel com o banco de CSRs do LiteX, tendo o barramento
+CSR como portas de topo, para bancadas externas (tb/cocotb).
+
+O módulo `dotp_csr_top` tem as portas sys_clk/sys_rst e csr_adr/csr_we/csr_dat_w/
+csr_dat_r (mais csr_re, se a versão do LiteX o tiver), com o periférico na página 0:
+os CSRs ficam nos mesmos offsets que no SoC. Junto do Verilog sai um csr.csv no
+formato do LiteX (endereços em bytes a partir de 0, lido por csr_file.CSRFile) e a
+lista de fontes RTL instanciadas pelo wrapper.
+
+Uso:
+    python ip/csr_top.py --n 8 --lanes 1 --output-dir build/cocotb
+    python ip/csr_top.py --pipelined --impl migen --output-dir build/cocotb
+    python ip/csr_top.py --pipelined --queue-depth 4 --output-dir build/cocotb
+"""
+
+import argparse
+import os
+
+from migen import *
+from migen.fhdl.verilog import convert
+from litex.soc.integration.export import get_csr_csv
+from litex.soc.integration.soc import SoCCSRRegion
+from litex.soc.interconnect import csr_bus
+
+from dot_product_wrapper import DotProductAccel
+
+TOP_NAME = "dotp_csr_top"
+
+# Sinais do barramento CSR exportados como portas (re só nas versões recentes do LiteX)
+BUS_SIGNALS = ("adr", "re", "we", "dat_w", "dat_r")
+
+
+class SourceList:
+    """Plataforma mínima: só registra os fontes que o wrapper adiciona (impl="sv")"""
+    def __init__(self):
+        self.sources = []
+
+    def add_source(self, filename, language=None, library=None):
+        if filename not in self.sources:
+            self.sources.append(filename)
+
+
+class CSRTop(Module):
+    def __init__(self, platform=None, **kwargs):
+        # Contadores de desempenho: a bancada lê ops e latency_last por eles
+        self.submodules.dotp = DotProductAccel(platform, 50e6, with_perf=True, **kwargs)
+        # Banco de CSRs do acelerador na página 0 (barramento de 32 bits, como no SoC)
+        self.submodules.csrbank = csr_bus.CSRBankArray(self,
+            lambda name, memory: 0 if name == "dotp" else None, data_width=32, address_width=14)
+        self.bus = csr_bus.Interface(data_width=32, address_width=14)
+        self.submodules.csrcon = csr_bus.Interconnect(self.bus, self.csrbank.get_buses())
+
+        self.ports = set()
+        for name in BUS_SIGNALS:
+            signal = getattr(self.bus, name, None)
+            if signal is not None:
+                signal.name_override = f"csr_{name}"
+                self.ports.add(signal)
+
+    def get_csr_csv(self, constants={}):
+        """csr.csv pelo exportador do LiteX (base 0, endereços em bytes): ro/rw sai como
+        no SoC, ex.: ev_pending é CSRStatus mas aceita escrita (limpa o evento)"""
+        region = SoCCSRRegion(origin=0, busword=32, obj=self.csrbank.banks[0][1])
+        return get_csr_csv({"dotp": region}, constants)
+
+
+def export(output_dir, n=8, lanes=1, pipelined=False, impl="sv", queue_depth=0, **kwargs):
+    """Gera <output_dir>/dotp_csr_top.v, csr.csv e sources.txt; retorna os caminhos.
+    kwargs extras vão para o DotProductAccel (ex.: with_irq=True)"""
+    os.makedirs(output_dir, exist_ok=True)
+    platform = SourceList()
+    top = CSRTop(platform if impl == "sv" else None, n=n, lanes=lanes, pipelined=pipelined, impl=impl,
+        queue_depth=queue_depth, **kwargs)
+    verilog = os.path.join(output_dir, f"{TOP_NAME}.v")
+    convert(top, ios=top.ports, name=TOP_NAME).write(verilog)
+
+    csv = os.path.join(output_dir, "csr.csv")
+    with open(csv, "w") as f:
+        f.write(top.get_csr_csv(dict(dotp_n=n, dotp_lanes=lanes,
+            dotp_pipelined=int(pipelined), dotp_impl=impl, dotp_queue_depth=queue_depth)))
+    sources = os.path.join(output_dir, "sources.txt")
+    with open(sources, "w") as f:
+        for path in [verilog] + platform.sources:
+            f.write(os.path.abspath(path) + "\n")
+    return verilog, csv, sources
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verilog do DotProductAccel com o barramento CSR como portas")
+    parser.add_argument("--n",          type=int, default=8, help="Elementos por vetor")
+    parser.add_argument("--lanes",      type=int, default=1, help="Multiplicadores em paralelo")
+    parser.add_argument("--pipelined",  action="store_true", help="Núcleo pipeline com FIFO de resultados")
+    parser.add_argument("--impl",       default="sv", choices=["sv", "migen"], help="Implementação do núcleo")
+    parser.add_argument("--queue-depth", type=int, default=0, help="Fila de jobs (CSR push) com esta profundidade (0 = sem fila)")
+    parser.add_argument("--output-dir", default=os.path.join("build", "cocotb"), help="Diretório de saída")
+    args = parser.parse_args()
+
+    verilog, csv, sources = export(args.output_dir, args.n, args.lanes, args.pipelined, args.impl, args.queue_depth)
+    print(f"Verilog em {verilog}; mapa em {csv}; fontes em {sources}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,90 +2,866 @@
 # Wrapper LiteX/Migen para o módulo SystemVerilog dot_product_accel
 
 import os
+from functools import reduce
+from operator import add
+
 from migen import *
 from litex.gen import LiteXModule
-from litex.soc.interconnect.csr import CSRStorage, CSRStatus
+from litex.soc.interconnect import stream, wishbone
+from litex.soc.interconnect.csr import CSRStorage, CSRStatus, CSRField
+from litex.soc.interconnect.csr_eventmanager import EventManager, EventSourcePulse
+
+
+# Modos de precisão (CSR mode / porta mode dos núcleos com SIMD=1)
+MODE_INT32, MODE_INT16, MODE_INT8 = 0, 1, 2
+
+
+def _word_product(module, x, y, mode):
+    """Produto de uma palavra de cada operando (signed, 64 bits): 32x32 ou, conforme
+    mode, a soma de 2 int16x16 ou 4 int8x8 (lane 0 nos bits menos significativos)"""
+    def lanes(word, width):
+        subs = [Signal((width, True)) for _ in range(32//width)]
+        module.comb += [v.eq(word[width*i:width*(i + 1)]) for i, v in enumerate(subs)]
+        return subs
+    x16, y16 = lanes(x, 16), lanes(y, 16)
+    x8,  y8  = lanes(x, 8),  lanes(y, 8)
+    return Mux(mode == MODE_INT16, reduce(add, [p*q for p, q in zip(x16, y16)]),
+           Mux(mode == MODE_INT8,  reduce(add, [p*q for p, q in zip(x8, y8)]),
+               x*y))
+
+
+def _lane_products(module, A, B, idx, lanes, mode=None):
+    """Produtos das LANES no passo `idx` (elemento idx*lanes + g): signed 32x32 -> 64 ou,
+    com `mode` (núcleo com SIMD), o produto empacotado de _word_product"""
+    steps = len(A) // lanes
+    products = []
+    for g in range(lanes):
+        x = Signal((32, True))
+        y = Signal((32, True))
+        module.comb += [
+            x.eq(Array(A[k*lanes + g] for k in range(steps))[idx]),
+            y.eq(Array(B[k*lanes + g] for k in range(steps))[idx]),
+        ]
+        products.append(x*y if mode is None else _word_product(module, x, y, mode))
+    return products
+
+
+class DotProductCore(Module):
+    """Equivalente Migen de rtl/dot_product_accel.sv (mesmas portas e temporização).
+
+    start/done/busy, a/b empacotados (elemento i em a[32*i:32*(i+1)]) e result de
+    64 bits; N/LANES ciclos em RUN por operação. accumulate, amostrado em start, mantém
+    o acumulador (soma ao resultado anterior). Com simd=True, mode (amostrado em start)
+    empacota 2 int16 ou 4 int8 por palavra. Usa o reset do domínio sys.
+    """
+    def __init__(self, n=8, lanes=1, simd=False):
+        steps = n // lanes
+
+        self.start  = Signal()
+        self.accumulate = Signal()
+        self.mode   = Signal(2)
+        self.done   = Signal()
+        self.busy   = Signal()
+        self.a      = Signal(32*n)
+        self.b      = Signal(32*n)
+        self.result = Signal((64, True))
+
+        # # #
+
+        S_IDLE, S_RUN, S_DONE = range(3)
+        state   = Signal(2)
+        state_n = Signal(2)
+
+        # Registradores internos (operandos latched em start)
+        A     = [Signal((32, True), name=f"A{i}") for i in range(n)]
+        B     = [Signal((32, True), name=f"B{i}") for i in range(n)]
+        idx   = Signal(max=max(steps, 2))
+        idx_n = Signal(max=max(steps, 2))
+        acc   = Signal((64, True))
+        acc_n = Signal((64, True))
+        prod  = Signal((64, True))    # soma dos produtos das LANES no passo atual
+        M     = Signal(2)             # mode da operação em curso
+
+        self.comb += [
+            prod.eq(reduce(add, _lane_products(self, A, B, idx, lanes, M if simd else None))),
+            self.busy.eq(state == S_RUN),
+        ]
+
+        # Próximos estados/valores
+        self.comb += [
+            state_n.eq(state),
+            idx_n.eq(idx),
+            acc_n.eq(acc),
+            Case(state, {
+                S_IDLE: If(self.start,
+                    idx_n.eq(0),
+                    acc_n.eq(Mux(self.accumulate, acc, 0)),
+                    state_n.eq(S_RUN)
+                ),
+                S_RUN: [
+                    acc_n.eq(acc + prod),
+                    If(idx == steps - 1,
+                        state_n.eq(S_DONE)
+                    ).Else(
+                        idx_n.eq(idx + 1)
+                    )
+                ],
+                S_DONE: If(self.start,
+                    idx_n.eq(0),
+                    acc_n.eq(Mux(self.accumulate, acc, 0)),
+                    state_n.eq(S_RUN)
+                ),
+                "default": state_n.eq(S_IDLE),
+            })
+        ]
+
+        self.sync += [
+            If(self.start & (state != S_RUN),
+                [A[i].eq(self.a[32*i:32*(i+1)]) for i in range(n)],
+                [B[i].eq(self.b[32*i:32*(i+1)]) for i in range(n)],
+                M.eq(self.mode),
+            ),
+            state.eq(state_n),
+            idx.eq(idx_n),
+            acc.eq(acc_n),
+            If((state == S_RUN) & (state_n == S_DONE),
+                self.result.eq(acc_n)
+            ),
+            self.done.eq(state_n == S_DONE),
+        ]
+
+
+class DotProductCorePipe(Module):
+    """Equivalente Migen de rtl/dot_product_accel_pipe.sv (mesmas portas e temporização).
+
+    Entrada in_valid/in_ready com a/b empacotados, saída out_valid/out_ready com
+    out_result; um novo par de vetores a cada N/LANES ciclos. Estágios S0 (operandos e
+    sequenciador), S1 (multiplicações), S2 (árvore de somadores), S3 (acumulação).
+    Com simd=True, mode é capturado com os operandos (como em DotProductCore).
+    """
+    def __init__(self, n=8, lanes=1, simd=False):
+        steps = n // lanes
+
+        self.in_valid   = Signal()
+        self.in_ready   = Signal()
+        self.a          = Signal(32*n)
+        self.b          = Signal(32*n)
+        self.mode       = Signal(2)
+        self.out_valid  = Signal()
+        self.out_ready  = Signal()
+        self.out_result = Signal((64, True))
+
+        # # #
+
+        # Avanço global do pipeline (pára quando a saída está cheia e não é consumida)
+        en = Signal()
+        self.comb += en.eq(~self.out_valid | self.out_ready)
+
+        # S0: operandos latched + sequenciador de passos
+        A         = [Signal((32, True), name=f"A{i}") for i in range(n)]
+        B         = [Signal((32, True), name=f"B{i}") for i in range(n)]
+        M         = Signal(2)
+        busy      = Signal()
+        idx       = Signal(max=max(steps, 2))
+        last_step = Signal()
+        self.comb += [
+            last_step.eq(idx == steps - 1),
+            self.in_ready.eq(en & (~busy | last_step)),
+        ]
+        self.sync += If(en,
+            If(self.in_valid & self.in_ready,
+                [A[i].eq(self.a[32*i:32*(i+1)]) for i in range(n)],
+                [B[i].eq(self.b[32*i:32*(i+1)]) for i in range(n)],
+                M.eq(self.mode),
+                busy.eq(1),
+                idx.eq(0)
+            ).Elif(busy,
+                If(last_step,
+                    busy.eq(0),
+                    idx.eq(0)
+                ).Else(
+                    idx.eq(idx + 1)
+                )
+            )
+        )
+
+        # S1: LANES multiplicações
+        m_prod  = [Signal((64, True), name=f"m_prod{g}") for g in range(lanes)]
+        m_valid = Signal()
+        m_first = Signal()
+        m_last  = Signal()
+        self.sync += If(en,
+            m_valid.eq(busy),
+            m_first.eq(idx == 0),
+            m_last.eq(last_step),
+            [p.eq(v) for p, v in zip(m_prod, _lane_products(self, A, B, idx, lanes, M if simd else None))]
+        )
+
+        # S2: soma dos produtos do passo
+        s_sum   = Signal((64, True))
+        s_valid = Signal()
+        s_first = Signal()
+        s_last  = Signal()
+        self.sync += If(en,
+            s_valid.eq(m_valid),
+            s_first.eq(m_first),
+            s_last.eq(m_last),
+            s_sum.eq(reduce(add, m_prod))
+        )
+
+        # S3: acumulação; no último passo o resultado vai para a saída
+        acc   = Signal((64, True))
+        acc_n = Signal((64, True))
+        self.comb += acc_n.eq(Mux(s_first, 0, acc) + s_sum)
+        self.sync += If(en,
+            If(s_valid,
+                acc.eq(acc_n)
+            ),
+            self.out_valid.eq(s_valid & s_last),
+            If(s_valid & s_last,
+                self.out_result.eq(acc_n)
+            )
+        )
+
+
+class DotProductDMA(LiteXModule):
+    """Mestre Wishbone que busca A e B na memória e acumula o produto escalar.
+
+    CSRs: a_base/b_base (endereços em bytes, alinhados a 4), length (elementos),
+    start (escrita de 1 dispara), done e result_lo/result_hi (64 bits, com o mesmo
+    wraparound do acumulador do RTL).
+
+    Os operandos são lidos em rajadas incrementais de até `burst` palavras: primeiro
+    um bloco de A (guardado em buffer), depois o bloco correspondente de B, que é
+    multiplicado e acumulado à medida que chega (multiplicação e soma registradas).
+    """
+    def __init__(self, burst=8):
+        self.bus = bus = wishbone.Interface(data_width=32, bursting=True)
+
+        self.a_base    = CSRStorage(32, name="a_base")
+        self.b_base    = CSRStorage(32, name="b_base")
+        self.length    = CSRStorage(32, name="length")
+        self.start     = CSRStorage(1, name="start")
+        self.done      = CSRStatus(1, name="done")
+        self.result_lo = CSRStatus(32, name="result_lo")
+        self.result_hi = CSRStatus(32, name="result_hi")
+
+        # Sinais internos
+        trigger   = Signal()
+        a_adr     = Signal(30)               # endereços de palavra (Wishbone)
+        b_adr     = Signal(30)
+        remaining = Signal(32)
+        count     = Signal(max=burst + 1)    # palavras do bloco atual
+        j         = Signal(max=burst)
+        last      = Signal()
+        buf       = Array(Signal(32, name=f"dma_buf{i}") for i in range(burst))
+        done      = Signal()
+        acc       = Signal((64, True))
+
+        # Pipeline de MAC: (A, B) registrados -> produto registrado -> acumulação
+        mul_a     = Signal((32, True))
+        mul_b     = Signal((32, True))
+        mul_valid = Signal()
+        prod      = Signal((64, True))
+        prod_valid = Signal()
+        clear     = Signal()
+
+        self.fsm = fsm = FSM(reset_state="IDLE")
+
+        self.comb += [
+            trigger.eq(self.start.re & self.start.storage),
+            last.eq(j == (count - 1)),
+            bus.sel.eq(0xf),
+            bus.we.eq(0),
+            bus.bte.eq(0b00),
+            # Rajada incremental; a última palavra do bloco fecha com "end of burst"
+            If(last,
+                bus.cti.eq(0b111)
+            ).Else(
+                bus.cti.eq(0b010)
+            ),
+        ]
+        self.sync += [
+            # Bloco de A no buffer; cada palavra de B entra no pipeline com seu par
+            If(fsm.ongoing("READ-A") & bus.ack,
+                buf[j].eq(bus.dat_r),
+            ),
+            mul_a.eq(buf[j]),
+            mul_b.eq(bus.dat_r),
+            mul_valid.eq(fsm.ongoing("READ-B") & bus.ack),
+            prod.eq(mul_a * mul_b),
+            prod_valid.eq(mul_valid),
+            If(clear,
+                acc.eq(0),
+            ).Elif(prod_valid,
+                acc.eq(acc + prod),
+            ),
+            self.done.status.eq(done),
+            self.result_lo.status.eq(acc[:32]),
+            self.result_hi.status.eq(acc[32:]),
+        ]
+
+        fsm.act("IDLE",
+            If(trigger,
+                clear.eq(1),
+                NextValue(done, 0),
+                NextValue(a_adr, self.a_base.storage[2:]),
+                NextValue(b_adr, self.b_base.storage[2:]),
+                NextValue(remaining, self.length.storage),
+                If(self.length.storage > burst,
+                    NextValue(count, burst)
+                ).Else(
+                    NextValue(count, self.length.storage)
+                ),
+                NextValue(j, 0),
+                If(self.length.storage == 0,
+                    NextState("DRAIN")
+                ).Else(
+                    NextState("READ-A")
+                )
+            )
+        )
+        fsm.act("READ-A",
+            bus.cyc.eq(1),
+            bus.stb.eq(1),
+            bus.adr.eq(a_adr + j),
+            If(bus.ack,
+                NextValue(j, j + 1),
+                If(last,
+                    NextValue(j, 0),
+                    NextState("READ-B")
+                )
+            )
+        )
+        fsm.act("READ-B",
+            bus.cyc.eq(1),
+            bus.stb.eq(1),
+            bus.adr.eq(b_adr + j),
+            If(bus.ack,
+                NextValue(j, j + 1),
+                If(last,
+                    NextValue(j, 0),
+                    NextState("NEXT")
+                )
+            )
+        )
+        fsm.act("NEXT",
+            NextValue(a_adr, a_adr + count),
+            NextValue(b_adr, b_adr + count),
+            NextValue(remaining, remaining - count),
+            If((remaining - count) > burst,
+                NextValue(count, burst)
+            ).Else(
+                NextValue(count, remaining - count)
+            ),
+            If(remaining == count,
+                NextState("DRAIN")
+            ).Else(
+                NextState("READ-A")
+            )
+        )
+        # Aguarda o esvaziamento do pipeline de MAC (2 estágios)
+        fsm.act("DRAIN",
+            If(~mul_valid & ~prod_valid,
+                NextValue(done, 1),
+                NextState("IDLE")
+            )
+        )
+
+
+class DotProductPerf(LiteXModule):
+    """Contadores de desempenho (64 bits, livres) do acelerador.
+
+    op_start/op_done são pulsos de 1 ciclo (operação aceita/concluída pelo núcleo);
+    várias operações podem estar em curso ao mesmo tempo (núcleo pipeline), desde
+    que terminem na ordem em que começaram (até `max_inflight`).
+
+    Contadores: busy_cycles (há operação em curso), idle_cycles, ops (concluídas),
+    latency_last/latency_max (ciclos de start a done) e host_gap (ciclos entre um
+    done que esvazia o acelerador e o start seguinte, ou seja, o tempo da CPU).
+    Os CSRs só mudam em control.snapshot, para que a leitura em duas palavras de
+    32 bits seja consistente; control.clear zera os contadores.
+    """
+    counters = ["busy_cycles", "idle_cycles", "ops", "latency_last", "latency_max", "host_gap"]
+
+    def __init__(self, op_start, op_done, max_inflight=1):
+        self.control = CSRStorage(fields=[
+            CSRField("clear",    size=1, offset=0, pulse=True, description="Zera os contadores."),
+            CSRField("snapshot", size=1, offset=1, pulse=True, description="Copia os contadores para os CSRs."),
+        ], name="control")
+        for name in self.counters:
+            setattr(self, name, CSRStatus(64, name=name))
+
+        # Sinais internos
+        clear    = self.control.fields.clear
+        snapshot = self.control.fields.snapshot
+        now      = Signal(64)                     # base de tempo para a latência
+        inflight = Signal(max=max_inflight + 1)
+        busy     = Signal()
+        waiting  = Signal()                       # último done esvaziou; aguarda a CPU
+        latency  = Signal(64)
+        count    = {name: Signal(64, name=f"perf_{name}") for name in self.counters}
+
+        # Instante de início de cada operação em curso (terminam em ordem)
+        self.stamps = stamps = stream.SyncFIFO([("t", 64)], max_inflight + 1, buffered=False)
+
+        self.comb += [
+            busy.eq(inflight != 0),
+            stamps.sink.valid.eq(op_start),
+            stamps.sink.t.eq(now),
+            stamps.source.ready.eq(op_done),
+            latency.eq(now - stamps.source.t),
+        ]
+        self.sync += [
+            now.eq(now + 1),
+            inflight.eq(inflight + op_start - op_done),
+            If(op_start,
+                waiting.eq(0)
+            ).Elif(op_done & (inflight == 1),
+                waiting.eq(1)
+            ),
+            If(clear,
+                [c.eq(0) for c in count.values()],
+                waiting.eq(0),
+            ).Else(
+                If(busy,
+                    count["busy_cycles"].eq(count["busy_cycles"] + 1)
+                ).Else(
+                    count["idle_cycles"].eq(count["idle_cycles"] + 1)
+                ),
+                If(waiting,
+                    count["host_gap"].eq(count["host_gap"] + 1)
+                ),
+                If(op_done,
+                    count["ops"].eq(count["ops"] + 1),
+                    count["latency_last"].eq(latency),
+                    If(latency > count["latency_max"],
+                        count["latency_max"].eq(latency)
+                    )
+                )
+            ),
+            If(snapshot,
+                [getattr(self, name).status.eq(count[name]) for name in self.counters]
+            )
+        ]
+
+
+class DotProductWindow(LiteXModule):
+    """Janela Wishbone (escravo, 32 bits) com os operandos: a palavra i é a[i] e a
+    palavra n+i é b[i]. Escritas respeitam sel (stores de byte/meia palavra) e todo
+    acesso é confirmado em 1 ciclo; leituras devolvem o valor escrito. `size` é o
+    tamanho da região em bytes (potência de 2)."""
+    def __init__(self, n=8):
+        words     = 2*n
+        self.size = 4*(1 << log2_int(words, need_pow2=False))
+        self.bus  = bus = wishbone.Interface(data_width=32)
+        self.a    = Signal(32*n)
+        self.b    = Signal(32*n)
+
+        # # #
+
+        regs = [Signal(32, name=f"{'ab'[i // n]}{i % n}") for i in range(words)]
+        idx  = Signal(max(log2_int(self.size // 4), 1))
+        self.comb += [
+            idx.eq(bus.adr),
+            self.a.eq(Cat(*regs[:n])),
+            self.b.eq(Cat(*regs[n:])),
+        ]
+
+        access = bus.cyc & bus.stb & ~bus.ack
+        for i, reg in enumerate(regs):
+            for byte in range(4):
+                self.sync += If(access & bus.we & bus.sel[byte] & (idx == i),
+                    reg[8*byte:8*(byte + 1)].eq(bus.dat_w[8*byte:8*(byte + 1)])
+                )
+        rd_cases = {i: bus.dat_r.eq(reg) for i, reg in enumerate(regs)}
+        rd_cases["default"] = bus.dat_r.eq(0)
+        self.sync += [
+            bus.ack.eq(access),
+            Case(idx, rd_cases),
+        ]
 
 
 class DotProductAccel(LiteXModule):
-    def __init__(self, platform, sys_clk_freq):
-        # 16 registradores de entrada (a0..a7, b0..b7), cada um 32-bit
-        # Declare como atributos diretos para o gerador de CSRs reconhecer
-        self.a0 = CSRStorage(32, name="a0")
-        self.a1 = CSRStorage(32, name="a1")
-        self.a2 = CSRStorage(32, name="a2")
-        self.a3 = CSRStorage(32, name="a3")
-        self.a4 = CSRStorage(32, name="a4")
-        self.a5 = CSRStorage(32, name="a5")
-        self.a6 = CSRStorage(32, name="a6")
-        self.a7 = CSRStorage(32, name="a7")
-        self.b0 = CSRStorage(32, name="b0")
-        self.b1 = CSRStorage(32, name="b1")
-        self.b2 = CSRStorage(32, name="b2")
-        self.b3 = CSRStorage(32, name="b3")
-        self.b4 = CSRStorage(32, name="b4")
-        self.b5 = CSRStorage(32, name="b5")
-        self.b6 = CSRStorage(32, name="b6")
-        self.b7 = CSRStorage(32, name="b7")
-
-        # start (1 bit)
-        self.start = CSRStorage(1, name="start")
+    """Acelerador de produto escalar exposto via CSR.
+
+    n          : elementos por vetor (gera os CSRs a0..a{n-1} e b0..b{n-1})
+    lanes      : multiplicadores em paralelo; uma operação leva n/lanes ciclos
+    pipelined  : usa o núcleo pipeline (dot_product_accel_pipe.sv): cada escrita de 1
+                 em start enfileira os operandos atuais e os resultados vão para uma
+                 FIFO (done = FIFO não vazia, leitura de result_hi retira o resultado)
+    fifo_depth : profundidade da FIFO de resultados (modos pipeline e fila)
+    queue_depth: > 0 ativa a fila de jobs: cada escrita em push (campo tag) copia os
+                 operandos atuais para uma FIFO de queue_depth entradas (sem o CSR
+                 start); o núcleo executa os jobs em sequência, sem esperar a CPU, e
+                 grava (resultado, tag) na FIFO de resultados; jobs/level/ready
+                 informam a ocupação das duas FIFOs
+    b_tiles    : > 0 ativa o modo GEMV: B fica residente em b_tiles blocos de n
+                 elementos (carregados uma vez por b_addr/b_data, escolhidos por tile)
+                 e cada operação só escreve a linha de A; no núcleo sequencial, o campo
+                 accumulate de start (ou de push) encadeia blocos sem zerar o acumulador
+    with_simd  : CSR mode com a precisão dos operandos: 0 = int32, 1 = 2 int16 por
+                 palavra, 2 = 4 int8 por palavra (lane 0 nos bits menos significativos),
+                 acumulados em 64 bits; 2-4x mais elementos por escrita de CSR e por
+                 ciclo, ao custo de 2+4 multiplicadores estreitos por lane
+    with_dma   : adiciona um mestre Wishbone (self.dma) que lê vetores de tamanho
+                 arbitrário da memória; CSRs em dotp_dma_*
+    dma_burst  : palavras por rajada do mestre DMA
+    with_perf  : contadores de desempenho do núcleo (self.perf); CSRs em dotp_perf_*.
+                 Opcional: são seis contadores de 64 bits e 13 palavras de CSR
+    with_irq   : EventManager (self.ev) com o evento "done", pulsado a cada resultado
+                 produzido pelo núcleo; a SoC o liga a uma IRQ da CPU e o firmware
+                 espera o fim da operação com wfi em vez de ler done em laço.
+                 Opcional: acrescenta ev_status/ev_pending/ev_enable ao mapa de CSRs
+    with_window: operandos numa janela Wishbone (self.window, ver DotProductWindow) em
+                 vez dos CSRs a*/b*; a SoC a mapeia como região de memória e o
+                 firmware a preenche com stores de palavra (start segue em CSR)
+    impl       : "sv" instancia o RTL SystemVerilog (rtl/); "migen" usa os núcleos
+                 equivalentes em Migen (self.core), com os mesmos CSRs e temporização,
+                 simuláveis com migen.sim (platform pode ser None)
+    """
+    def __init__(self, platform, sys_clk_freq, n=8, lanes=1, pipelined=False, fifo_depth=16,
+        queue_depth=0, b_tiles=0, with_simd=False, with_dma=False, dma_burst=8, with_perf=False, with_window=False, with_irq=False, impl="sv"):
+        if n < 1 or lanes < 1 or n % lanes:
+            raise ValueError(f"n ({n}) deve ser múltiplo de lanes ({lanes})")
+        if impl not in ("sv", "migen"):
+            raise ValueError(f"impl deve ser \"sv\" ou \"migen\" (recebido {impl!r})")
+        if b_tiles and with_window:
+            raise ValueError("b_tiles e with_window não podem ser usados juntos")
+        self.n         = n
+        self.lanes     = lanes
+        self.pipelined = pipelined
+        self.with_simd = with_simd
+        self.impl      = impl
+        queued = queue_depth > 0
+        # Encadeamento de blocos (accumulate): modo GEMV com o núcleo sequencial
+        chained = b_tiles > 0 and not pipelined
+
+        # 2*n registradores de entrada (a0..a{n-1}, b0..b{n-1}), cada um 32-bit
+        # Declare como atributos diretos para o gerador de CSRs reconhecer.
+        # O mapa de CSRs é ordenado por nome: com n > 10 os índices recebem zeros à
+        # esquerda (a00, a01, ...) para que a ordem dos endereços siga a dos elementos.
+        # Com a janela Wishbone os operandos ficam nela e esses CSRs não são gerados; no
+        # modo GEMV (b_tiles) só existem os de A.
+        digits = len(str(n - 1))
+        a_csrs = []
+        b_csrs = []
+        if with_window:
+            self.window = DotProductWindow(n)
+        else:
+            for vec, csrs in (("a", a_csrs), ("b", b_csrs))[:1 if b_tiles else 2]:
+                for i in range(n):
+                    name = f"{vec}{i:0{digits}d}"
+                    csr  = CSRStorage(32, name=name)
+                    setattr(self, name, csr)
+                    csrs.append(csr)
+
+        # start (1 bit); na fila de jobs, push (com a tag do job) substitui start
+        accumulate_field = [
+            CSRField("accumulate", size=1, offset=8 if queued else 1,
+                description="1: não zera o acumulador (soma ao resultado anterior)."),
+        ] if chained else []
+        if queued:
+            self.push = CSRStorage(name="push", fields=[
+                CSRField("tag", size=8, description="Tag devolvida com o resultado; a escrita enfileira os operandos atuais."),
+            ] + accumulate_field)
+        elif chained:
+            self.start = CSRStorage(name="start", fields=[
+                CSRField("start", size=1, description="Inicia o cálculo (escrita de 1)."),
+            ] + accumulate_field)
+        else:
+            self.start = CSRStorage(1, name="start")
+
+        # Modo GEMV: ponteiro de carga (palavra tile*n + i), dado (escrita grava e avança o
+        # ponteiro) e bloco de B usado pelas próximas operações
+        if b_tiles:
+            self.b_addr = CSRStorage(bits_for(b_tiles*n - 1), name="b_addr")
+            self.b_data = CSRStorage(32, name="b_data")
+            self.tile   = CSRStorage(bits_for(b_tiles - 1), name="tile")
+
+        # Precisão dos operandos (amostrada pelo núcleo no início de cada operação)
+        if with_simd:
+            self.mode = CSRStorage(2, name="mode")
 
         # done (1 bit) e result (64 bits)
         self.done      = CSRStatus(1, name="done")
         self.result_lo = CSRStatus(32, name="result_lo")
         self.result_hi = CSRStatus(32, name="result_hi")
 
-        # Sinais internos
-        a_sigs = [Signal(32, name=f"a{i}") for i in range(8)]
-        b_sigs = [Signal(32, name=f"b{i}") for i in range(8)]
+        # Modo pipeline: ocupação da FIFO de resultados e operandos livres para reescrita
+        # (na fila: há espaço para mais um push)
+        if pipelined or queued:
+            self.level = CSRStatus(bits_for(fifo_depth), name="level")
+            self.ready = CSRStatus(1, name="ready")
+        # Fila de jobs: tag do resultado na cabeça da FIFO e jobs aguardando o núcleo
+        if queued:
+            self.tag  = CSRStatus(8, name="tag")
+            self.jobs = CSRStatus(bits_for(queue_depth), name="jobs")
+
+        # Sinais internos (operandos empacotados: elemento i em a[32*i:32*(i+1)])
+        a      = Signal(32*n)
+        b      = Signal(32*n)
         start  = Signal()
         done   = Signal()
         result = Signal(64)
+        accumulate = Signal()
+        mode   = Signal(2)
 
         # Atribuições CSR -> sinais
-        self.comb += a_sigs[0].eq(self.a0.storage)
-        self.comb += a_sigs[1].eq(self.a1.storage)
-        self.comb += a_sigs[2].eq(self.a2.storage)
-        self.comb += a_sigs[3].eq(self.a3.storage)
-        self.comb += a_sigs[4].eq(self.a4.storage)
-        self.comb += a_sigs[5].eq(self.a5.storage)
-        self.comb += a_sigs[6].eq(self.a6.storage)
-        self.comb += a_sigs[7].eq(self.a7.storage)
-        self.comb += b_sigs[0].eq(self.b0.storage)
-        self.comb += b_sigs[1].eq(self.b1.storage)
-        self.comb += b_sigs[2].eq(self.b2.storage)
-        self.comb += b_sigs[3].eq(self.b3.storage)
-        self.comb += b_sigs[4].eq(self.b4.storage)
-        self.comb += b_sigs[5].eq(self.b5.storage)
-        self.comb += b_sigs[6].eq(self.b6.storage)
-        self.comb += b_sigs[7].eq(self.b7.storage)
-        self.comb += start.eq(self.start.storage)
-
-        # Exporta done/result para CSRs de leitura
-        self.sync += [
-            self.done.status.eq(done),
-            self.result_lo.status.eq(result[:32]),
-            self.result_hi.status.eq(result[32:]),
-        ]
+        if with_window:
+            self.comb += [
+                a.eq(self.window.a),
+                b.eq(self.window.b),
+            ]
+        elif b_tiles:
+            # Blocos de B em registradores; o bloco selecionado alimenta o núcleo (que o
+            # copia em start, como antes) e a fila de jobs
+            b_words = [Signal(32, name=f"btile{t}_{i}") for t in range(b_tiles) for i in range(n)]
+            b_ptr   = Signal(max=max(b_tiles*n, 2))
+            self.sync += [
+                If(self.b_data.re,
+                    Case(b_ptr, {k: w.eq(self.b_data.storage) for k, w in enumerate(b_words)}),
+                    b_ptr.eq(b_ptr + 1),
+                ),
+                If(self.b_addr.re,
+                    b_ptr.eq(self.b_addr.storage)
+                ),
+            ]
+            tiles = Array(Cat(*b_words[t*n:(t + 1)*n]) for t in range(b_tiles))
+            self.comb += [
+                a.eq(Cat(*[csr.storage for csr in a_csrs])),
+                b.eq(tiles[self.tile.storage]),
+            ]
+        else:
+            self.comb += [
+                a.eq(Cat(*[csr.storage for csr in a_csrs])),
+                b.eq(Cat(*[csr.storage for csr in b_csrs])),
+            ]
+        if not queued:
+            # Um único start por escrita de 1: um start em nível mantido até o núcleo
+            # chegar em DONE (N/LANES curto) reiniciaria a operação (com accumulate,
+            # somaria o bloco duas vezes; nos contadores e no IRQ, uma operação a mais)
+            if chained:
+                self.comb += [
+                    start.eq(self.start.re & self.start.fields.start),
+                    accumulate.eq(self.start.fields.accumulate),
+                ]
+            else:
+                self.comb += start.eq(self.start.re & self.start.storage)
 
         # Clock/Reset
         clk   = ClockSignal()
         rst   = ResetSignal()
 
-        # Inclui o arquivo SystemVerilog ao projeto (caminho robusto)
-        rtl_path = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "rtl", "dot_product_accel.sv"))
-        platform.add_source(rtl_path)
-
-        # Instancia o módulo SV
-        self.specials += Instance("dot_product_accel",
-            i_clk=clk,
-            i_rst=rst,
-            i_start=start,
-            o_done=done,
-            i_a0=a_sigs[0], i_a1=a_sigs[1], i_a2=a_sigs[2], i_a3=a_sigs[3],
-            i_a4=a_sigs[4], i_a5=a_sigs[5], i_a6=a_sigs[6], i_a7=a_sigs[7],
-            i_b0=b_sigs[0], i_b1=b_sigs[1], i_b2=b_sigs[2], i_b3=b_sigs[3],
-            i_b4=b_sigs[4], i_b5=b_sigs[5], i_b6=b_sigs[6], i_b7=b_sigs[7],
-            o_result=result,
-        )
+        # Diretório dos fontes SystemVerilog (caminho robusto)
+        rtl_dir = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "rtl"))
+
+        # Mestre DMA opcional (vetores longos direto da RAM, sem escrita de operandos via CSR)
+        if with_dma:
+            self.dma = DotProductDMA(burst=dma_burst)
+
+        # Início/fim de operação no núcleo (para os contadores de desempenho)
+        op_start = Signal()
+        op_done  = Signal()
+
+        # Operandos do núcleo: os CSRs/janela ou, na fila, o job na cabeça da FIFO
+        core_a = a
+        core_b = b
+        core_mode = self.mode.storage if with_simd else 0
+        if queued:
+            self.jobs_fifo = jobs = stream.SyncFIFO([("a", 32*n), ("b", 32*n), ("tag", 8), ("accumulate", 1),
+                ("mode", 2)], queue_depth)
+            # Tags dos jobs em curso no núcleo, na ordem de conclusão
+            self.tags = tags = stream.SyncFIFO([("tag", 8)], 8 if pipelined else 2)
+            job_take = Signal()   # o núcleo aceita o job da cabeça neste ciclo
+            self.comb += [
+                jobs.sink.valid.eq(self.push.re),
+                jobs.sink.a.eq(a),
+                jobs.sink.b.eq(b),
+                jobs.sink.tag.eq(self.push.fields.tag),
+                jobs.sink.accumulate.eq(self.push.fields.accumulate if chained else 0),
+                jobs.sink.mode.eq(core_mode),
+                accumulate.eq(jobs.source.accumulate),
+                jobs.source.ready.eq(job_take),
+                tags.sink.valid.eq(job_take),
+                tags.sink.tag.eq(jobs.source.tag),
+                self.jobs.status.eq(jobs.level),
+                self.ready.status.eq(jobs.sink.ready & ~self.push.re),
+            ]
+            core_a = jobs.source.a
+            core_b = jobs.source.b
+            core_mode = jobs.source.mode
+        self.comb += mode.eq(core_mode)
+
+        # FIFO de resultados (modos pipeline e fila): cabeça nos CSRs, done = FIFO não
+        # vazia; a leitura de result_hi (lida depois de result_lo) retira o resultado
+        if pipelined or queued:
+            out_valid = Signal()
+            out_ready = Signal()
+            self.fifo = fifo = stream.SyncFIFO([("data", 64)] + ([("tag", 8)] if queued else []), fifo_depth)
+            self.comb += [
+                self.done.status.eq(fifo.source.valid),
+                self.result_lo.status.eq(fifo.source.data[:32]),
+                self.result_hi.status.eq(fifo.source.data[32:]),
+                fifo.source.ready.eq(self.result_hi.we),
+                self.level.status.eq(fifo.level),
+            ]
+
+        if not pipelined:
+            core_busy   = Signal()
+            core_busy_d = Signal()
+
+            # Operação em curso enquanto o núcleo está em S_RUN
+            self.sync += core_busy_d.eq(core_busy)
+            self.comb += [
+                op_start.eq(core_busy & ~core_busy_d),
+                op_done.eq(~core_busy & core_busy_d),
+            ]
+
+            if queued:
+                # Próximo job assim que o núcleo fica livre (inclusive no ciclo do done
+                # anterior), se a FIFO de resultados tiver lugar para ele e o job em curso
+                inflight = Signal()
+                self.comb += [
+                    job_take.eq(jobs.source.valid & tags.sink.ready & ~core_busy &
+                        (fifo.level + inflight < fifo_depth)),
+                    start.eq(job_take),
+                ]
+                self.sync += [
+                    If(job_take,
+                        inflight.eq(1)
+                    ).Elif(op_done,
+                        inflight.eq(0)
+                    )
+                ]
+            else:
+                # Exporta done/result para CSRs de leitura
+                self.sync += [
+                    self.done.status.eq(done),
+                    self.result_lo.status.eq(result[:32]),
+                    self.result_hi.status.eq(result[32:]),
+                ]
+
+            if impl == "migen":
+                self.core = core = DotProductCore(n, lanes, simd=with_simd)
+                self.comb += [
+                    core.start.eq(start),
+                    core.accumulate.eq(accumulate),
+                    core.mode.eq(mode),
+                    done.eq(core.done),
+                    core_busy.eq(core.busy),
+                    core.a.eq(core_a),
+                    core.b.eq(core_b),
+                    result.eq(core.result),
+                ]
+            else:
+                # Inclui o arquivo SystemVerilog ao projeto
+                platform.add_source(os.path.join(rtl_dir, "dot_product_accel.sv"))
+
+                # Instancia o módulo SV
+                self.specials += Instance("dot_product_accel",
+                    p_N     = n,
+                    p_LANES = lanes,
+                    p_SIMD  = int(with_simd),
+                    i_clk=clk,
+                    i_rst=rst,
+                    i_start=start,
+                    i_accumulate=accumulate,
+                    i_mode=mode,
+                    o_done=done,
+                    o_busy=core_busy,
+                    i_a=core_a,
+                    i_b=core_b,
+                    o_result=result,
+                )
+        else:
+            # Escrita de 1 em start deixa os operandos atuais pendentes até o núcleo aceitá-los
+            # (na fila, o job da cabeça fica pendente enquanto houver lugar para a tag)
+            pending   = Signal()
+            in_ready  = Signal()
+
+            if queued:
+                self.comb += [
+                    pending.eq(jobs.source.valid & tags.sink.ready),
+                    job_take.eq(pending & in_ready),
+                ]
+            else:
+                enqueue = Signal()
+                self.comb += [
+                    enqueue.eq(self.start.re & self.start.storage),
+                    self.ready.status.eq(~pending & ~enqueue),
+                ]
+                self.sync += [
+                    If(enqueue,
+                        pending.eq(1)
+                    ).Elif(in_ready,
+                        pending.eq(0)
+                    )
+                ]
+            self.comb += [
+                fifo.sink.valid.eq(out_valid),
+                fifo.sink.data.eq(result),
+                out_ready.eq(fifo.sink.ready),
+                op_start.eq(pending & in_ready),
+                op_done.eq(out_valid & out_ready),
+            ]
+
+            if impl == "migen":
+                self.core = core = DotProductCorePipe(n, lanes, simd=with_simd)
+                self.comb += [
+                    core.mode.eq(mode),
+                    core.in_valid.eq(pending),
+                    in_ready.eq(core.in_ready),
+                    core.a.eq(core_a),
+                    core.b.eq(core_b),
+                    out_valid.eq(core.out_valid),
+                    core.out_ready.eq(out_ready),
+                    result.eq(core.out_result),
+                ]
+            else:
+                # Inclui o arquivo SystemVerilog ao projeto
+                platform.add_source(os.path.join(rtl_dir, "dot_product_accel_pipe.sv"))
+
+                # Instancia o módulo SV
+                self.specials += Instance("dot_product_accel_pipe",
+                    p_N     = n,
+                    p_LANES = lanes,
+                    p_SIMD  = int(with_simd),
+                    i_clk=clk,
+                    i_rst=rst,
+                    i_in_valid=pending,
+                    o_in_ready=in_ready,
+                    i_mode=mode,
+                    i_a=core_a,
+                    i_b=core_b,
+                    o_out_valid=out_valid,
+                    i_out_ready=out_ready,
+                    o_out_result=result,
+                )
+
+        if queued:
+            # Resultado com a tag do job; no modo sequencial a reserva feita em job_take
+            # garante lugar na FIFO e o done do núcleo não espera
+            if not pipelined:
+                self.comb += [
+                    out_valid.eq(op_done),
+                    fifo.sink.valid.eq(out_valid),
+                    fifo.sink.data.eq(result),
+                ]
+            self.comb += [
+                fifo.sink.tag.eq(tags.source.tag),
+                tags.source.ready.eq(fifo.sink.valid & fifo.sink.ready),
+                self.tag.status.eq(fifo.source.tag),
+            ]
+
+        if with_irq:
+            # Um resultado pronto por pulso de op_done (no modo pipeline, a cada entrada na
+            # FIFO); o ISR limpa o pendente e drena os resultados disponíveis
+            self.ev = EventManager()
+            self.ev.done = EventSourcePulse(description="Operação concluída (resultado disponível)")
+            self.ev.finalize()
+            self.comb += self.ev.done.trigger.eq(op_done)
+
+        if with_perf:
+            # No modo pipeline várias operações ficam em voo (estágios + registrador de saída)
+            self.perf = DotProductPerf(op_start, op_done, max_inflight=8 if pipelined else 1)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+"""
+SoC Colorlight (i5/i9) com o acelerador de produto escalar no barramento CSR.
+
+Separado da CLI (soc_dot_product.py) para que o script só importe LiteX/litex-boards
+quando precisa elaborar o SoC (--prog-only e headers em cache não importam).
+"""
+
+from migen import *
+from litex.gen import *
+from litex_boards.targets.colorlight_i5 import BaseSoC as ColorlightBaseSoC
+from litex.soc.integration.soc import SoCRegion
+from litex.soc.integration.soc_core import SoCCore
+
+from dot_product_wrapper import DotProductAccel
+
+
+class SoCWithDotProduct(ColorlightBaseSoC):
+    def __init__(self, *args, **kwargs):
+        # Permite desabilitar SPI flash apenas em cenários específicos (ex.: geração de headers)
+        self._disable_spi_flash = kwargs.pop("disable_spi_flash", False)
+        # Configuração do acelerador: elementos por vetor e multiplicadores em paralelo
+        dotp_n     = kwargs.pop("dotp_n", 8)
+        dotp_lanes = kwargs.pop("dotp_lanes", 1)
+        # Núcleo pipeline com FIFO de resultados
+        dotp_pipelined = kwargs.pop("dotp_pipelined", False)
+        # Mestre DMA opcional: lê vetores longos direto da RAM principal
+        dotp_dma   = kwargs.pop("dotp_dma", False)
+        # Fila de jobs (profundidade; 0 desativa): push com tag e resultados encadeados
+        dotp_queue  = kwargs.pop("dotp_queue", 0)
+        # Janela Wishbone com os operandos no lugar dos CSRs a*/b*
+        dotp_window = kwargs.pop("dotp_window", False)
+        # Modo GEMV: blocos de B residentes (0 desativa); cada operação só escreve A
+        dotp_b_tiles = kwargs.pop("dotp_b_tiles", 0)
+        # Modos empacotados int16x2/int8x4 (CSR mode)
+        dotp_simd  = kwargs.pop("dotp_simd", False)
+        # Evento "done" (EventManager) ligado a uma IRQ da CPU
+        dotp_irq   = kwargs.pop("dotp_irq", False)
+        # Contadores de desempenho de 64 bits (CSRs dotp_perf_*)
+        dotp_perf  = kwargs.pop("dotp_perf", False)
+        # Implementação do núcleo: RTL SystemVerilog ("sv") ou Migen ("migen")
+        dotp_impl  = kwargs.pop("dotp_impl", "sv")
+        # Unidades independentes (dotp0..dotpK-1 quando > 1), despachadas pelo firmware
+        dotp_accels = kwargs.pop("dotp_accels", 1)
+        if dotp_accels < 1:
+            raise ValueError(f"dotp_accels deve ser >= 1 (recebido {dotp_accels})")
+        if dotp_accels > 1 and (dotp_dma or dotp_queue or dotp_window or dotp_b_tiles):
+            raise ValueError("dotp_accels > 1 não suporta DMA, fila, janela nem GEMV (uma unidade só)")
+        # Forçar uma CPU RISC-V padrão e UART
+        kwargs.setdefault("cpu_type", "vexriscv")
+        kwargs.setdefault("uart_name", "serial")
+        kwargs.setdefault("integrated_rom_size", 0x8000)
+        kwargs.setdefault("integrated_main_ram_size", 0x10000)
+        # Habilita timer para compatibilidade com BIOS em builds completos
+        kwargs.setdefault("with_timer", True)
+        # Uptime do timer0: o firmware mede os ciclos dos caminhos SW e HW
+        kwargs.setdefault("timer_uptime", True)
+        # Workaround: desabilitar LedChaser por bug de extração de nome de CSR na versão atual
+        # do LiteX (CSRStorage sem nome explícito pode falhar em Python 3.12). Mantém-se os
+        # demais periféricos padrão do target.
+        kwargs.setdefault("with_led_chaser", False)
+
+        super().__init__(*args, **kwargs)
+
+        # Instancia e adiciona o(s) acelerador(es): "dotp" com uma unidade, senão
+        # dotp0..dotpK-1, cada um com sua página de CSRs (e seu IRQ, com dotp_irq)
+        names = ["dotp"] if dotp_accels == 1 else [f"dotp{k}" for k in range(dotp_accels)]
+        for name in names:
+            setattr(self, name, DotProductAccel(self.platform, sys_clk_freq=int(kwargs.get("sys_clk_freq", 50e6)),
+                n         = dotp_n,
+                lanes     = dotp_lanes,
+                pipelined = dotp_pipelined,
+                queue_depth = dotp_queue,
+                b_tiles   = dotp_b_tiles,
+                with_simd = dotp_simd,
+                with_dma  = dotp_dma,
+                with_perf = dotp_perf,
+                with_irq  = dotp_irq,
+                with_window = dotp_window,
+                impl      = dotp_impl))
+            # Adiciona CSR para o periférico
+            self.add_csr(name)
+            if dotp_irq and self.irq.enabled:
+                # Evento "done" do acelerador como IRQ da CPU (DOTP_INTERRUPT em soc.h)
+                self.irq.add(name, use_loc_if_exists=True)
+        if dotp_dma:
+            # Conecta o mestre DMA ao barramento principal (acesso a integrated_main_ram)
+            self.bus.add_master(name="dotp_dma", master=self.dotp.dma.bus)
+        if dotp_window:
+            # Região de IO não cacheada (origem alocada pelo LiteX): DOTP_WINDOW_BASE em mem.h
+            self.bus.add_slave(name="dotp_window", slave=self.dotp.window.bus,
+                region=SoCRegion(size=self.dotp.window.size, cached=False))
+        # Exporta a configuração para o firmware (soc.h)
+        self.add_constant("DOTP_N", dotp_n)
+        self.add_constant("DOTP_LANES", dotp_lanes)
+        self.add_constant("DOTP_UNITS", dotp_accels)
+        if dotp_b_tiles:
+            self.add_constant("DOTP_B_TILES", dotp_b_tiles)
+
+    # Timer opcional: omitido aqui para facilitar geração de headers sem BIOS
+
+    # Override controlado: desabilita SPI flash apenas quando solicitado
+    def add_spi_flash(self, *args, **kwargs):
+        if self._disable_spi_flash:
+            # Ignora adição do SPI flash (workaround para bug de CSR em algumas versões)
+            return
+        # Caso contrário, delega para a implementação padrão do SoCCore
+        return SoCCore.add_spi_flash(self, *args, **kwargs)
@@ -5,6 +5,59 @@
 // Headers gerados pelo LiteX durante o build (--headers-only já gera estes arquivos)
 #include <csr.h>
 #include <soc.h>
+#include <mem.h>
+
+// Configuração do acelerador (exportada pelo SoC em soc.h; padrão 8 elementos)
+#ifndef DOTP_N
+#define DOTP_N 8
+#endif
+#ifndef DOTP_LANES
+#define DOTP_LANES 1
+#endif
+#ifndef DOTP_UNITS
+#define DOTP_UNITS 1
+#endif
+
+#if DOTP_UNITS > 1
+// Várias unidades (--dotp-accels K): dotp0..dotp{K-1}, mesmo mapa em páginas CSR
+// consecutivas. As demos de uma unidade usam a dotp0 pelos nomes abaixo; o
+// despachante acessa a unidade k em endereço + k * DOTP_UNIT_STRIDE.
+#define DOTP_UNIT_STRIDE (CSR_DOTP1_BASE - CSR_DOTP0_BASE)
+#if DOTP_N <= 10
+#define CSR_DOTP_A0_ADDR   CSR_DOTP0_A0_ADDR
+#define CSR_DOTP_B0_ADDR   CSR_DOTP0_B0_ADDR
+#define CSR_DOTP_A0_SIZE   CSR_DOTP0_A0_SIZE
+#else
+#define CSR_DOTP_A00_ADDR  CSR_DOTP0_A00_ADDR
+#define CSR_DOTP_B00_ADDR  CSR_DOTP0_B00_ADDR
+#define CSR_DOTP_A00_SIZE  CSR_DOTP0_A00_SIZE
+#endif
+#define dotp_start_write     dotp0_start_write
+#define dotp_done_read       dotp0_done_read
+#define dotp_result_lo_read  dotp0_result_lo_read
+#define dotp_result_hi_read  dotp0_result_hi_read
+#endif
+
+#ifdef DOTP_WINDOW_BASE
+// Operandos na janela Wishbone (mem.h): palavra i = a[i], palavra N+i = b[i]
+#define DOTP_WINDOW ((volatile uint32_t *)DOTP_WINDOW_BASE)
+#else
+// Os CSRs de operandos são contíguos (a0..a{N-1}, b0..b{N-1}); com N > 10 o LiteX
+// os nomeia com zeros à esquerda (a00, a01, ...). Acessa-se por endereço + stride.
+#if DOTP_N <= 10
+#define DOTP_A_ADDR CSR_DOTP_A0_ADDR
+#define DOTP_B_ADDR CSR_DOTP_B0_ADDR   // ausente no modo GEMV (B em b_data)
+#define DOTP_OPERAND_SIZE CSR_DOTP_A0_SIZE
+#elif DOTP_N <= 100
+#define DOTP_A_ADDR CSR_DOTP_A00_ADDR
+#define DOTP_B_ADDR CSR_DOTP_B00_ADDR
+#define DOTP_OPERAND_SIZE CSR_DOTP_A00_SIZE
+#else
+#error "DOTP_N > 100 não suportado pelo firmware"
+#endif
+// Cada palavra CSR ocupa 4 bytes no barramento
+#define DOTP_OPERAND_STRIDE (DOTP_OPERAND_SIZE * 4)
+#endif
 
 // UART mínimo (usa o periférico UART do LiteX)
 #ifndef CSR_UART_BASE
@@ -41,28 +94,69 @@ static void uart_write_hex64(uint64_t v) {
     for (int i = 7; i >= 0; --i) uart_write_char(hex[(lo >> (i*4)) & 0xF]);
 }
 
-static int64_t sw_dotp(const int32_t a[8], const int32_t b[8]) {
+#ifdef CSR_TIMER0_UPTIME_CYCLES_ADDR
+// Ciclos de CPU desde o reset (timer0 com uptime; o latch congela o valor no CSR)
+static uint64_t cycles_now(void) {
+    timer0_uptime_latch_write(1);
+    return timer0_uptime_cycles_read();
+}
+#else
+static uint64_t cycles_now(void) { return 0; }
+#endif
+
+static int64_t sw_dotp(const int32_t a[DOTP_N], const int32_t b[DOTP_N]) {
     int64_t acc = 0;
-    for (int i=0;i<8;i++) acc += (int64_t)a[i]*(int64_t)b[i];
+    for (int i=0;i<DOTP_N;i++) acc += (int64_t)a[i]*(int64_t)b[i];
     return acc;
 }
 
-static void hw_write_vectors(const int32_t a[8], const int32_t b[8]) {
-    dotp_a0_write(a[0]); dotp_a1_write(a[1]); dotp_a2_write(a[2]); dotp_a3_write(a[3]);
-    dotp_a4_write(a[4]); dotp_a5_write(a[5]); dotp_a6_write(a[6]); dotp_a7_write(a[7]);
-    dotp_b0_write(b[0]); dotp_b1_write(b[1]); dotp_b2_write(b[2]); dotp_b3_write(b[3]);
-    dotp_b4_write(b[4]); dotp_b5_write(b[5]); dotp_b6_write(b[6]); dotp_b7_write(b[7]);
+#ifdef CSR_DOTP_B_DATA_ADDR
+// Modo GEMV: B fica residente em DOTP_B_TILES blocos de DOTP_N palavras; b_data grava
+// no ponteiro b_addr e o avança, tile escolhe o bloco usado pelas próximas operações
+static void hw_load_b(uint32_t tile, const int32_t *b, uint32_t len) {
+    dotp_b_addr_write(tile * DOTP_N);
+    for (uint32_t i = 0; i < len; ++i) dotp_b_data_write((uint32_t)b[i]);
 }
 
+static void hw_write_a(const int32_t a[DOTP_N]) {
+    for (int i = 0; i < DOTP_N; ++i)
+        csr_wr_uint32((uint32_t)a[i], DOTP_A_ADDR + i * DOTP_OPERAND_STRIDE);
+}
+#endif
+
+static void hw_write_vectors(const int32_t a[DOTP_N], const int32_t b[DOTP_N]) {
+#ifdef DOTP_WINDOW_BASE
+    // Stores de palavra sequenciais, sem cálculo de endereço de CSR
+    for (int i = 0; i < DOTP_N; ++i) DOTP_WINDOW[i] = (uint32_t)a[i];
+    for (int i = 0; i < DOTP_N; ++i) DOTP_WINDOW[DOTP_N + i] = (uint32_t)b[i];
+#elif defined(CSR_DOTP_B_DATA_ADDR)
+    // Operação avulsa: B no bloco 0 (recarregado a cada chamada)
+    hw_load_b(0, b, DOTP_N);
+    dotp_tile_write(0);
+    hw_write_a(a);
+#else
+    for (int i = 0; i < DOTP_N; ++i) {
+        csr_wr_uint32((uint32_t)a[i], DOTP_A_ADDR + i * DOTP_OPERAND_STRIDE);
+        csr_wr_uint32((uint32_t)b[i], DOTP_B_ADDR + i * DOTP_OPERAND_STRIDE);
+    }
+#endif
+}
+
+#ifdef CSR_DOTP_PUSH_ADDR
+static void hw_start() {
+    // Fila de jobs: push enfileira os operandos atuais (tag 0); o resultado sai na FIFO
+    dotp_push_write(0);
+}
+#else
 static void hw_start() {
-    // Gera um pulso em 'start' para evitar reexecuções involuntárias
-    // Caso o bit fique em nível alto até o DONE, o hardware poderia reiniciar
-    // automaticamente uma nova operação. Portanto, pulse e depois limpe.
+    // A escrita de 1 dispara uma única operação (o 0 escrito depois só devolve o CSR ao
+    // valor de reset). O atraso cobre os ciclos em que done ainda mostra a operação
+    // anterior, antes de hw_done() ser lido
     dotp_start_write(1);
-    // Pequeno atraso para garantir pelo menos 1-2 ciclos de clock do SoC
     for (volatile int i = 0; i < 16; ++i) { /* noop */ }
     dotp_start_write(0);
 }
+#endif
 
 static bool hw_done() {
     return dotp_done_read();
@@ -74,31 +168,797 @@ static int64_t hw_result() {
     return ((int64_t)(int32_t)hi << 32) | lo;
 }
 
+// Conclusão por interrupção: o evento "done" do acelerador (EventManager) chega como
+// IRQ externa; máscara e pendentes nos CSRs 0xBC0/0xFC0 do VexRiscv do LiteX
+#if defined(CSR_DOTP_EV_PENDING_ADDR) && defined(DOTP_INTERRUPT)
+#define DOTP_IRQ
+static volatile uint32_t dotp_irq_count;
+
+static inline uint32_t irq_getmask(void) {
+    uint32_t mask;
+    __asm__ volatile ("csrr %0, 0xBC0" : "=r"(mask));
+    return mask;
+}
+
+static inline void irq_setmask(uint32_t mask) {
+    __asm__ volatile ("csrw 0xBC0, %0" :: "r"(mask));
+}
+
+static inline uint32_t irq_pending(void) {
+    uint32_t pending;
+    __asm__ volatile ("csrr %0, 0xFC0" : "=r"(pending));
+    return pending;
+}
+
+static inline void irq_setie(int ie) {
+    if (ie) __asm__ volatile ("csrsi mstatus, 8");
+    else    __asm__ volatile ("csrci mstatus, 8");
+}
+#endif
+
+// Chamado por trap_entry (crt0.s)
+void isr(void) {
+#ifdef DOTP_IRQ
+    if ((irq_pending() & irq_getmask()) & (1u << DOTP_INTERRUPT)) {
+        dotp_ev_pending_write(1 << CSR_DOTP_EV_PENDING_DONE_OFFSET);
+        dotp_irq_count++;
+    }
+#endif
+}
+
+// Espera por IRQ no modo sequencial (no pipeline o firmware drena a FIFO por done)
+#if defined(DOTP_IRQ) && !defined(CSR_DOTP_LEVEL_ADDR)
+extern void trap_entry(void);
+
+static void hw_irq_enable(void) {
+    // Vetor de traps (trap_entry em crt0.s) e fonte externa (mie.MEIE); só disparam
+    // depois de mstatus.MIE = 1
+    __asm__ volatile ("csrw mtvec, %0" :: "r"(trap_entry));
+    __asm__ volatile ("csrw mie, %0" :: "r"(0x800));
+    dotp_ev_pending_write(1 << CSR_DOTP_EV_PENDING_DONE_OFFSET);
+    dotp_ev_enable_write(1 << CSR_DOTP_EV_ENABLE_DONE_OFFSET);
+    irq_setmask(irq_getmask() | (1u << DOTP_INTERRUPT));
+    irq_setie(1);
+}
+
+static void hw_wait_irq(uint32_t seen) {
+    // Com MIE desligado a IRQ pendente ainda acorda o wfi: sem corrida entre o teste
+    // do contador e o wfi. O ISR roda na janela em que MIE volta a 1.
+    irq_setie(0);
+    while (dotp_irq_count == seen) {
+        __asm__ volatile ("wfi");
+        irq_setie(1);
+        irq_setie(0);
+    }
+    irq_setie(1);
+}
+
+// Polling x IRQ: latência start -> resultado e ciclos em que a CPU fica livre (em wfi)
+// enquanto o acelerador calcula. Médias de 16 operações (sem divisão de 64 bits).
+static void irq_demo(const int32_t a[DOTP_N], const int32_t b[DOTP_N]) {
+    enum { OPS_LOG2 = 4, OPS = 1 << OPS_LOG2 };
+    int64_t expected = sw_dotp(a, b);
+    uint64_t poll_cycles = 0, irq_cycles = 0, free_cycles = 0;
+    bool ok = true;
+
+    uart_write_str("\nConclusao por IRQ x polling\n");
+    for (int k = 0; k < OPS; ++k) {
+        hw_write_vectors(a, b);
+        uint64_t t0 = cycles_now();
+        hw_start();
+        while (!hw_done());
+        ok &= hw_result() == expected;
+        poll_cycles += cycles_now() - t0;
+    }
+
+    hw_irq_enable();
+    for (int k = 0; k < OPS; ++k) {
+        hw_write_vectors(a, b);
+        // Descarta um done pendente de antes deste start: só o evento desta operação
+        // acorda hw_wait_irq()
+        dotp_ev_pending_write(1 << CSR_DOTP_EV_PENDING_DONE_OFFSET);
+        uint32_t seen = dotp_irq_count;
+        uint64_t t0 = cycles_now();
+        hw_start();
+        uint64_t t1 = cycles_now();
+        hw_wait_irq(seen);
+        uint64_t t2 = cycles_now();
+        ok &= hw_result() == expected;
+        irq_cycles  += cycles_now() - t0;
+        free_cycles += t2 - t1;
+    }
+
+    uart_write_str("Latencia polling/op: "); uart_write_hex64(poll_cycles >> OPS_LOG2); uart_write_str("\n");
+    uart_write_str("Latencia IRQ/op:     "); uart_write_hex64(irq_cycles >> OPS_LOG2); uart_write_str("\n");
+    uart_write_str("Ciclos livres/op:    "); uart_write_hex64(free_cycles >> OPS_LOG2); uart_write_str("\n");
+    uart_write_str(ok ? "[OK] IRQ\n" : "[ERRO] IRQ\n");
+}
+#endif
+
+#if defined(CSR_DOTP_LEVEL_ADDR) && !defined(CSR_DOTP_PUSH_ADDR)
+// Núcleo pipeline: cada start enfileira os operandos atuais; os resultados ficam na
+// FIFO (done = FIFO não vazia, a leitura de result_hi retira o resultado).
+#define PIPE_DEMO_OPS 8
+
+static void hw_wait_ready(void) {
+    // Operandos só podem ser reescritos depois que o núcleo aceitou o start anterior
+    while (!dotp_ready_read());
+}
+
+static void pipe_demo(const int32_t a[DOTP_N], const int32_t b[DOTP_N]) {
+    int32_t bk[DOTP_N];
+    int64_t expected[PIPE_DEMO_OPS];
+    int ok = 1;
+    // Dispara PIPE_DEMO_OPS operações seguidas (B escalado por k), sem esperar resultados
+    for (int k = 0; k < PIPE_DEMO_OPS; ++k) {
+        for (int i = 0; i < DOTP_N; ++i) bk[i] = b[i] * (k + 1);
+        expected[k] = sw_dotp(a, bk);
+        hw_wait_ready();
+        hw_write_vectors(a, bk);
+        dotp_start_write(1);
+    }
+    hw_wait_ready();
+    uart_write_str("FIFO level: "); uart_write_hex32(dotp_level_read()); uart_write_str("\n");
+    for (int k = 0; k < PIPE_DEMO_OPS; ++k) {
+        while (!hw_done());
+        if (hw_result() != expected[k]) ok = 0;
+    }
+    if (ok) uart_write_str("[OK] Pipeline coincide!\n");
+    else    uart_write_str("[ERRO] Pipeline diferente!\n");
+}
+#endif
+
+#ifdef CSR_DOTP_PUSH_ADDR
+// Fila de jobs: push copia os operandos atuais com uma tag para a fila; o núcleo executa
+// os jobs em sequência e devolve (resultado, tag) na FIFO de resultados.
+#define QUEUE_DEMO_OPS 16
+
+static bool hw_queue_ready(void) {
+    // Há lugar na fila para mais um job
+    return dotp_ready_read();
+}
+
+static void hw_push(const int32_t a[DOTP_N], const int32_t b[DOTP_N], uint8_t tag) {
+    hw_write_vectors(a, b);
+    dotp_push_write(tag);
+}
+
+static bool hw_pop(int64_t *result, uint8_t *tag) {
+    if (!hw_done()) return false;
+    // A tag é lida antes de result_hi, cuja leitura retira o resultado da FIFO
+    *tag    = dotp_tag_read();
+    *result = hw_result();
+    return true;
+}
+
+static void queue_demo(const int32_t a[DOTP_N], const int32_t b[DOTP_N]) {
+    int32_t bk[DOTP_N];
+    int64_t expected[QUEUE_DEMO_OPS];
+    int pushed = 0, popped = 0, ok = 1;
+    uint64_t t0 = cycles_now();
+    // Enquanto o núcleo executa a fila, a CPU prepara o próximo job (B escalado por k)
+    // e o valor esperado; com a fila cheia, drena os resultados prontos
+    while (popped < QUEUE_DEMO_OPS) {
+        if (pushed < QUEUE_DEMO_OPS && hw_queue_ready()) {
+            for (int i = 0; i < DOTP_N; ++i) bk[i] = b[i] * (pushed + 1);
+            expected[pushed] = sw_dotp(a, bk);
+            hw_push(a, bk, (uint8_t)pushed);
+            pushed++;
+        } else {
+            int64_t result;
+            uint8_t tag;
+            if (hw_pop(&result, &tag)) {
+                if (tag >= QUEUE_DEMO_OPS || result != expected[tag]) ok = 0;
+                popped++;
+            }
+        }
+    }
+    uint64_t cycles = cycles_now() - t0;
+    uart_write_str("Fila: jobs "); uart_write_hex32(QUEUE_DEMO_OPS);
+    uart_write_str(", ciclos "); uart_write_hex64(cycles); uart_write_str("\n");
+    if (ok) uart_write_str("[OK] Fila coincide!\n");
+    else    uart_write_str("[ERRO] Fila diferente!\n");
+}
+#endif
+
+#ifdef CSR_DOTP_MODE_ADDR
+// Precisão dos operandos (CSR mode): cada palavra leva 2 int16 ou 4 int8 (lane 0 nos
+// bits menos significativos), com soma em 64 bits: 2-4x elementos pelo mesmo número de
+// escritas de CSR e de ciclos do núcleo
+#define DOTP_MODE_INT32 0
+#define DOTP_MODE_INT16 1
+#define DOTP_MODE_INT8  2
+
+static int64_t hw_dotp_words(const int32_t a[DOTP_N], const int32_t b[DOTP_N], uint32_t mode) {
+    dotp_mode_write(mode);
+    hw_write_vectors(a, b);
+    hw_start();
+    while (!hw_done());
+    int64_t result = hw_result();
+    dotp_mode_write(DOTP_MODE_INT32);
+    return result;
+}
+
+static int64_t hw_dotp_int16(const int16_t a[2 * DOTP_N], const int16_t b[2 * DOTP_N]) {
+    int32_t wa[DOTP_N], wb[DOTP_N];
+    for (int i = 0; i < DOTP_N; ++i) {
+        wa[i] = (int32_t)((uint32_t)(uint16_t)a[2*i] | (uint32_t)(uint16_t)a[2*i + 1] << 16);
+        wb[i] = (int32_t)((uint32_t)(uint16_t)b[2*i] | (uint32_t)(uint16_t)b[2*i + 1] << 16);
+    }
+    return hw_dotp_words(wa, wb, DOTP_MODE_INT16);
+}
+
+static int64_t hw_dotp_int8(const int8_t a[4 * DOTP_N], const int8_t b[4 * DOTP_N]) {
+    int32_t wa[DOTP_N], wb[DOTP_N];
+    for (int i = 0; i < DOTP_N; ++i) {
+        uint32_t x = 0, y = 0;
+        for (int k = 0; k < 4; ++k) {
+            x |= (uint32_t)(uint8_t)a[4*i + k] << (8 * k);
+            y |= (uint32_t)(uint8_t)b[4*i + k] << (8 * k);
+        }
+        wa[i] = (int32_t)x;
+        wb[i] = (int32_t)y;
+    }
+    return hw_dotp_words(wa, wb, DOTP_MODE_INT8);
+}
+
+static void simd_demo(void) {
+    int16_t a16[2 * DOTP_N], b16[2 * DOTP_N];
+    int8_t  a8[4 * DOTP_N],  b8[4 * DOTP_N];
+    int64_t sw16 = 0, sw8 = 0;
+    for (int i = 0; i < 2 * DOTP_N; ++i) {
+        a16[i] = (int16_t)((i & 1) ? -32768 + 97 * i : 1200 * i - 7);
+        b16[i] = (int16_t)(32767 - 301 * i);
+        sw16 += (int32_t)a16[i] * b16[i];
+    }
+    for (int i = 0; i < 4 * DOTP_N; ++i) {
+        a8[i] = (int8_t)((i & 1) ? -128 + 3 * i : 127 - 5 * i);
+        b8[i] = (int8_t)(i * 13 - 100);
+        sw8 += a8[i] * b8[i];
+    }
+    uint64_t t0 = cycles_now();
+    int64_t hw16 = hw_dotp_int16(a16, b16);
+    uint64_t t1 = cycles_now();
+    int64_t hw8 = hw_dotp_int8(a8, b8);
+    uint64_t t2 = cycles_now();
+    uart_write_str("SIMD int16 x"); uart_write_hex32(2 * DOTP_N);
+    uart_write_str(": "); uart_write_hex64((uint64_t)hw16);
+    uart_write_str(", ciclos "); uart_write_hex64(t1 - t0); uart_write_str("\n");
+    uart_write_str("SIMD int8 x"); uart_write_hex32(4 * DOTP_N);
+    uart_write_str(": "); uart_write_hex64((uint64_t)hw8);
+    uart_write_str(", ciclos "); uart_write_hex64(t2 - t1); uart_write_str("\n");
+    if (hw16 == sw16 && hw8 == sw8) uart_write_str("[OK] SIMD coincide!\n");
+    else                             uart_write_str("[ERRO] SIMD diferente!\n");
+}
+#endif
+
+#if defined(CSR_DOTP_B_DATA_ADDR) && defined(CSR_DOTP_START_ACCUMULATE_OFFSET)
+// GEMV com x residente: y = M.x com linhas de DOTP_B_TILES*DOTP_N elementos. x é
+// carregado uma vez; cada linha escreve só A, bloco a bloco, e os blocos seguintes
+// usam accumulate (o acumulador não é zerado), sem somas na CPU.
+#define GEMV_ROWS 4
+#define GEMV_COLS (DOTP_B_TILES * DOTP_N)
+
+static void hw_start_tile(bool accumulate) {
+    // start é amostrado na escrita (um único cálculo por escrita)
+    dotp_start_write(1 | ((uint32_t)accumulate << CSR_DOTP_START_ACCUMULATE_OFFSET));
+}
+
+static void gemv_demo(void) {
+    static int32_t m[GEMV_ROWS][GEMV_COLS];
+    static int32_t x[GEMV_COLS];
+    int64_t expected[GEMV_ROWS];
+    int ok = 1;
+    for (int k = 0; k < GEMV_COLS; ++k) x[k] = (k & 1) ? -(k + 1) : 3 * k + 1;
+    for (int r = 0; r < GEMV_ROWS; ++r) {
+        expected[r] = 0;
+        for (int k = 0; k < GEMV_COLS; ++k) {
+            m[r][k] = (r + 1) * (k - 5) * 1000;
+            expected[r] += (int64_t)m[r][k] * (int64_t)x[k];
+        }
+    }
+    hw_load_b(0, x, GEMV_COLS);
+    uint64_t t0 = cycles_now();
+    for (int r = 0; r < GEMV_ROWS; ++r) {
+        for (int t = 0; t < DOTP_B_TILES; ++t) {
+            dotp_tile_write(t);
+            hw_write_a(&m[r][t * DOTP_N]);
+            hw_start_tile(t > 0);
+            while (!hw_done());
+        }
+        if (hw_result() != expected[r]) ok = 0;
+    }
+    uint64_t cycles = cycles_now() - t0;
+    uart_write_str("GEMV: linhas "); uart_write_hex32(GEMV_ROWS);
+    uart_write_str(", colunas "); uart_write_hex32(GEMV_COLS);
+    uart_write_str(", ciclos "); uart_write_hex64(cycles); uart_write_str("\n");
+    if (ok) uart_write_str("[OK] GEMV coincide!\n");
+    else    uart_write_str("[ERRO] GEMV diferente!\n");
+}
+#endif
+
+#ifdef CSR_DOTP_DMA_START_ADDR
+// Modo DMA: o acelerador busca A e B na memória (qualquer tamanho) e acumula em 64 bits
+#define DMA_DEMO_LEN 1024
+
+static int64_t hw_dma_dotp(const int32_t *a, const int32_t *b, uint32_t len) {
+    dotp_dma_a_base_write((uint32_t)a);
+    dotp_dma_b_base_write((uint32_t)b);
+    dotp_dma_length_write(len);
+    dotp_dma_start_write(1);
+    while (!dotp_dma_done_read());
+    uint32_t lo = dotp_dma_result_lo_read();
+    uint32_t hi = dotp_dma_result_hi_read();
+    return ((int64_t)(int32_t)hi << 32) | lo;
+}
+
+static void dma_demo(void) {
+    // Vetores na RAM principal (integrated_main_ram), fora da SRAM do firmware
+    int32_t *a = (int32_t *)MAIN_RAM_BASE;
+    int32_t *b = a + DMA_DEMO_LEN;
+    int64_t sw = 0;
+    for (int i = 0; i < DMA_DEMO_LEN; ++i) {
+        a[i] = (i & 1) ? -(i * 3) : (i * 7);
+        b[i] = 1000 - i;
+        sw += (int64_t)a[i] * (int64_t)b[i];
+    }
+    int64_t hw = hw_dma_dotp(a, b, DMA_DEMO_LEN);
+    uart_write_str("DMA Software: "); uart_write_hex64((uint64_t)sw); uart_write_str("\n");
+    uart_write_str("DMA Hardware: "); uart_write_hex64((uint64_t)hw); uart_write_str("\n");
+    if (hw == sw) uart_write_str("[OK] DMA coincide!\n");
+    else          uart_write_str("[ERRO] DMA diferente!\n");
+}
+#endif
+
+#if DOTP_UNITS > 1
+// Despachante: os jobs vão em round-robin para as unidades livres e cada unidade
+// lembra o índice do job que executa; o resultado volta para results[job] quando a
+// unidade termina, em qualquer ordem. Uma linha "@dispatch" por número de unidades
+// usadas (1..DOTP_UNITS) mede a vazão agregada (tools/fw_bench_report.py).
+#define DISPATCH_JOBS 32
+#ifndef CONFIG_CLOCK_FREQUENCY
+#define CONFIG_CLOCK_FREQUENCY 0
+#endif
+
+static void unit_write_vectors(uint32_t unit, const int32_t a[DOTP_N], const int32_t b[DOTP_N]) {
+    uint32_t base = unit * DOTP_UNIT_STRIDE;
+    for (int i = 0; i < DOTP_N; ++i) {
+        csr_wr_uint32((uint32_t)a[i], DOTP_A_ADDR + base + i * DOTP_OPERAND_STRIDE);
+        csr_wr_uint32((uint32_t)b[i], DOTP_B_ADDR + base + i * DOTP_OPERAND_STRIDE);
+    }
+}
+
+static void unit_start(uint32_t unit) {
+    // As duas escritas no barramento já mantêm o pulso por mais de um ciclo
+    csr_wr_uint32(1, CSR_DOTP0_START_ADDR + unit * DOTP_UNIT_STRIDE);
+    csr_wr_uint32(0, CSR_DOTP0_START_ADDR + unit * DOTP_UNIT_STRIDE);
+}
+
+static bool unit_done(uint32_t unit) {
+    return csr_rd_uint32(CSR_DOTP0_DONE_ADDR + unit * DOTP_UNIT_STRIDE);
+}
+
+static int64_t unit_result(uint32_t unit) {
+    uint32_t lo = csr_rd_uint32(CSR_DOTP0_RESULT_LO_ADDR + unit * DOTP_UNIT_STRIDE);
+    uint32_t hi = csr_rd_uint32(CSR_DOTP0_RESULT_HI_ADDR + unit * DOTP_UNIT_STRIDE);
+    return ((int64_t)(int32_t)hi << 32) | lo;
+}
+
+static void dispatch(uint32_t units, const int32_t (*a)[DOTP_N], const int32_t (*b)[DOTP_N],
+                     int64_t *results, uint32_t jobs) {
+    int32_t busy[DOTP_UNITS];    // job em execução em cada unidade (-1: livre)
+    uint32_t next = 0, left = jobs;
+    for (uint32_t u = 0; u < units; ++u) busy[u] = -1;
+    while (left) {
+        for (uint32_t u = 0; u < units; ++u) {
+            if (busy[u] >= 0 && unit_done(u)) {
+                results[busy[u]] = unit_result(u);
+                busy[u] = -1;
+                --left;
+            }
+            if (busy[u] < 0 && next < jobs) {
+                unit_write_vectors(u, a[next], b[next]);
+                unit_start(u);
+                busy[u] = (int32_t)next++;
+            }
+        }
+    }
+}
+
+static void dispatch_field(const char* name, uint64_t v) {
+    uart_write_str(" "); uart_write_str(name); uart_write_str("="); uart_write_hex64(v);
+}
+
+static void dispatch_demo(void) {
+    static const int32_t A8[8] = {1, -2, 3, -4, 5, -6, 7, -8};
+    static const int32_t B8[8] = {8, 7, -6, -5, 4, 3, -2, -1};
+    static int32_t a[DISPATCH_JOBS][DOTP_N], b[DISPATCH_JOBS][DOTP_N];
+    static int64_t expected[DISPATCH_JOBS], results[DISPATCH_JOBS];
+    for (int j = 0; j < DISPATCH_JOBS; ++j) {
+        for (int i = 0; i < DOTP_N; ++i) {
+            a[j][i] = A8[(i + j) % 8] * (j + 1);
+            b[j][i] = B8[i % 8] - j;
+        }
+        expected[j] = sw_dotp(a[j], b[j]);
+    }
+
+    uint32_t total_errors = 0;
+    for (uint32_t units = 1; units <= DOTP_UNITS; ++units) {
+        for (int j = 0; j < DISPATCH_JOBS; ++j) results[j] = 0;
+        uint64_t t0 = cycles_now();
+        dispatch(units, a, b, results, DISPATCH_JOBS);
+        uint64_t cycles = cycles_now() - t0;
+        uint32_t errors = 0;
+        for (int j = 0; j < DISPATCH_JOBS; ++j) errors += results[j] != expected[j];
+        total_errors += errors;
+        uart_write_str("@dispatch");
+        dispatch_field("units", units);
+        dispatch_field("jobs", DISPATCH_JOBS);
+        dispatch_field("cycles", cycles);
+        dispatch_field("clk", CONFIG_CLOCK_FREQUENCY);
+        dispatch_field("errors", errors);
+        uart_write_str("\n");
+    }
+    if (total_errors == 0) uart_write_str("[OK] Despacho em varias unidades coincide!\n");
+    else                   uart_write_str("[ERRO] Despacho com resultados diferentes!\n");
+}
+#endif
+
+#if defined(DOTP_BENCH_ITERS) && DOTP_BENCH_ITERS > 0 && defined(CSR_TIMER0_UPTIME_CYCLES_ADDR)
+// Benchmark (make -C ip BENCH_ITERS=K): para cada conjunto de vetores, K iterações de
+// sw_dotp x caminho completo do hardware, este dividido em escrita dos operandos,
+// start + espera por done e leitura do resultado. Uma linha "@bench" por conjunto,
+// com somas de ciclos em hex (sem divisão de 64 bits aqui); o relatório é feito por
+// tools/fw_bench_report.py. Cada intervalo desconta o custo de cycles_now().
+#define BENCH_DATASETS 4
+#ifndef CONFIG_CLOCK_FREQUENCY
+#define CONFIG_CLOCK_FREQUENCY 0
+#endif
+
+// Fora da análise interprocedural: o GCC não pode mover o cálculo para fora das
+// leituras do timer nem reaproveitá-lo entre iterações
+__attribute__((noipa)) static int64_t bench_sw_dotp(const int32_t a[DOTP_N], const int32_t b[DOTP_N]) {
+    return sw_dotp(a, b);
+}
+
+static uint32_t bench_rand(uint32_t *state) {
+    // xorshift32
+    uint32_t x = *state;
+    x ^= x << 13;
+    x ^= x >> 17;
+    x ^= x << 5;
+    return *state = x;
+}
+
+static void bench_fill(int ds, uint32_t *state, int32_t a[DOTP_N], int32_t b[DOTP_N]) {
+    static const int32_t A8[8] = {1, -2, 3, -4, 5, -6, 7, -8};
+    static const int32_t B8[8] = {8, 7, -6, -5, 4, 3, -2, -1};
+    for (int i = 0; i < DOTP_N; ++i) {
+        switch (ds) {
+        case 0:  a[i] = A8[i % 8]; b[i] = B8[i % 8]; break;        // demo
+        case 1:  a[i] = 0; b[i] = 0; break;                        // zeros
+        case 2:  a[i] = (i & 1) ? INT32_MIN : INT32_MAX;           // extremos
+                 b[i] = (i & 2) ? INT32_MAX : INT32_MIN; break;
+        default: a[i] = (int32_t)bench_rand(state);                // aleatorio
+                 b[i] = (int32_t)bench_rand(state); break;
+        }
+    }
+}
+
+static uint64_t bench_delta(uint64_t t0, uint64_t t1, uint64_t overhead) {
+    uint64_t d = t1 - t0;
+    return d > overhead ? d - overhead : 0;
+}
+
+static void bench_field(const char* name, uint64_t v) {
+    uart_write_str(" "); uart_write_str(name); uart_write_str("="); uart_write_hex64(v);
+}
+
+static void bench_run(void) {
+    static const char* names[BENCH_DATASETS] = {"demo", "zeros", "extremos", "aleatorio"};
+    int32_t a[DOTP_N], b[DOTP_N];
+    uint32_t state = 0x2545F491u;
+
+    // Custo de uma leitura do timer: menor intervalo entre duas leituras seguidas
+    uint64_t overhead = ~(uint64_t)0;
+    for (int k = 0; k < 16; ++k) {
+        uint64_t t0 = cycles_now();
+        uint64_t d  = cycles_now() - t0;
+        if (d < overhead) overhead = d;
+    }
+
+    uart_write_str("@bench begin");
+    bench_field("n", DOTP_N);
+    bench_field("lanes", DOTP_LANES);
+    bench_field("iters", DOTP_BENCH_ITERS);
+    bench_field("clk", CONFIG_CLOCK_FREQUENCY);
+    bench_field("overhead", overhead);
+    uart_write_str("\n");
+
+    for (int ds = 0; ds < BENCH_DATASETS; ++ds) {
+        uint64_t sw = 0, sw_min = ~(uint64_t)0, write = 0, compute = 0, read = 0, hw_min = ~(uint64_t)0;
+        uint32_t errors = 0;
+        bench_fill(ds, &state, a, b);
+        for (int k = 0; k < DOTP_BENCH_ITERS; ++k) {
+            if (k && ds == BENCH_DATASETS - 1) bench_fill(ds, &state, a, b);
+
+            uint64_t t0 = cycles_now();
+            int64_t expected = bench_sw_dotp(a, b);
+            uint64_t t1 = cycles_now();
+            uint64_t d  = bench_delta(t0, t1, overhead);
+            sw += d;
+            if (d < sw_min) sw_min = d;
+
+            t0 = cycles_now();
+            hw_write_vectors(a, b);
+            t1 = cycles_now();
+            hw_start();
+            while (!hw_done());
+            uint64_t t2 = cycles_now();
+            int64_t result = hw_result();
+            uint64_t t3 = cycles_now();
+            uint64_t dw = bench_delta(t0, t1, overhead);
+            uint64_t dc = bench_delta(t1, t2, overhead);
+            uint64_t dr = bench_delta(t2, t3, overhead);
+            write += dw; compute += dc; read += dr;
+            if (dw + dc + dr < hw_min) hw_min = dw + dc + dr;
+            errors += result != expected;
+        }
+        uart_write_str("@bench ds="); uart_write_str(names[ds]);
+        bench_field("sw", sw);
+        bench_field("sw_min", sw_min);
+        bench_field("write", write);
+        bench_field("compute", compute);
+        bench_field("read", read);
+        bench_field("hw_min", hw_min);
+        bench_field("errors", errors);
+        uart_write_str("\n");
+    }
+    uart_write_str("@bench end\n");
+}
+#endif
+
+#ifdef CSR_DOTP_PERF_CONTROL_ADDR
+// Contadores de desempenho (64 bits): os CSRs guardam o último snapshot
+static void perf_clear(void) {
+    dotp_perf_control_write(1 << CSR_DOTP_PERF_CONTROL_CLEAR_OFFSET);
+}
+
+static void perf_print_counter(const char* name, uint64_t v) {
+    uart_write_str("  "); uart_write_str(name); uart_write_str(": ");
+    uart_write_hex64(v); uart_write_str("\n");
+}
+
+static void perf_report(void) {
+    dotp_perf_control_write(1 << CSR_DOTP_PERF_CONTROL_SNAPSHOT_OFFSET);
+    uart_write_str("Contadores do acelerador (ciclos):\n");
+    perf_print_counter("busy        ", dotp_perf_busy_cycles_read());
+    perf_print_counter("idle        ", dotp_perf_idle_cycles_read());
+    perf_print_counter("ops         ", dotp_perf_ops_read());
+    perf_print_counter("latency_last", dotp_perf_latency_last_read());
+    perf_print_counter("latency_max ", dotp_perf_latency_max_read());
+    perf_print_counter("host_gap    ", dotp_perf_host_gap_read());
+}
+#endif
+
+#ifdef CSR_UART_BASE
+// Modo offload: laço de comandos binário pela UART (protocolo em ip/offload_proto.py).
+// Quadro: A5 5A | tipo | seq | len (u16) | payload | crc16 (CCITT-FALSE de tipo..payload),
+// inteiros little-endian. BATCH traz count pares (a, b) de int32 e devolve count int64.
+#define OFFLOAD_CMD_INFO    0x01
+#define OFFLOAD_CMD_BATCH   0x02
+#define OFFLOAD_RSP_INFO    0x81
+#define OFFLOAD_RSP_BATCH   0x82
+#define OFFLOAD_RSP_ERROR   0xFF
+#define OFFLOAD_ERR_CRC     1
+#define OFFLOAD_ERR_LENGTH  2
+#define OFFLOAD_ERR_COMMAND 3
+// Resultados ficam guardados até o CRC do comando ser conferido
+#define OFFLOAD_BATCH_MAX   32
+// A FIFO de RX da UART tem 16 bytes: enquanto a resposta sai (até 2 + 8 * BATCH_MAX
+// bytes), o próximo comando em voo chega no mesmo ritmo e vai para este anel
+#define OFFLOAD_RX_RING     512
+
+static uint8_t  offload_ring[OFFLOAD_RX_RING];
+static uint32_t offload_head, offload_tail;
+static uint16_t offload_crc;
+
+static uint16_t offload_crc16(uint16_t crc, uint8_t byte) {
+    crc ^= (uint16_t)byte << 8;
+    for (int i = 0; i < 8; ++i)
+        crc = (crc & 0x8000) ? (uint16_t)((crc << 1) ^ 0x1021) : (uint16_t)(crc << 1);
+    return crc;
+}
+
+static void offload_poll_rx(void) {
+    while (!uart_rxempty_read()) {
+        uint32_t next = (offload_head + 1) % OFFLOAD_RX_RING;
+        if (next == offload_tail) return;   // anel cheio: o resto espera na FIFO da UART
+        offload_ring[offload_head] = (uint8_t)uart_rxtx_read();
+        offload_head = next;
+        uart_ev_pending_write(1 << CSR_UART_EV_PENDING_RX_OFFSET);
+    }
+}
+
+static uint8_t offload_getc(void) {
+    while (offload_head == offload_tail) offload_poll_rx();
+    uint8_t c = offload_ring[offload_tail];
+    offload_tail = (offload_tail + 1) % OFFLOAD_RX_RING;
+    offload_crc = offload_crc16(offload_crc, c);
+    return c;
+}
+
+static uint32_t offload_get(int bytes) {
+    uint32_t v = 0;
+    for (int i = 0; i < bytes; ++i) v |= (uint32_t)offload_getc() << (8 * i);
+    return v;
+}
+
+static void offload_putc(uint8_t c) {
+    while (uart_txfull_read()) offload_poll_rx();
+    uart_rxtx_write(c);
+    offload_crc = offload_crc16(offload_crc, c);
+}
+
+static void offload_put(uint64_t v, int bytes) {
+    for (int i = 0; i < bytes; ++i) offload_putc((uint8_t)(v >> (8 * i)));
+}
+
+static void offload_begin(uint8_t kind, uint8_t seq, uint16_t len) {
+    offload_putc(0xA5);
+    offload_putc(0x5A);
+    offload_crc = 0xFFFF;
+    offload_putc(kind);
+    offload_putc(seq);
+    offload_put(len, 2);
+}
+
+static void offload_end(void) {
+    uint16_t crc = offload_crc;
+    offload_put(crc, 2);
+}
+
+static void offload_error(uint8_t seq, uint8_t code) {
+    offload_begin(OFFLOAD_RSP_ERROR, seq, 1);
+    offload_putc(code);
+    offload_end();
+}
+
+static void offload_loop(void) {
+    static int64_t results[OFFLOAD_BATCH_MAX];
+    int32_t a[DOTP_N], b[DOTP_N];
+
+    uart_write_str("Modo offload: aguardando comandos\n");
+    for (;;) {
+        // Sincronismo A5 5A; bytes soltos antes dele são descartados
+        uint8_t prev = 0, c;
+        while (!((c = offload_getc()) == 0x5A && prev == 0xA5)) prev = c;
+
+        offload_crc = 0xFFFF;
+        uint8_t  kind = (uint8_t)offload_get(1);
+        uint8_t  seq  = (uint8_t)offload_get(1);
+        // len acima do lote máximo também é lido até o fim (e o CRC conferido): o
+        // host recebe ERR_LENGTH com o seq dele em vez de esperar até o timeout
+        uint32_t len  = offload_get(2);
+
+        uint32_t count = 0, left = len;
+        bool length_ok = true;
+        if (kind == OFFLOAD_CMD_BATCH) {
+            if (left >= 2) {
+                count = offload_get(2);
+                left -= 2;
+            }
+            length_ok = len >= 2 && count <= OFFLOAD_BATCH_MAX && left == count * 8 * DOTP_N;
+            // Calcula à medida que os pares chegam; o CRC só decide se a resposta sai
+            for (uint32_t k = 0; length_ok && k < count; ++k) {
+                for (int i = 0; i < DOTP_N; ++i) a[i] = (int32_t)offload_get(4);
+                for (int i = 0; i < DOTP_N; ++i) b[i] = (int32_t)offload_get(4);
+                left -= 8 * DOTP_N;
+                hw_write_vectors(a, b);
+                hw_start();
+                while (!hw_done());
+                results[k] = hw_result();
+            }
+        }
+        while (left--) offload_getc();
+        uint16_t crc = offload_crc;
+        if ((uint16_t)offload_get(2) != crc) {
+            offload_error(seq, OFFLOAD_ERR_CRC);
+        } else if (kind == OFFLOAD_CMD_INFO) {
+            offload_begin(OFFLOAD_RSP_INFO, seq, 6);
+            offload_put(DOTP_N, 2);
+            offload_put(DOTP_LANES, 2);
+            offload_put(OFFLOAD_BATCH_MAX, 2);
+            offload_end();
+        } else if (kind != OFFLOAD_CMD_BATCH) {
+            offload_error(seq, OFFLOAD_ERR_COMMAND);
+        } else if (!length_ok) {
+            offload_error(seq, OFFLOAD_ERR_LENGTH);
+        } else {
+            offload_begin(OFFLOAD_RSP_BATCH, seq, (uint16_t)(2 + 8 * count));
+            offload_put(count, 2);
+            for (uint32_t k = 0; k < count; ++k) offload_put((uint64_t)results[k], 8);
+            offload_end();
+        }
+    }
+}
+#endif
+
 int main(void) {
     uart_write_str("\nLiteX Dot-Product Accelerator Demo\n");
     uart_write_str("CPU: "); uart_write_str(CPU_DESCRIPTION); uart_write_str("\n");
 
-    // Vetores de teste
-    int32_t A[8] = {1, -2, 3, -4, 5, -6, 7, -8};
-    int32_t B[8] = {8, 7, -6, -5, 4, 3, -2, -1};
+#ifdef CSR_DOTP_PERF_CONTROL_ADDR
+    perf_clear();
+#endif
+
+    // Vetores de teste (padrão de 8 elementos repetido até DOTP_N)
+    static const int32_t A8[8] = {1, -2, 3, -4, 5, -6, 7, -8};
+    static const int32_t B8[8] = {8, 7, -6, -5, 4, 3, -2, -1};
+    int32_t A[DOTP_N], B[DOTP_N];
+    for (int i = 0; i < DOTP_N; ++i) {
+        A[i] = A8[i % 8];
+        B[i] = B8[i % 8];
+    }
 
     // Software
+    uint64_t t0 = cycles_now();
     int64_t sw = sw_dotp(A, B);
+    uint64_t sw_cycles = cycles_now() - t0;
     uart_write_str("Software: "); uart_write_hex64((uint64_t)sw); uart_write_str("\n");
 
-    // Hardware
+    // Hardware (escrita dos operandos + start + espera + leitura do resultado)
+    t0 = cycles_now();
     hw_write_vectors(A, B);
     hw_start();
     while (!hw_done());
     int64_t hw = hw_result();
+    uint64_t hw_cycles = cycles_now() - t0;
     uart_write_str("Hardware: "); uart_write_hex64((uint64_t)hw); uart_write_str("\n");
+#ifdef CSR_TIMER0_UPTIME_CYCLES_ADDR
+    uart_write_str("Ciclos SW: "); uart_write_hex64(sw_cycles); uart_write_str("\n");
+    uart_write_str("Ciclos HW: "); uart_write_hex64(hw_cycles); uart_write_str("\n");
+#else
+    (void)sw_cycles; (void)hw_cycles;
+#endif
 
     if (hw == sw) uart_write_str("[OK] Resultado coincide!\n");
     else           uart_write_str("[ERRO] Resultado diferente!\n");
 
-    // Loop simples para observar via UART
-    while (1) {
-        // Nada, poderia aguardar comandos via UART futuramente
-    }
+#if defined(DOTP_IRQ) && !defined(CSR_DOTP_LEVEL_ADDR)
+    irq_demo(A, B);
+#endif
+#ifdef CSR_DOTP_PUSH_ADDR
+    queue_demo(A, B);
+#elif defined(CSR_DOTP_LEVEL_ADDR)
+    pipe_demo(A, B);
+#endif
+#ifdef CSR_DOTP_MODE_ADDR
+    simd_demo();
+#endif
+#if defined(CSR_DOTP_B_DATA_ADDR) && defined(CSR_DOTP_START_ACCUMULATE_OFFSET)
+    gemv_demo();
+#endif
+#ifdef CSR_DOTP_DMA_START_ADDR
+    dma_demo();
+#endif
+#ifdef CSR_DOTP_PERF_CONTROL_ADDR
+    perf_report();
+#endif
+#if DOTP_UNITS > 1
+    dispatch_demo();
+#endif
+#if defined(DOTP_BENCH_ITERS) && DOTP_BENCH_ITERS > 0 && defined(CSR_TIMER0_UPTIME_CYCLES_ADDR)
+    bench_run();
+#endif
+
+    uart_write_str("Fim da demo.\n");
+
+#ifdef CSR_UART_BASE
+    // Daqui em diante a UART fala o protocolo binário (tools/offload_client.py)
+    offload_loop();
+#else
+    while (1);
+#endif
     return 0;
 }
@@ -4,119 +4,321 @@
 Simulador do firmware para testar a lógica de comunicação CSR
 """
 
+import argparse
+import collections
+import random
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-# Simular registradores CSR como dicionário global
-csr_regs = {}
+try:
+    import numpy as np
+except ImportError:
+    np = None  # só o modo em lote (batch_dotp) precisa de NumPy
+
+from csr_file import CSRFile
+
+# Registradores CSR do SoC simulado (CSRFile, endereçado por byte); init_csrs() o recria
+csr_regs = None
+
+# Contadores de desempenho (CSRs dotp_perf_*) e bits de dotp_perf_control
+PERF_COUNTERS = ["busy_cycles", "idle_cycles", "ops", "latency_last", "latency_max", "host_gap"]
+PERF_CLEAR    = 1 << 0
+PERF_SNAPSHOT = 1 << 1
+
+# Precisão dos operandos (CSR dotp_mode, DotProductAccel(with_simd=True)): bits por
+# elemento; cada palavra de 32 bits leva 32/bits elementos, lane 0 nos bits baixos
+MODE_INT32, MODE_INT16, MODE_INT8 = 0, 1, 2
+MODE_BITS = {MODE_INT32: 32, MODE_INT16: 16, MODE_INT8: 8}
+
+def dotp_csr_layout(n=8):
+    """Registradores do periférico dotp na ordem de declaração do DotProductAccel, para
+    simular sem csr.csv. É o superconjunto usado pelo modelo: start e push (fila),
+    mode, estado da fila, eventos e contadores de 64 bits."""
+    digits = len(str(n - 1))
+    regs  = [(f"{vec}{i:0{digits}d}", 1, "rw") for vec in "ab" for i in range(n)]
+    regs += [("start", 1, "rw"), ("push", 1, "rw"), ("mode", 1, "rw"),
+             ("done", 1, "ro"), ("result_lo", 1, "ro"), ("result_hi", 1, "ro"),
+             ("level", 1, "ro"), ("ready", 1, "ro"), ("tag", 1, "ro"), ("jobs", 1, "ro"),
+             ("ev_status", 1, "ro"), ("ev_pending", 1, "rw"), ("ev_enable", 1, "rw"),
+             ("perf_control", 1, "rw")]
+    regs += [(f"perf_{name}", 2, "ro") for name in PERF_COUNTERS]
+    return regs
+
+def unit_prefixes(units=1):
+    """Nomes dos periféricos como em SoCWithDotProduct(dotp_accels=K): "dotp" com uma
+    unidade, dotp0..dotp{K-1} com várias"""
+    return ["dotp"] if units == 1 else [f"dotp{k}" for k in range(units)]
 
 # Inicializar CSRs
-def init_csrs():
+def init_csrs(n=8, csv=None, units=1):
+    """Recria csr_regs: o mapa do csr.csv gerado pelo LiteX (endereços reais do SoC)
+    ou, sem arquivo, `units` periféricos com dotp_csr_layout(n)"""
     global csr_regs
-    # Entradas (a0-a7, b0-b7, start)
-    for i in range(8):
-        csr_regs[f'dotp_a{i}'] = 0
-        csr_regs[f'dotp_b{i}'] = 0
-    csr_regs['dotp_start'] = 0
-    
-    # Saídas (done, result_lo, result_hi)
-    csr_regs['dotp_done'] = 0
-    csr_regs['dotp_result_lo'] = 0
-    csr_regs['dotp_result_hi'] = 0
+    if csv:
+        csr_regs = CSRFile.from_csv(csv)
+    else:
+        csr_regs = CSRFile.from_layout([(prefix, dotp_csr_layout(n)) for prefix in unit_prefixes(units)])
+    for prefix in unit_prefixes(units):
+        if f"{prefix}_ready" in csr_regs:
+            csr_regs[f"{prefix}_ready"] = 1
+    return csr_regs
+
+def print_trace(event, accel):
+    """Hook de trace que imprime as transições do acelerador (saída histórica do simulador)"""
+    if event == "start":
+        print(f"🚀 Acelerador iniciou cálculo...")
+        print(f"   A = {accel.a_values}")
+        print(f"   B = {accel.b_values}")
+    elif event == "done":
+        csrs, prefix = accel.csrs, accel.prefix
+        print(f"✅ Cálculo concluído em {accel.cycle_count} ciclos")
+        print(f"   Resultado signed: {accel.result}")
+        for reg in ("result_lo", "result_hi"):
+            name = f"{prefix}_{reg}"
+            print(f"   {reg}: 0x{csrs[name]:08X} @ 0x{csrs.address(name):08X}")
 
 # Simular hardware do acelerador
 class DotProductAccelSim:
-    def __init__(self):
+    """Modelo do acelerador sobre os CSRs simulados.
+
+    fast=False : referência ciclo a ciclo (uma chamada de tick() por ciclo de clock)
+    fast=True  : ao capturar start, calcula o resultado e soma a latência conhecida ao
+                 contador de ciclos, indo direto para DONE (mesmos resultados, ciclos e
+                 contadores de desempenho que o modo ciclo a ciclo)
+    trace      : hook opcional trace(evento, accel) chamado em "start" e "done"
+                 (ex.: print_trace); sem hook o modelo não imprime nada
+    queue_depth: > 0 modela a fila de jobs (DotProductAccel(queue_depth=...)): push
+                 copia os operandos com a tag, o núcleo executa os jobs em sequência
+                 (N/LANES + 1 ciclos cada) e os resultados vão para uma FIFO de
+                 fifo_depth entradas, retirada pela leitura de result_hi
+    csrs       : CSRFile com os registradores (padrão: csr_regs de init_csrs())
+    prefix     : nome do periférico no mapa (dotp, dotp1, ...); cada instância usa os
+                 registradores {prefix}_*, o que permite vários aceleradores num mapa
+    """
+    def __init__(self, n=8, lanes=1, fast=False, trace=None, queue_depth=0, fifo_depth=16,
+                 csrs=None, prefix="dotp"):
+        if n < 1 or lanes < 1 or n % lanes:
+            raise ValueError(f"n ({n}) deve ser múltiplo de lanes ({lanes})")
+        self.n = n
+        self.lanes = lanes
+        self.fast = fast
+        self.trace = trace
+        # Ciclos no estado RUN por operação (N/LANES, como no RTL)
+        self.latency = n // lanes
         self.state = "IDLE"
         self.cycle_count = 0
-        self.a_values = [0] * 8
-        self.b_values = [0] * 8
+        self.cycles = 0       # ciclos de clock simulados desde o reset
+        self.a_values = [0] * n
+        self.b_values = [0] * n
+        self.mode = MODE_INT32
         self.result = 0
-        
+        # Contadores livres (copiados para os CSRs em snapshot)
+        self.perf = dict.fromkeys(PERF_COUNTERS, 0)
+        self.waiting = False  # done já visto, aguardando o próximo start
+        self.queue_depth = queue_depth
+        self.fifo_depth = fifo_depth
+        self.jobs = collections.deque()      # (a, b, tag, mode) aguardando o núcleo
+        self.results = collections.deque()   # (tag, resultado de 64 bits sem sinal)
+        self.tag = 0
+        self.push_pending = False            # escrita em push vista no próximo ciclo
+        self.start_pending = False           # escrita de 1 em start, idem
+
+        self.csrs = csrs = csr_regs if csrs is None else csrs
+        self.prefix = prefix
+        # Índices das palavras no banco (evita procurar nomes a cada ciclo)
+        self.words, self.swords = csrs.words, csrs.swords
+        self.i_a = csrs.index(operand_name(prefix, "a", n))
+        self.i_b = csrs.index(operand_name(prefix, "b", n))
+        idx = {reg: csrs.index(f"{prefix}_{reg}") if f"{prefix}_{reg}" in csrs else None
+               for reg in ("start", "push", "mode", "done", "result_lo", "result_hi",
+                           "level", "ready", "tag", "jobs", "perf_control")}
+        needed = ("push", "level", "ready", "tag", "jobs") if queue_depth else ("start",)
+        for reg in ("done", "result_lo", "result_hi") + needed:
+            if idx[reg] is None:
+                raise ValueError(f"registrador {prefix}_{reg} ausente no mapa de CSRs")
+        self.idx = idx
+        # Endereços no barramento, para os acessos do lado do firmware (csr_read/csr_write)
+        self.addr = {reg: csrs.address(f"{prefix}_{reg}") for reg in idx if idx[reg] is not None}
+        if queue_depth:
+            csrs.on_write(f"{prefix}_push", self._on_push)
+            # A leitura de result_hi retira o resultado da cabeça da FIFO, como no RTL
+            csrs.on_read(f"{prefix}_result_hi", self.pop_result)
+        else:
+            csrs.on_write(f"{prefix}_start", self._on_start)
+        # Contadores presentes no mapa (sem with_perf, nenhum)
+        self.perf_regs = [name for name in PERF_COUNTERS if f"{prefix}_perf_{name}" in csrs]
+
+    def _on_push(self, value):
+        self.push_pending = True
+
+    def _on_start(self, value):
+        if value & 1:
+            self.start_pending = True
+
+    def perf_tick(self):
+        """Atualiza os contadores de desempenho (um ciclo) e trata dotp_perf_control"""
+        i = self.idx["perf_control"]
+        control = 0
+        if i is not None:
+            control = self.words[i]
+            self.words[i] = 0  # campos pulse
+        if control & PERF_CLEAR:
+            self.perf = dict.fromkeys(PERF_COUNTERS, 0)
+            self.waiting = False
+        else:
+            if self.state == "COMPUTING":
+                self.perf['busy_cycles'] += 1
+            else:
+                self.perf['idle_cycles'] += 1
+            if self.waiting:
+                self.perf['host_gap'] += 1
+        if control & PERF_SNAPSHOT:
+            for name in self.perf_regs:
+                self.csrs[f"{self.prefix}_perf_{name}"] = self.perf[name]
+
+    def _operands(self):
+        """Operandos atuais dos CSRs (signed 32-bit)"""
+        n = self.n
+        return self.swords[self.i_a:self.i_a + n].tolist(), self.swords[self.i_b:self.i_b + n].tolist()
+
+    def _mode(self):
+        i = self.idx["mode"]
+        return MODE_INT32 if i is None else self.words[i]
+
+    def _capture(self, job=None):
+        """Captura os operandos (dos CSRs ou do job da fila) e entra em COMPUTING"""
+        if job is None:
+            self.a_values, self.b_values = self._operands()
+            self.mode = self._mode()
+            self.words[self.idx["done"]] = 0
+        else:
+            self.a_values, self.b_values, self.tag, self.mode = job
+        self.state = "COMPUTING"
+        self.cycle_count = 0
+        self.waiting = False
+        if self.trace:
+            self.trace("start", self)
+
+    def _finish(self):
+        """Calcula o resultado (64 bits com wraparound, como o RTL) e entra em DONE"""
+        result_u64 = simd_dot(self.a_values, self.b_values, self.mode) & 0xFFFFFFFFFFFFFFFF
+        self.result = result_u64 - (1 << 64) if result_u64 >= (1 << 63) else result_u64
+
+        if self.queue_depth:
+            self.results.append((self.tag, result_u64))
+            self._update_queue_csrs()
+        else:
+            # Dividir em 32-bit low e high
+            words, idx = self.words, self.idx
+            words[idx["result_lo"]] = result_u64 & 0xFFFFFFFF
+            words[idx["result_hi"]] = result_u64 >> 32
+            words[idx["done"]] = 1
+        self.state = "DONE"
+        self.waiting = True
+        self.perf['ops'] += 1
+        self.perf['latency_last'] = self.cycle_count
+        self.perf['latency_max'] = max(self.perf['latency_max'], self.cycle_count)
+        if self.trace:
+            self.trace("done", self)
+
+    def _update_queue_csrs(self):
+        """Cabeça da FIFO de resultados e ocupação das FIFOs nos CSRs"""
+        words, idx = self.words, self.idx
+        words[idx["done"]] = int(bool(self.results))
+        if self.results:
+            tag, result_u64 = self.results[0]
+            words[idx["tag"]] = tag
+            words[idx["result_lo"]] = result_u64 & 0xFFFFFFFF
+            words[idx["result_hi"]] = result_u64 >> 32
+        words[idx["level"]] = len(self.results)
+        words[idx["jobs"]] = len(self.jobs)
+        words[idx["ready"]] = int(len(self.jobs) < self.queue_depth)
+
+    def pop_result(self):
+        """Leitura de result_hi no modo fila: retira o resultado da cabeça da FIFO"""
+        if self.results:
+            self.results.popleft()
+            self._update_queue_csrs()
+
+    def _skip_compute(self):
+        """Modo rápido: salta os N/LANES ciclos de COMPUTING"""
+        self.cycles += self.latency
+        self.cycle_count = self.latency
+        self.perf['busy_cycles'] += self.latency
+        self._finish()
+
     def tick(self):
-        """Simula um ciclo de clock"""
-        global csr_regs
-        
-        if self.state == "IDLE":
-            if csr_regs['dotp_start'] == 1:
-                # Captura valores
-                for i in range(8):
-                    self.a_values[i] = csr_regs[f'dotp_a{i}']
-                    self.b_values[i] = csr_regs[f'dotp_b{i}']
-                
-                # Converte para signed 32-bit
-                for i in range(8):
-                    if self.a_values[i] >= 2**31:
-                        self.a_values[i] -= 2**32
-                    if self.b_values[i] >= 2**31:
-                        self.b_values[i] -= 2**32
-                
-                self.state = "COMPUTING"
-                self.cycle_count = 0
-                csr_regs['dotp_done'] = 0
-                print(f"🚀 Acelerador iniciou cálculo...")
-                print(f"   A = {self.a_values}")
-                print(f"   B = {self.b_values}")
-                
-        elif self.state == "COMPUTING":
+        """Simula um ciclo de clock (no modo rápido, uma operação inteira ao capturar start)"""
+        self.perf_tick()
+        self.cycles += 1
+        # start é um pulso (escrita de 1): fora de IDLE/DONE, o núcleo o ignora
+        start, self.start_pending = self.start_pending, False
+
+        if self.push_pending:
+            # Escrita em push: copia os operandos atuais com a tag (descartada com a fila cheia)
+            self.push_pending = False
+            if len(self.jobs) < self.queue_depth:
+                a, b = self._operands()
+                self.jobs.append((a, b, self.words[self.idx["push"]] & 0xFF, self._mode()))
+            self._update_queue_csrs()
+
+        if self.state == "COMPUTING":
             self.cycle_count += 1
-            if self.cycle_count >= 8:  # 8 ciclos para completar
-                # Calcular produto escalar
-                self.result = 0
-                for i in range(8):
-                    self.result += self.a_values[i] * self.b_values[i]
-                
-                # Converter para unsigned 64-bit para representação
-                if self.result < 0:
-                    result_u64 = (1 << 64) + self.result
-                else:
-                    result_u64 = self.result
-                
-                # Dividir em 32-bit low e high
-                csr_regs['dotp_result_lo'] = result_u64 & 0xFFFFFFFF
-                csr_regs['dotp_result_hi'] = (result_u64 >> 32) & 0xFFFFFFFF
-                csr_regs['dotp_done'] = 1
-                self.state = "DONE"
-                
-                print(f"✅ Cálculo concluído em {self.cycle_count} ciclos")
-                print(f"   Resultado signed: {self.result}")
-                print(f"   result_lo: 0x{csr_regs['dotp_result_lo']:08X}")
-                print(f"   result_hi: 0x{csr_regs['dotp_result_hi']:08X}")
-                
-        elif self.state == "DONE":
-            if csr_regs['dotp_start'] == 1:
-                self.state = "IDLE"  # Novo cálculo
-            # Mantém done=1 até novo start
-
-# Simular funções CSR do firmware
-def dotp_a0_write(val): csr_regs['dotp_a0'] = val & 0xFFFFFFFF
-def dotp_a1_write(val): csr_regs['dotp_a1'] = val & 0xFFFFFFFF
-def dotp_a2_write(val): csr_regs['dotp_a2'] = val & 0xFFFFFFFF
-def dotp_a3_write(val): csr_regs['dotp_a3'] = val & 0xFFFFFFFF
-def dotp_a4_write(val): csr_regs['dotp_a4'] = val & 0xFFFFFFFF
-def dotp_a5_write(val): csr_regs['dotp_a5'] = val & 0xFFFFFFFF
-def dotp_a6_write(val): csr_regs['dotp_a6'] = val & 0xFFFFFFFF
-def dotp_a7_write(val): csr_regs['dotp_a7'] = val & 0xFFFFFFFF
-
-def dotp_b0_write(val): csr_regs['dotp_b0'] = val & 0xFFFFFFFF
-def dotp_b1_write(val): csr_regs['dotp_b1'] = val & 0xFFFFFFFF
-def dotp_b2_write(val): csr_regs['dotp_b2'] = val & 0xFFFFFFFF
-def dotp_b3_write(val): csr_regs['dotp_b3'] = val & 0xFFFFFFFF
-def dotp_b4_write(val): csr_regs['dotp_b4'] = val & 0xFFFFFFFF
-def dotp_b5_write(val): csr_regs['dotp_b5'] = val & 0xFFFFFFFF
-def dotp_b6_write(val): csr_regs['dotp_b6'] = val & 0xFFFFFFFF
-def dotp_b7_write(val): csr_regs['dotp_b7'] = val & 0xFFFFFFFF
-
-def dotp_start_write(val): 
-    csr_regs['dotp_start'] = val & 0x1
-
-def dotp_done_read(): 
-    return csr_regs['dotp_done']
-
-def dotp_result_lo_read(): 
-    return csr_regs['dotp_result_lo']
-
-def dotp_result_hi_read(): 
-    return csr_regs['dotp_result_hi']
+            if self.cycle_count >= self.latency:  # N/LANES ciclos para completar
+                self._finish()
+
+        elif self.queue_depth:
+            # Próximo job da fila se houver lugar para o resultado
+            if self.jobs and len(self.results) < self.fifo_depth:
+                self._capture(self.jobs.popleft())
+                self._update_queue_csrs()
+                if self.fast:
+                    self._skip_compute()
+
+        elif start:
+            # IDLE ou DONE (done fica em 1 até novo start): como no RTL, start inicia
+            # nova operação direto dos dois estados
+            self._capture()
+            if self.fast:
+                self._skip_compute()
+
+# Acesso pelo barramento, como os acessores gerados em csr.h (periférico do acelerador
+# `accel`, ou dotp em csr_regs sem acelerador)
+def csr_write(reg, value, accel=None):
+    if accel is None:
+        csr_regs.write(csr_regs.address(f"dotp_{reg}"), value)
+    else:
+        accel.csrs.write(accel.addr[reg], value)
+
+def csr_read(reg, accel=None):
+    if accel is None:
+        return csr_regs.read(csr_regs.address(f"dotp_{reg}"))
+    return accel.csrs.read(accel.addr[reg])
+
+def dotp_start_write(val, accel=None):
+    csr_write("start", val & 0x1, accel)
+
+def dotp_mode_write(val, accel=None):
+    csr_write("mode", val & 0x3, accel)
+
+def dotp_push_write(val, accel=None):
+    csr_write("push", val & 0xFF, accel)
+
+def dotp_ready_read(accel=None):
+    return csr_read("ready", accel)
+
+def dotp_tag_read(accel=None):
+    return csr_read("tag", accel)
+
+def dotp_done_read(accel=None):
+    return csr_read("done", accel)
+
+def dotp_result_lo_read(accel=None):
+    return csr_read("result_lo", accel)
+
+def dotp_result_hi_read(accel=None):
+    return csr_read("result_hi", accel)
 
 # Simular as funções do firmware original
 def uart_write_str(s):
@@ -131,33 +333,86 @@ def uart_write_hex64(v):
 def sw_dotp(a, b):
     """Implementação software do produto escalar"""
     acc = 0
-    for i in range(8):
+    for i in range(len(a)):
         acc += a[i] * b[i]
     return acc
 
-def hw_write_vectors(a, b):
-    """Escreve vetores nos CSRs"""
-    dotp_a0_write(a[0] & 0xFFFFFFFF); dotp_a1_write(a[1] & 0xFFFFFFFF); dotp_a2_write(a[2] & 0xFFFFFFFF); dotp_a3_write(a[3] & 0xFFFFFFFF)
-    dotp_a4_write(a[4] & 0xFFFFFFFF); dotp_a5_write(a[5] & 0xFFFFFFFF); dotp_a6_write(a[6] & 0xFFFFFFFF); dotp_a7_write(a[7] & 0xFFFFFFFF)
-    dotp_b0_write(b[0] & 0xFFFFFFFF); dotp_b1_write(b[1] & 0xFFFFFFFF); dotp_b2_write(b[2] & 0xFFFFFFFF); dotp_b3_write(b[3] & 0xFFFFFFFF)
-    dotp_b4_write(b[4] & 0xFFFFFFFF); dotp_b5_write(b[5] & 0xFFFFFFFF); dotp_b6_write(b[6] & 0xFFFFFFFF); dotp_b7_write(b[7] & 0xFFFFFFFF)
+def hw_dotp_reference(a, b):
+    """sw_dotp com o wraparound de 64 bits do acumulador (resultado com sinal)"""
+    sw = sw_dotp(a, b) & 0xFFFFFFFFFFFFFFFF
+    return sw - (1 << 64) if sw >= (1 << 63) else sw
+
+def unpack_words(words, mode):
+    """Elementos signed empacotados nas palavras (32/bits por palavra, lane 0 primeiro)"""
+    bits = MODE_BITS.get(mode, 32)
+    mask, sign = (1 << bits) - 1, 1 << (bits - 1)
+    out = []
+    for w in words:
+        for k in range(32 // bits):
+            v = (w >> (bits * k)) & mask
+            out.append(v - (1 << bits) if v & sign else v)
+    return out
+
+def pack_words(values, mode):
+    """Empacota elementos signed em palavras de 32 bits (inverso de unpack_words);
+    len(values) deve ser múltiplo de 32/bits"""
+    bits = MODE_BITS.get(mode, 32)
+    per_word, mask = 32 // bits, (1 << bits) - 1
+    words = []
+    for i in range(0, len(values), per_word):
+        w = 0
+        for k, v in enumerate(values[i:i + per_word]):
+            w |= (v & mask) << (bits * k)
+        words.append(w - (1 << 32) if w >> 31 else w)
+    return words
+
+def simd_dot(a_words, b_words, mode=MODE_INT32):
+    """Produto escalar das palavras na precisão `mode` (sem wraparound)"""
+    if MODE_BITS.get(mode, 32) == 32:
+        return sum(x * y for x, y in zip(a_words, b_words))
+    return sum(x * y for x, y in zip(unpack_words(a_words, mode), unpack_words(b_words, mode)))
+
+def operand_name(prefix, vec, n):
+    """Nome do CSR do primeiro operando (a0/b0; com n > 10, a00/b00 como no wrapper)"""
+    return f"{prefix}_{vec}{0:0{len(str(n - 1))}d}"
+
+def hw_write_vectors(a, b, accel=None):
+    """Escreve os vetores nos CSRs a0..a{n-1}, b0..b{n-1} (contíguos no mapa: uma
+    escrita em bloco no banco de registradores)"""
+    csrs, prefix = (csr_regs, "dotp") if accel is None else (accel.csrs, accel.prefix)
+    csrs.write_bulk(csrs.address(operand_name(prefix, "a", len(a))), list(a) + list(b))
 
 def hw_start(accel: DotProductAccelSim):
-    """Gera um pulso em 'start' equivalente ao firmware C.
-    Seta start=1, avança um ciclo (tick) e então limpa para 0.
+    """Escrita de 1 em 'start', equivalente ao firmware C (o núcleo dispara na escrita;
+    o 0 escrito depois não tem efeito). Avança um ciclo para o acelerador capturar o
+    comando.
     """
-    dotp_start_write(1)
-    # Avança 1 ciclo para que o acelerador capture o comando
+    dotp_start_write(1, accel)
+    accel.tick()
+    dotp_start_write(0, accel)
+
+def dotp_perf_control_write(val, accel=None):
+    csr_write("perf_control", val, accel)
+
+def perf_report(accel: DotProductAccelSim):
+    """Snapshot e impressão dos contadores, como perf_report() no firmware C"""
+    dotp_perf_control_write(PERF_SNAPSHOT, accel)
     accel.tick()
-    # Limpa o start para evitar reexecuções involuntárias
-    dotp_start_write(0)
+    csrs, prefix = accel.csrs, accel.prefix
+    uart_write_str("Contadores do acelerador (ciclos):\n")
+    for name in PERF_COUNTERS:
+        uart_write_str(f"  {name:<12}: {csrs[f'{prefix}_perf_{name}']}\n")
+    busy = csrs[f'{prefix}_perf_busy_cycles']
+    total = busy + csrs[f'{prefix}_perf_idle_cycles']
+    if total:
+        uart_write_str(f"  utilização  : {100.0 * busy / total:.1f}%\n")
 
-def hw_done():
-    return dotp_done_read()
+def hw_done(accel=None):
+    return csr_read("done", accel)
 
-def hw_result():
-    lo = dotp_result_lo_read()
-    hi = dotp_result_hi_read()
+def hw_result(accel=None):
+    lo = csr_read("result_lo", accel)
+    hi = csr_read("result_hi", accel)
     # Reconstruir signed 64-bit
     result_u64 = (hi << 32) | lo
     if result_u64 >= (1 << 63):
@@ -165,19 +420,316 @@ def hw_result():
     else:
         return result_u64
 
+def hw_dotp(accel: DotProductAccelSim, a, b):
+    """Operação completa como no firmware C: escreve operandos, pulsa start e aguarda done"""
+    hw_write_vectors(a, b, accel)
+    hw_start(accel)
+    for _ in range(accel.latency + 1):
+        if hw_done(accel):
+            break
+        accel.tick()
+    return hw_result(accel)
+
+def hw_dotp_packed(accel: DotProductAccelSim, a, b, mode):
+    """Produto escalar de accel.n*32/bits elementos estreitos (int16/int8), como
+    hw_dotp_int8/int16 no firmware C: empacota, seleciona o modo e volta a int32"""
+    dotp_mode_write(mode, accel)
+    result = hw_dotp(accel, pack_words(a, mode), pack_words(b, mode))
+    dotp_mode_write(MODE_INT32, accel)
+    return result
+
+def hw_push(accel: DotProductAccelSim, a, b, tag):
+    """Enfileira um job como hw_push() no firmware C: operandos + escrita em push.
+    Avança 1 ciclo para que o acelerador copie os operandos para a fila."""
+    hw_write_vectors(a, b, accel)
+    dotp_push_write(tag, accel)
+    accel.tick()
+
+def hw_pop(accel: DotProductAccelSim):
+    """Retira o resultado da cabeça da FIFO: (tag, resultado) ou None se vazia
+    (a leitura de result_hi em hw_result retira o resultado, como no RTL)"""
+    if not hw_done(accel):
+        return None
+    tag = dotp_tag_read(accel)
+    return tag, hw_result(accel)
+
+def queue_run(accel: DotProductAccelSim, jobs, work=None):
+    """Fluxo do queue_demo() do firmware: enfileira os jobs [(a, b)] enquanto ready=1 e,
+    com a fila cheia, drena os resultados; `work(k)` é chamado antes de cada push
+    (trabalho da CPU sobreposto ao cálculo). Retorna [(tag, resultado)] na ordem de saída."""
+    results = []
+    pushed = 0
+    while len(results) < len(jobs):
+        if pushed < len(jobs) and dotp_ready_read(accel):
+            if work:
+                work(pushed)
+            a, b = jobs[pushed]
+            hw_push(accel, a, b, pushed & 0xFF)
+            pushed += 1
+        else:
+            popped = hw_pop(accel)
+            if popped is None:
+                accel.tick()
+            else:
+                results.append(popped)
+    return results
+
+class MultiAccelSim:
+    """K unidades independentes no mesmo banco de CSRs e no mesmo clock, como
+    SoCWithDotProduct(dotp_accels=K): dotp0..dotp{K-1}, uma página CSR cada.
+
+    tick() avança um ciclo em todas as unidades; `cycles` conta os ciclos do clock
+    comum (o despachante usa as unidades no modo ciclo a ciclo). Com fast=True as
+    unidades servem só para run_threaded(), onde cada uma conta os próprios ciclos.
+    """
+    def __init__(self, units, n=8, lanes=1, fast=False, csrs=None):
+        if units < 1:
+            raise ValueError(f"units deve ser >= 1 (recebido {units})")
+        prefixes = unit_prefixes(units)
+        if csrs is None:
+            csrs = CSRFile.from_layout([(prefix, dotp_csr_layout(n)) for prefix in prefixes])
+        self.csrs = csrs
+        self.n = n
+        self.fast = fast
+        self.units = [DotProductAccelSim(n, lanes, fast=fast, csrs=csrs, prefix=prefix)
+                      for prefix in prefixes]
+        self.cycles = 0
+
+    def tick(self):
+        for unit in self.units:
+            unit.tick()
+        self.cycles += 1
+
+    def run_threaded(self, jobs, workers=None):
+        """Jobs em round-robin fixo (job i na unidade i % K), cada unidade num thread de
+        um ThreadPoolExecutor. As unidades só tocam as próprias palavras do banco.
+        Retorna os resultados na ordem dos jobs; os ciclos simulados são os da unidade
+        mais carregada (max(unit.cycles)), já que em hardware elas rodam em paralelo.
+        O ganho de tempo de parede depende do GIL: o modelo é Python puro."""
+        results = [None] * len(jobs)
+        k = len(self.units)
+
+        def work(u):
+            unit = self.units[u]
+            for i in range(u, len(jobs), k):
+                a, b = jobs[i]
+                results[i] = hw_dotp(unit, a, b)
+
+        with ThreadPoolExecutor(max_workers=workers or k) as pool:
+            # list() propaga exceções dos threads
+            list(pool.map(work, range(k)))
+        return results
+
+def dispatch(multi: MultiAccelSim, jobs, units=None, issue_cycles=0):
+    """Despachante do firmware (dispatch() em firmware_dotp.c) sobre as primeiras
+    `units` unidades: a cada volta, cada unidade que terminou entrega o resultado do
+    seu job e cada unidade livre recebe o próximo job (operandos + pulso em start).
+    `issue_cycles` são ciclos de CPU cobrados por job despachado (escrita dos 2N
+    operandos pelo barramento; 0 = instantâneo, como em hw_dotp).
+    Retorna (resultados na ordem dos jobs, índices dos jobs na ordem de conclusão)."""
+    if multi.fast:
+        raise ValueError("dispatch usa o clock comum: crie MultiAccelSim com fast=False")
+    active = multi.units[:units or len(multi.units)]
+    results = [None] * len(jobs)
+    order = []
+    busy = [None] * len(active)       # job em execução em cada unidade
+    issued = 0
+    while len(order) < len(jobs):
+        for u, unit in enumerate(active):
+            if busy[u] is not None and hw_done(unit):
+                results[busy[u]] = hw_result(unit)
+                order.append(busy[u])
+                busy[u] = None
+            if busy[u] is None and issued < len(jobs):
+                a, b = jobs[issued]
+                hw_write_vectors(a, b, unit)
+                for _ in range(issue_cycles):
+                    multi.tick()
+                dotp_start_write(1, unit)
+                multi.tick()
+                dotp_start_write(0, unit)
+                busy[u] = issued
+                issued += 1
+        multi.tick()
+    return results, order
+
+def dispatch_scaling(max_units, num=256, n=8, lanes=1, issue_cycles=0, seed=0, threads=False):
+    """Vazão agregada do despachante com 1..max_units unidades sobre os mesmos `num`
+    jobs aleatórios: [{"units", "cycles", "ops_per_cycle", "scaling", "wall_s"}].
+    Com threads=True, mede também o tempo de parede de run_threaded (modo rápido)."""
+    rng = random.Random(seed)
+    jobs = [([rng.getrandbits(32) - (1 << 31) for _ in range(n)],
+             [rng.getrandbits(32) - (1 << 31) for _ in range(n)]) for _ in range(num)]
+    expected = [hw_dotp_reference(a, b) for a, b in jobs]
+    multi = MultiAccelSim(max_units, n, lanes)
+    rows = []
+    for units in range(1, max_units + 1):
+        start = multi.cycles
+        results, _ = dispatch(multi, jobs, units, issue_cycles)
+        if results != expected:
+            raise AssertionError(f"despacho em {units} unidade(s) difere de sw_dotp")
+        cycles = multi.cycles - start
+        row = {"units": units, "cycles": cycles, "ops_per_cycle": num / cycles}
+        row["scaling"] = row["ops_per_cycle"] / rows[0]["ops_per_cycle"] if rows else 1.0
+        if threads:
+            pool = MultiAccelSim(units, n, lanes, fast=True)
+            t0 = time.perf_counter()
+            if pool.run_threaded(jobs) != expected:
+                raise AssertionError(f"execução em threads com {units} unidade(s) difere de sw_dotp")
+            row["wall_s"] = time.perf_counter() - t0
+            row["thread_cycles"] = max(unit.cycles for unit in pool.units)
+        rows.append(row)
+    return rows
+
+def regress(num, n=8, lanes=1, fast=True, seed=0):
+    """Executa `num` operações com vetores aleatórios (32-bit signed) e confere cada
+    resultado contra sw_dotp (com wraparound de 64 bits).
+    Retorna (acelerador, lista de resultados); os ciclos ficam em accel.cycles."""
+    rng = random.Random(seed)
+    init_csrs(n)
+    accel = DotProductAccelSim(n, lanes, fast=fast)
+    results = []
+    for k in range(num):
+        a = [rng.getrandbits(32) - (1 << 31) for _ in range(n)]
+        b = [rng.getrandbits(32) - (1 << 31) for _ in range(n)]
+        hw = hw_dotp(accel, a, b)
+        sw = hw_dotp_reference(a, b)
+        if hw != sw:
+            raise AssertionError(f"op {k}: esperado={sw} obtido={hw}")
+        results.append(hw)
+    return accel, results
+
+# Linhas por bloco no modo em lote: limita os temporários int64 a ~64 MB
+BATCH_CHUNK_BYTES = 64 << 20
+
+# Ciclos do núcleo pipeline entre o último passo emitido e o resultado (S1..S3)
+PIPE_FILL_CYCLES = 3
+
+def batch_cycles(m, n=8, lanes=1, pipelined=False):
+    """Estimativa de ciclos do acelerador para `m` operações de `n` elementos.
+    Sequencial: captura de start + N/LANES ciclos por operação (igual a
+    DotProductAccelSim); pipeline: N/LANES ciclos por operação + enchimento."""
+    steps = n // lanes
+    if pipelined:
+        return m * steps + (PIPE_FILL_CYCLES if m else 0)
+    return m * (steps + 1)
+
+def batch_dotp(a, b, lanes=1, pipelined=False, chunk_rows=None):
+    """Produto escalar em lote com NumPy.
+
+    a, b : arrays (M, N) de int32 (outros inteiros são truncados a 32 bits, como na
+           escrita de um CSR)
+    Retorna (resultados int64 de shape (M,), ciclos estimados do acelerador).
+    A soma usa aritmética int64 com o mesmo wraparound do acumulador de 64 bits
+    do RTL; o cálculo é feito em blocos de `chunk_rows` linhas para limitar a memória.
+    """
+    if np is None:
+        raise RuntimeError("módulo numpy não encontrado. Instale com: pip install numpy")
+    a = np.asarray(a)
+    b = np.asarray(b)
+    if a.ndim != 2 or a.shape != b.shape:
+        raise ValueError(f"esperado a, b com o mesmo shape (M, N); recebido {a.shape} e {b.shape}")
+    m, n = a.shape
+    if n % lanes:
+        raise ValueError(f"n ({n}) deve ser múltiplo de lanes ({lanes})")
+    a = a.astype(np.int32, copy=False)
+    b = b.astype(np.int32, copy=False)
+
+    if chunk_rows is None:
+        chunk_rows = max(1, BATCH_CHUNK_BYTES // (3 * 8 * max(n, 1)))
+    results = np.empty(m, dtype=np.int64)
+    prod = None
+    for lo in range(0, m, chunk_rows):
+        hi = min(lo + chunk_rows, m)
+        rows = hi - lo
+        if prod is None or prod.shape[0] != rows:
+            prod = np.empty((rows, n), dtype=np.int64)
+        # Produto 32x32 exato em int64; a soma de int64 dá a volta em 2**64 como o RTL
+        np.multiply(a[lo:hi], b[lo:hi], out=prod, dtype=np.int64)
+        prod.sum(axis=1, dtype=np.int64, out=results[lo:hi])
+    return results, batch_cycles(m, n, lanes, pipelined)
+
+def run_batch(m, n=8, lanes=1, seed=0, check=1000):
+    """Gera M pares aleatórios, calcula em lote e confere `check` deles no modelo do acelerador"""
+    if np is None:
+        raise RuntimeError("módulo numpy não encontrado. Instale com: pip install numpy")
+    rng = np.random.default_rng(seed)
+    a = rng.integers(-2**31, 2**31, size=(m, n), dtype=np.int32)
+    b = rng.integers(-2**31, 2**31, size=(m, n), dtype=np.int32)
+
+    t0 = time.perf_counter()
+    results, cycles = batch_dotp(a, b, lanes)
+    dt = time.perf_counter() - t0
+
+    # Amostra conferida contra DotProductAccelSim (modo rápido, mesmo wraparound)
+    init_csrs(n)
+    accel = DotProductAccelSim(n, lanes, fast=True)
+    for k in np.linspace(0, m - 1, num=min(check, m), dtype=np.int64):
+        hw = hw_dotp(accel, a[k].tolist(), b[k].tolist())
+        if hw != int(results[k]):
+            raise AssertionError(f"op {k}: lote={int(results[k])} modelo={hw}")
+    print(f"[OK] {m} operações em lote: {dt:.2f} s ({m / dt:.0f} ops/s), "
+          f"~{cycles} ciclos estimados ({cycles / m:.1f} ciclos/op)")
+
 def main():
     """Simula o main() do firmware"""
+    parser = argparse.ArgumentParser(description="Simulador do firmware do acelerador")
+    parser.add_argument("--fast",    action="store_true", help="Modo rápido (salta de start a done)")
+    parser.add_argument("--regress", type=int, default=0,  help="Executa N operações aleatórias e sai")
+    parser.add_argument("--batch",   type=int, default=0,  help="Confere N operações aleatórias em lote (NumPy) e sai")
+    parser.add_argument("--n",       type=int, default=8,  help="Elementos por vetor")
+    parser.add_argument("--lanes",   type=int, default=1,  help="Multiplicadores em paralelo")
+    parser.add_argument("--csr-csv", default=None, help="Mapa de CSRs do SoC (ex.: build/dotp/csr.csv); N/LANES vêm das constantes")
+    parser.add_argument("--dispatch", type=int, default=0, help="Despacha N jobs em 1..--units unidades, mede a vazão e sai")
+    parser.add_argument("--units",   type=int, default=4,  help="Unidades do despachante (como --dotp-accels)")
+    parser.add_argument("--issue-cycles", type=int, default=0, help="Ciclos de CPU por job despachado (escrita dos operandos)")
+    parser.add_argument("--threads", action="store_true", help="Mede também as unidades num ThreadPoolExecutor (modo rápido)")
+    parser.add_argument("--clk",     type=float, default=50e6, help="Clock para converter ops/ciclo em ops/s")
+    args = parser.parse_args()
+    if args.csr_csv:
+        constants = CSRFile.from_csv(args.csr_csv).constants
+        args.n = constants.get("dotp_n", args.n)
+        args.lanes = constants.get("dotp_lanes", args.lanes)
+        args.units = constants.get("dotp_units", args.units)
+
+    if args.dispatch:
+        rows = dispatch_scaling(args.units, args.dispatch, args.n, args.lanes, args.issue_cycles,
+                                threads=args.threads)
+        print(f"Despacho de {args.dispatch} jobs (N={args.n}, LANES={args.lanes}, "
+              f"{args.issue_cycles} ciclos de CPU por job, clock {args.clk / 1e6:g} MHz):")
+        print(f"{'unidades':>8} {'ciclos':>9} {'ops/ciclo':>10} {'ops/s':>12} {'ganho':>7}"
+              + (f" {'threads (s)':>12}" if args.threads else ""))
+        for row in rows:
+            line = (f"{row['units']:>8} {row['cycles']:>9} {row['ops_per_cycle']:>10.3f} "
+                    f"{row['ops_per_cycle'] * args.clk:>12,.0f} {row['scaling']:>6.2f}x")
+            if args.threads:
+                line += f" {row['wall_s']:>12.3f}"
+            print(line)
+        return
+
+    if args.batch:
+        run_batch(args.batch, args.n, args.lanes)
+        return
+
+    if args.regress:
+        t0 = time.perf_counter()
+        accel, _ = regress(args.regress, args.n, args.lanes, fast=args.fast)
+        dt = time.perf_counter() - t0
+        mode = "rápido" if args.fast else "ciclo a ciclo"
+        print(f"[OK] {args.regress} operações ({mode}): {accel.cycles} ciclos simulados, "
+              f"{dt:.2f} s ({args.regress / dt:.0f} ops/s)")
+        return
     
     print("🔄 Inicializando simulação...")
-    init_csrs()
-    accel = DotProductAccelSim()
+    init_csrs(args.n, args.csr_csv)
+    accel = DotProductAccelSim(args.n, args.lanes, fast=args.fast, trace=print_trace)
     
     uart_write_str("\nLiteX Dot-Product Accelerator Demo\n")
     uart_write_str("CPU: VexRiscv (Simulado)\n")
 
     # Vetores de teste (mesmo que no firmware)
-    A = [1, -2, 3, -4, 5, -6, 7, -8]
-    B = [8, 7, -6, -5, 4, 3, -2, -1]
+    A = [[1, -2, 3, -4, 5, -6, 7, -8][i % 8] for i in range(args.n)]
+    B = [[8, 7, -6, -5, 4, 3, -2, -1][i % 8] for i in range(args.n)]
 
     print(f"\n📊 Vetores de teste:")
     print(f"   A = {A}")
@@ -189,18 +741,7 @@ def main():
 
     # Hardware
     print(f"\n⚙️  Executando no acelerador...")
-    hw_write_vectors(A, B)
-    # Pulso start como no firmware C
-    hw_start(accel)
-    
-    # Simular ciclos até done (o start já foi limpo dentro de hw_start)
-    max_cycles = 20
-    for cycle in range(max_cycles):
-        if hw_done():
-            break
-        accel.tick()
-    
-    hw = hw_result()
+    hw = hw_dotp(accel, A, B)
     uart_write_str("Hardware: "); uart_write_hex64(hw & 0xFFFFFFFFFFFFFFFF); uart_write_str("\n")
 
     if hw == sw:
@@ -211,6 +752,10 @@ def main():
         print(f"   Software: {sw}")
         print(f"   Hardware: {hw}")
         sys.exit(1)
+
+    # Só com os contadores no mapa (with_perf), como o #ifdef CSR_DOTP_PERF_CONTROL_ADDR do firmware
+    if accel.idx["perf_control"] is not None:
+        perf_report(accel)
     
     print(f"\n🎉 Simulação concluída com sucesso!")
 
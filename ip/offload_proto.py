@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+
+"""
+Protocolo binário de offload pela UART (lado host) e cliente com várias requisições
+em voo. O firmware (offload_loop() em firmware_dotp.c) e o substituto em pty
+(offload_sim.py) falam o mesmo protocolo.
+
+Quadro (inteiros little-endian):
+    A5 5A | tipo (u8) | seq (u8) | len (u16) | payload (len bytes) | crc16 (u16)
+O CRC é o CRC-16/CCITT-FALSE (polinômio 0x1021, início 0xFFFF) de tipo..payload.
+
+Comandos e respostas (a resposta repete o seq do comando):
+    CMD_INFO  (0x01), sem payload -> RSP_INFO  (0x81): n, lanes, batch_max (u16)
+    CMD_BATCH (0x02): count (u16) + count x (a[0..n-1], b[0..n-1]) em int32
+                                  -> RSP_BATCH (0x82): count (u16) + count x int64
+    Erro em qualquer comando      -> RSP_ERROR (0xFF): código (u8, ERR_*)
+
+Bytes fora de um quadro (ex.: o texto da demo antes do laço de comandos) são
+ignorados até o próximo A5 5A.
+
+Uso:
+    client = OffloadClient(serial.Serial(porta, 115200, timeout=1))
+    results, stats = client.run(pairs, batch_size=16, inflight=2)
+"""
+
+import binascii
+import collections
+import struct
+import time
+
+SYNC = b"\xA5\x5A"
+HEADER = struct.Struct("<2sBBH")      # sync, tipo, seq, len
+CRC = struct.Struct("<H")
+
+CMD_INFO, CMD_BATCH = 0x01, 0x02
+RSP_INFO, RSP_BATCH, RSP_ERROR = 0x81, 0x82, 0xFF
+
+# Códigos de RSP_ERROR
+ERR_CRC, ERR_LENGTH, ERR_COMMAND = 1, 2, 3
+ERROR_NAMES = {ERR_CRC: "CRC", ERR_LENGTH: "tamanho", ERR_COMMAND: "comando"}
+
+# Payload máximo aceito pelo leitor (len é u16)
+MAX_PAYLOAD = 0xFFFF
+
+
+def crc16(data, crc=0xFFFF):
+    """CRC-16/CCITT-FALSE (o mesmo de offload_crc16() no firmware)"""
+    return binascii.crc_hqx(data, crc)
+
+
+def build_frame(kind, seq, payload=b""):
+    body = struct.pack("<BBH", kind, seq & 0xFF, len(payload)) + payload
+    return SYNC + body + CRC.pack(crc16(body))
+
+
+def encode_batch(pairs):
+    """Payload de CMD_BATCH para [(a, b)], listas de n inteiros de 32 bits com sinal"""
+    out = [struct.pack("<H", len(pairs))]
+    for a, b in pairs:
+        out.append(struct.pack(f"<{len(a) + len(b)}i", *a, *b))
+    return b"".join(out)
+
+
+def decode_batch(payload, n):
+    """Inverso de encode_batch: [(a, b)]; ValueError se o tamanho não bate com count"""
+    if len(payload) < 2:
+        raise ValueError("payload sem count")
+    (count,) = struct.unpack_from("<H", payload)
+    if len(payload) != 2 + count * 8 * n:
+        raise ValueError(f"payload de {len(payload)} bytes para {count} pares de n={n}")
+    words = struct.unpack_from(f"<{2 * n * count}i", payload, 2)
+    return [(list(words[2*n*k:2*n*k + n]), list(words[2*n*k + n:2*n*(k + 1)])) for k in range(count)]
+
+
+def encode_results(results):
+    return struct.pack(f"<H{len(results)}q", len(results), *results)
+
+
+def decode_results(payload):
+    (count,) = struct.unpack_from("<H", payload)
+    return list(struct.unpack_from(f"<{count}q", payload, 2))
+
+
+class FrameReader:
+    """Separa quadros de um fluxo de bytes. feed() devolve [(tipo, seq, payload, crc_ok)];
+    lixo antes do sincronismo é descartado. Um cabeçalho com len > max_payload é tido
+    como falso sincronismo (procura o próximo A5 5A em vez de esperar len bytes)."""
+    def __init__(self, max_payload=MAX_PAYLOAD):
+        self.buf = bytearray()
+        self.max_payload = max_payload
+
+    def feed(self, data):
+        self.buf += data
+        frames = []
+        while True:
+            start = self.buf.find(SYNC)
+            if start < 0:
+                # Guarda um possível A5 no fim (sincronismo partido entre leituras)
+                del self.buf[:max(0, len(self.buf) - 1)]
+                return frames
+            del self.buf[:start]
+            if len(self.buf) < HEADER.size:
+                return frames
+            _, kind, seq, length = HEADER.unpack_from(self.buf)
+            if length > self.max_payload:
+                del self.buf[:1]
+                continue
+            end = HEADER.size + length + CRC.size
+            if len(self.buf) < end:
+                return frames
+            body = bytes(self.buf[2:HEADER.size + length])
+            (crc,) = CRC.unpack_from(self.buf, HEADER.size + length)
+            frames.append((kind, seq, body[4:], crc == crc16(body)))
+            del self.buf[:end]
+
+
+class OffloadError(Exception):
+    pass
+
+
+def percentile(values, p):
+    """Percentil p (0-100) por interpolação linear; None com a lista vazia"""
+    if not values:
+        return None
+    s = sorted(values)
+    k = (len(s) - 1) * p / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(s) - 1)
+    return s[lo] + (s[hi] - s[lo]) * (k - lo)
+
+
+class OffloadClient:
+    """Cliente do protocolo sobre uma porta serial (pyserial ou objeto com read/write).
+
+    run() divide os pares em lotes e mantém até `inflight` lotes enviados sem resposta:
+    o próximo lote já está na linha enquanto o dispositivo calcula o anterior."""
+    def __init__(self, port, timeout=5.0):
+        self.port    = port
+        self.timeout = timeout
+        self.reader  = FrameReader()
+        self.pending = collections.deque()   # quadros recebidos ainda não consumidos
+        self.seq     = 0
+
+    def send(self, kind, payload=b""):
+        seq = self.seq
+        self.seq = (self.seq + 1) & 0xFF
+        self.port.write(build_frame(kind, seq, payload))
+        return seq
+
+    def receive(self):
+        """Próximo quadro (tipo, seq, payload); OffloadError com CRC inválido ou timeout"""
+        deadline = time.monotonic() + self.timeout
+        while not self.pending:
+            if time.monotonic() > deadline:
+                raise OffloadError("timeout esperando resposta")
+            data = self.port.read(getattr(self.port, "in_waiting", 0) or 1)
+            if data:
+                self.pending.extend(self.reader.feed(data))
+        kind, seq, payload, crc_ok = self.pending.popleft()
+        if not crc_ok:
+            raise OffloadError(f"resposta seq={seq} com CRC inválido")
+        return kind, seq, payload
+
+    def _expect(self, seq, kind):
+        got, got_seq, payload = self.receive()
+        if got == RSP_ERROR:
+            code = payload[0] if payload else 0
+            raise OffloadError(f"dispositivo recusou seq={got_seq}: erro de {ERROR_NAMES.get(code, code)}")
+        if got != kind or got_seq != seq:
+            raise OffloadError(f"resposta inesperada: tipo 0x{got:02X} seq={got_seq} (esperado 0x{kind:02X} seq={seq})")
+        return payload
+
+    def info(self):
+        """(n, lanes, batch_max) do dispositivo"""
+        payload = self._expect(self.send(CMD_INFO), RSP_INFO)
+        return struct.unpack_from("<HHH", payload)
+
+    def run(self, pairs, batch_size=16, inflight=2):
+        """Calcula todos os pares. Retorna (resultados, estatísticas), com vazão em
+        vetores/s e latências por lote (envio -> resposta) em segundos."""
+        batches = [pairs[i:i + batch_size] for i in range(0, len(pairs), batch_size)]
+        results = []
+        latencies = []
+        in_flight = collections.deque()      # (seq, instante de envio)
+        t0 = time.perf_counter()
+        sent = 0
+        while sent < len(batches) or in_flight:
+            if sent < len(batches) and len(in_flight) < inflight:
+                in_flight.append((self.send(CMD_BATCH, encode_batch(batches[sent])), time.perf_counter()))
+                sent += 1
+                continue
+            seq, t_send = in_flight.popleft()
+            results.extend(decode_results(self._expect(seq, RSP_BATCH)))
+            latencies.append(time.perf_counter() - t_send)
+        elapsed = time.perf_counter() - t0
+        stats = {
+            "vectors": len(pairs),
+            "batches": len(batches),
+            "elapsed_s": elapsed,
+            "vectors_per_s": len(pairs) / elapsed if elapsed > 0 else 0.0,
+            "latency_p50_s": percentile(latencies, 50),
+            "latency_p95_s": percentile(latencies, 95),
+            "latency_p99_s": percentile(latencies, 99),
+        }
+        return results, stats
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+
+"""
+Substituto do dispositivo de offload num pseudo-terminal: um pty faz o papel da UART
+da placa e o laço de comandos do firmware (offload_loop() em firmware_dotp.c) roda
+sobre o modelo do acelerador de firmware_sim.py. O cliente (tools/offload_client.py)
+abre o caminho do pty como abriria /dev/ttyUSB0.
+
+Uso:
+    python ip/offload_sim.py --n 8 --lanes 2          # imprime o caminho do pty
+    python tools/offload_client.py --port /dev/pts/N --vectors 4096
+"""
+
+import argparse
+import os
+import pty
+import select
+import struct
+import threading
+import time
+import tty
+
+import firmware_sim as fw
+from offload_proto import (CMD_BATCH, CMD_INFO, ERR_COMMAND, ERR_CRC, ERR_LENGTH, RSP_BATCH,
+                           RSP_ERROR, RSP_INFO, FrameReader, build_frame, decode_batch, encode_results)
+
+# Mesmo limite de OFFLOAD_BATCH_MAX no firmware (resultados guardados até o CRC)
+BATCH_MAX = 32
+
+# Texto que o firmware imprime antes de entrar no laço binário
+BANNER = b"Modo offload: aguardando comandos\r\n"
+
+
+class OffloadStandIn:
+    """Dispositivo de offload num pty.
+
+    n, lanes  : configuração do acelerador modelado (DotProductAccelSim, modo rápido)
+    byte_time : segundos por byte transmitido (0 = sem limitar; 10/baud imita a UART)
+    """
+    def __init__(self, n=8, lanes=1, batch_max=BATCH_MAX, byte_time=0.0):
+        self.n         = n
+        self.lanes     = lanes
+        self.batch_max = batch_max
+        self.byte_time = byte_time
+        self.master, self.slave = pty.openpty()
+        tty.setraw(self.slave)
+        self.port = os.ttyname(self.slave)
+        fw.init_csrs(n)
+        self.accel  = fw.DotProductAccelSim(n, lanes, fast=True)
+        # Sem limite de len, como o firmware: um lote grande demais chega inteiro e
+        # é recusado com ERR_LENGTH em handle()
+        self.reader = FrameReader()
+        self.frames = 0
+        self.errors = 0
+        self._stop  = threading.Event()
+        self._thread = None
+
+    def handle(self, kind, seq, payload, crc_ok):
+        """Resposta a um quadro (bytes), como offload_loop() no firmware"""
+        if not crc_ok:
+            self.errors += 1
+            return build_frame(RSP_ERROR, seq, bytes([ERR_CRC]))
+        if kind == CMD_INFO:
+            return build_frame(RSP_INFO, seq, struct.pack("<HHH", self.n, self.lanes, self.batch_max))
+        if kind == CMD_BATCH:
+            try:
+                pairs = decode_batch(payload, self.n)
+            except ValueError:
+                pairs = None
+            if pairs is None or len(pairs) > self.batch_max:
+                self.errors += 1
+                return build_frame(RSP_ERROR, seq, bytes([ERR_LENGTH]))
+            results = [fw.hw_dotp(self.accel, a, b) for a, b in pairs]
+            return build_frame(RSP_BATCH, seq, encode_results(results))
+        self.errors += 1
+        return build_frame(RSP_ERROR, seq, bytes([ERR_COMMAND]))
+
+    def _write(self, data):
+        if self.byte_time:
+            time.sleep(len(data) * self.byte_time)
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self.master, view):]
+
+    def serve(self):
+        """Atende comandos até stop()"""
+        self._write(BANNER)
+        while not self._stop.is_set():
+            ready, _, _ = select.select([self.master], [], [], 0.05)
+            if not ready:
+                continue
+            try:
+                data = os.read(self.master, 4096)
+            except OSError:
+                break
+            if self.byte_time:
+                time.sleep(len(data) * self.byte_time)
+            for frame in self.reader.feed(data):
+                self.frames += 1
+                self._write(self.handle(*frame))
+
+    def start(self):
+        """Atende numa thread (testes); retorna o caminho do pty"""
+        self._thread = threading.Thread(target=self.serve, daemon=True)
+        self._thread.start()
+        return self.port
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        os.close(self.master)
+        os.close(self.slave)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dispositivo de offload simulado num pty")
+    parser.add_argument("--n",     type=int, default=8, help="Elementos por vetor")
+    parser.add_argument("--lanes", type=int, default=1, help="Multiplicadores em paralelo")
+    parser.add_argument("--baud",  type=int, default=0, help="Limita a vazão à de uma UART com este baud (0 = sem limite)")
+    args = parser.parse_args()
+
+    dev = OffloadStandIn(args.n, args.lanes, byte_time=10.0 / args.baud if args.baud else 0.0)
+    print(f"Dispositivo de offload em {dev.port} (n={args.n}, lanes={args.lanes}). Ctrl+C encerra.", flush=True)
+    try:
+        dev.serve()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"\n{dev.frames} quadro(s), {dev.errors} erro(s)")
+        dev.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+
+"""
+SoC de simulação (LiteX + Verilator) com a mesma CPU, RAM e periférico `dotp` do
+SoCWithDotProduct, executando o firmware real (ip/build/firmware.bin).
+
+O firmware é carregado na SRAM integrada (0x10000000, endereço de link de
+ip/linker.ld), a CPU parte direto dele (sem BIOS) e a UART simulada é capturada em
+arquivo. Ao final, as linhas "Ciclos SW/HW" impressas pelo firmware (timer0 uptime)
+são resumidas com o speedup medido, junto com a latência por polling x IRQ e os
+ciclos de CPU livres por operação. Com o firmware compilado com BENCH_ITERS=K, as
+linhas "@bench" viram o relatório de speedup de tools/fw_bench_report.py; com
+--dotp-accels K, as linhas "@dispatch" viram a vazão agregada por número de unidades.
+
+Uso:
+    python ip/sim_soc.py --headers-only                       # gera build/sim/.../csr.h
+    make -C ip INCLUDE=../build/sim/software/include/generated all
+    python ip/sim_soc.py --firmware ip/build/firmware.bin     # Verilator + UART em arquivo
+(ou simplesmente `make sim-soc`)
+"""
+
+import argparse
+import os
+import queue
+import re
+import subprocess
+import sys
+import threading
+import time
+
+from migen import *
+
+from litex.build.generic_platform import *
+from litex.build.sim import SimPlatform
+from litex.build.sim.config import SimConfig
+from litex.build.io import CRG
+from litex.soc.integration.common import get_mem_data
+from litex.soc.integration.soc import SoCRegion
+from litex.soc.integration.soc_core import SoCCore
+from litex.soc.integration.builder import Builder
+
+from dot_product_wrapper import DotProductAccel
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools"))
+from fw_bench_report import parse_bench, parse_dispatch, print_dispatch, print_report, summarize, summarize_dispatch  # noqa: E402
+
+# IOs da simulação (clock/reset e UART em stream, como no litex_sim)
+_io = [
+    ("sys_clk", 0, Pins(1)),
+    ("sys_rst", 0, Pins(1)),
+    ("serial", 0,
+        Subsignal("source_valid", Pins(1)),
+        Subsignal("source_ready", Pins(1)),
+        Subsignal("source_data",  Pins(8)),
+        Subsignal("sink_valid",   Pins(1)),
+        Subsignal("sink_ready",   Pins(1)),
+        Subsignal("sink_data",    Pins(8)),
+    ),
+]
+
+# Endereço de link do firmware (ip/linker.ld): início da SRAM integrada
+FIRMWARE_BASE = 0x10000000
+
+# Última linha impressa pelo firmware antes do laço final
+END_MARKER = "Fim da demo."
+
+
+class SimPlatformDotProduct(SimPlatform):
+    def __init__(self):
+        SimPlatform.__init__(self, "SIM", _io)
+
+
+class SimSoCWithDotProduct(SoCCore):
+    def __init__(self, firmware=None, sys_clk_freq=int(1e6), dotp_n=8, dotp_lanes=1,
+        dotp_pipelined=False, dotp_queue=0, dotp_window=False, dotp_b_tiles=0, dotp_simd=False, dotp_perf=False, dotp_irq=False, dotp_impl="sv", dotp_accels=1, **kwargs):
+        platform = SimPlatformDotProduct()
+
+        # Clock/Reset vindos do simulador
+        self.crg = CRG(platform.request("sys_clk"))
+
+        # Mesma CPU/RAM do SoCWithDotProduct; sem ROM/BIOS, a CPU parte do firmware
+        kwargs.setdefault("cpu_type", "vexriscv")
+        kwargs.setdefault("integrated_main_ram_size", 0x10000)
+        SoCCore.__init__(self, platform, clk_freq=sys_clk_freq,
+            ident                = "LiteX Dot-Product Simulation",
+            uart_name            = "sim",
+            integrated_rom_size  = 0,
+            integrated_sram_size = 0x8000,
+            cpu_reset_address    = FIRMWARE_BASE,
+            with_timer           = True,
+            timer_uptime         = True,
+            **kwargs)
+
+        # Firmware na SRAM (código + dados + 8 KiB de stack, ver ip/linker.ld)
+        if firmware is not None:
+            self.init_ram("sram", contents=get_mem_data(firmware,
+                data_width=32, endianness="little", offset=FIRMWARE_BASE))
+
+        # Acelerador(es) (mesmos parâmetros e nomes do SoC da placa)
+        if dotp_accels < 1:
+            raise ValueError(f"dotp_accels deve ser >= 1 (recebido {dotp_accels})")
+        if dotp_accels > 1 and (dotp_queue or dotp_window or dotp_b_tiles):
+            raise ValueError("dotp_accels > 1 não suporta fila, janela nem GEMV (uma unidade só)")
+        names = ["dotp"] if dotp_accels == 1 else [f"dotp{k}" for k in range(dotp_accels)]
+        for name in names:
+            setattr(self, name, DotProductAccel(platform, sys_clk_freq,
+                n         = dotp_n,
+                lanes     = dotp_lanes,
+                pipelined = dotp_pipelined,
+                queue_depth = dotp_queue,
+                b_tiles   = dotp_b_tiles,
+                with_simd = dotp_simd,
+                with_perf = dotp_perf,
+                with_irq  = dotp_irq,
+                with_window = dotp_window,
+                impl      = dotp_impl))
+            self.add_csr(name)
+            if dotp_irq and self.irq.enabled:
+                # Evento "done" do acelerador como IRQ da CPU (DOTP_INTERRUPT em soc.h)
+                self.irq.add(name, use_loc_if_exists=True)
+        if dotp_window:
+            self.bus.add_slave(name="dotp_window", slave=self.dotp.window.bus,
+                region=SoCRegion(size=self.dotp.window.size, cached=False))
+        self.add_constant("DOTP_N", dotp_n)
+        self.add_constant("DOTP_LANES", dotp_lanes)
+        self.add_constant("DOTP_UNITS", dotp_accels)
+        if dotp_b_tiles:
+            self.add_constant("DOTP_B_TILES", dotp_b_tiles)
+
+
+def _read_lines(stream, lines):
+    """Thread leitora: linhas do simulador para a fila; None no fim da saída"""
+    for line in stream:
+        lines.put(line)
+    lines.put(None)
+
+
+def run_firmware(gateware_dir, uart_log, timeout):
+    """Executa o simulador compilado e grava a UART em `uart_log` até o fim da demo.
+    A saída é lida numa thread: o prazo vale mesmo se o firmware travar sem imprimir
+    (ex.: em while (!hw_done());), e o simulador é encerrado ao fim dele."""
+    vsim = os.path.join(gateware_dir, "obj_dir", "Vsim")
+    if not os.path.isfile(vsim):
+        raise OSError(f"Simulador não encontrado: {vsim}")
+    os.makedirs(os.path.dirname(uart_log) or ".", exist_ok=True)
+
+    lines = []
+    proc  = subprocess.Popen([vsim], cwd=gateware_dir, stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, errors="replace")
+    output = queue.Queue()
+    threading.Thread(target=_read_lines, args=(proc.stdout, output), daemon=True).start()
+    deadline = time.monotonic() + timeout
+    try:
+        with open(uart_log, "w") as f:
+            while True:
+                try:
+                    line = output.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if line is None:
+                    break
+                line = line.rstrip("\r\n")
+                f.write(line + "\n")
+                f.flush()
+                lines.append(line)
+                print(line)
+                if END_MARKER in line:
+                    break
+    finally:
+        proc.kill()
+        proc.wait()
+    if not any(END_MARKER in line for line in lines):
+        print(f"[ERRO] Firmware não terminou em {timeout:.0f} s (log em {uart_log})")
+        return None
+    return lines
+
+
+def report_cycles(lines):
+    """Resume as medidas de ciclos impressas pelo firmware; retorna False em erro"""
+    cycles = {}
+    for line in lines:
+        m = re.search(r"Ciclos (SW|HW)\s*:\s*0x([0-9A-Fa-f]+)", line)
+        if m:
+            cycles[m.group(1)] = int(m.group(2), 16)
+        m = re.search(r"(Latencia polling|Latencia IRQ|Ciclos livres)/op\s*:\s*0x([0-9A-Fa-f]+)", line)
+        if m:
+            cycles[m.group(1)] = int(m.group(2), 16)
+    ok = any("[OK] Resultado coincide!" in line for line in lines)
+    ok = ok and not any("[ERRO]" in line for line in lines)
+    print()
+    print("Ciclos de CPU medidos (timer0 uptime):")
+    for path in ("SW", "HW"):
+        if path in cycles:
+            print(f"  {path}: {cycles[path]} ciclos")
+    if "SW" in cycles and "HW" in cycles and cycles["HW"]:
+        print(f"  Speedup: {cycles['SW'] / cycles['HW']:.2f}x")
+    for name in ("Latencia polling", "Latencia IRQ", "Ciclos livres"):
+        if name in cycles:
+            print(f"  {name}/op: {cycles[name]} ciclos")
+    print(f"  Resultado: {'OK' if ok else 'ERRO'}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SoC + acelerador em simulação (Verilator) com o firmware real")
+    parser.add_argument("--firmware", default=os.path.join("ip", "build", "firmware.bin"), help="Firmware (.bin) carregado na SRAM")
+    parser.add_argument("--output-dir", default=os.path.join("build", "sim"), help="Diretório de build da simulação")
+    parser.add_argument("--uart-log", default=None, help="Arquivo da UART capturada (padrão: <output-dir>/uart_log.txt)")
+    parser.add_argument("--timeout", type=float, default=300, help="Tempo máximo de simulação em segundos")
+    parser.add_argument("--headers-only", action="store_true", help="Só gera os headers (csr.h/soc.h) para compilar o firmware")
+    parser.add_argument("--dotp-n", type=int, default=8, help="Elementos por vetor do acelerador")
+    parser.add_argument("--dotp-lanes", type=int, default=1, help="Multiplicadores em paralelo (divide --dotp-n)")
+    parser.add_argument("--dotp-pipelined", action="store_true", help="Usa o núcleo pipeline com FIFO de resultados")
+    parser.add_argument("--dotp-queue", type=int, default=0, help="Fila de jobs com esta profundidade (0 desativa)")
+    parser.add_argument("--dotp-window", action="store_true", help="Operandos numa janela Wishbone (memória) em vez de CSRs")
+    parser.add_argument("--dotp-b-tiles", type=int, default=0, help="Modo GEMV: blocos de B residentes (0 desativa)")
+    parser.add_argument("--dotp-simd", action="store_true", help="Modos empacotados int16x2/int8x4 (CSR mode)")
+    parser.add_argument("--dotp-perf", action="store_true", help="Contadores de desempenho de 64 bits (CSRs dotp_perf_*)")
+    parser.add_argument("--dotp-irq", action="store_true", help="Evento done do acelerador como IRQ da CPU (EventManager)")
+    parser.add_argument("--dotp-impl", default="sv", choices=["sv", "migen"], help="Implementação do núcleo do acelerador")
+    parser.add_argument("--dotp-accels", type=int, default=1, help="Unidades independentes dotp0..dotpK-1 (despachante no firmware)")
+    args = parser.parse_args()
+
+    dotp_kwargs = dict(dotp_n=args.dotp_n, dotp_lanes=args.dotp_lanes,
+        dotp_pipelined=args.dotp_pipelined, dotp_queue=args.dotp_queue, dotp_window=args.dotp_window,
+        dotp_b_tiles=args.dotp_b_tiles, dotp_simd=args.dotp_simd, dotp_perf=args.dotp_perf, dotp_irq=args.dotp_irq, dotp_impl=args.dotp_impl,
+        dotp_accels=args.dotp_accels)
+
+    if args.headers_only:
+        soc = SimSoCWithDotProduct(**dotp_kwargs)
+        builder = Builder(soc, output_dir=args.output_dir, csr_csv=os.path.join(args.output_dir, "csr.csv"),
+            compile_software=False, compile_gateware=False)
+        # Finaliza o SoC e gera headers/CSRs diretamente, sem gerar o simulador
+        soc.finalize()
+        builder._generate_includes(with_bios=False)
+        builder._generate_csr_map()
+        print(f"Headers gerados em {os.path.join(args.output_dir, 'software', 'include', 'generated')}")
+        return
+
+    if not os.path.isfile(args.firmware):
+        print(f"Firmware não encontrado: {args.firmware} (compile com: make -C ip INCLUDE=../{args.output_dir}/software/include/generated all)")
+        sys.exit(1)
+
+    sys_clk_freq = int(1e6)
+    sim_config   = SimConfig()
+    sim_config.add_clocker("sys_clk", freq_hz=sys_clk_freq)
+    sim_config.add_module("serial2console", "serial")
+
+    soc = SimSoCWithDotProduct(firmware=args.firmware, sys_clk_freq=sys_clk_freq, **dotp_kwargs)
+    builder = Builder(soc, output_dir=args.output_dir, csr_csv=os.path.join(args.output_dir, "csr.csv"),
+        compile_software=False)
+    # Compila o simulador (Verilator) sem executá-lo: a execução é feita aqui para capturar a UART
+    builder.build(sim_config=sim_config, run=False)
+
+    uart_log = args.uart_log or os.path.join(args.output_dir, "uart_log.txt")
+    lines = run_firmware(builder.gateware_dir, uart_log, args.timeout)
+    if lines is None or not report_cycles(lines):
+        sys.exit(1)
+    errors = 0
+    bench = parse_bench(lines)
+    if bench is not None and bench["datasets"]:
+        print()
+        rows = summarize(bench)
+        print_report(bench, rows)
+        errors += rows[-1]["errors"]
+    dispatch = parse_dispatch(lines)
+    if dispatch:
+        print()
+        rows = summarize_dispatch(dispatch)
+        print_dispatch(rows)
+        errors += sum(row["errors"] for row in rows)
+    if errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,77 +1,94 @@
 #!/usr/bin/env python3
 
-from migen import *
-from litex.gen import *
-from litex_boards.targets.colorlight_i5 import BaseSoC as ColorlightBaseSoC
-from litex.soc.integration.builder import Builder
-from litex.soc.integration.soc_core import SoCCore
+"""
+CLI do SoC Colorlight + acelerador: build, gravação e geração de headers.
 
-from dot_product_wrapper import DotProductAccel
-import os
+LiteX/litex-boards só são importados quando o SoC precisa ser elaborado: --prog-only
+e --headers-only com os headers em cache (mesmas fontes e argumentos) terminam sem
+importar o LiteX. A classe do SoC está em dotp_soc.py.
+"""
+
+import argparse
 import glob
+import hashlib
+import os
 import shutil
 import subprocess
-
-
-class SoCWithDotProduct(ColorlightBaseSoC):
-    def __init__(self, *args, **kwargs):
-        # Permite desabilitar SPI flash apenas em cenários específicos (ex.: geração de headers)
-        self._disable_spi_flash = kwargs.pop("disable_spi_flash", False)
-        # Forçar uma CPU RISC-V padrão e UART
-        kwargs.setdefault("cpu_type", "vexriscv")
-        kwargs.setdefault("uart_name", "serial")
-        kwargs.setdefault("integrated_rom_size", 0x8000)
-        kwargs.setdefault("integrated_main_ram_size", 0x10000)
-        # Habilita timer para compatibilidade com BIOS em builds completos
-        kwargs.setdefault("with_timer", True)
-        # Workaround: desabilitar LedChaser por bug de extração de nome de CSR na versão atual
-        # do LiteX (CSRStorage sem nome explícito pode falhar em Python 3.12). Mantém-se os
-        # demais periféricos padrão do target.
-        kwargs.setdefault("with_led_chaser", False)
-
-        super().__init__(*args, **kwargs)
-
-        # Instancia e adiciona o acelerador
-        self.dotp = DotProductAccel(self.platform, sys_clk_freq=int(kwargs.get("sys_clk_freq", 50e6)))
-        # Adiciona CSR para o periférico
-        self.add_csr("dotp")
-
-    # Timer opcional: omitido aqui para facilitar geração de headers sem BIOS
-
-    # Override controlado: desabilita SPI flash apenas quando solicitado
-    def add_spi_flash(self, *args, **kwargs):
-        if self._disable_spi_flash:
-            # Ignora adição do SPI flash (workaround para bug de CSR em algumas versões)
-            return
-        # Caso contrário, delega para a implementação padrão do SoCCore
-        return SoCCore.add_spi_flash(self, *args, **kwargs)
-
-
-def main():
-    from litex.build.parser import LiteXArgumentParser
-    parser = LiteXArgumentParser(description="SoC Colorlight + Acelerador Produto Escalar")
-    parser.add_target_argument("--board", default="i9")
-    parser.add_target_argument("--revision", default="7.2")
-    parser.add_target_argument("--sys-clk-freq", default=50e6, type=float)
-    parser.add_target_argument("--build", action="store_true")
-    parser.add_target_argument("--load", action="store_true")
+import sys
+
+# Saída do build (relativa ao diretório de trabalho, como nos alvos do Makefile)
+BUILD_DIR     = os.path.join("build", "dotp")
+GENERATED_DIR = os.path.join(BUILD_DIR, "software", "include", "generated")
+# Chave (sha256) das entradas usadas na última geração de headers
+HEADERS_STAMP = os.path.join(BUILD_DIR, "headers.sha256")
+
+# Fontes que determinam os headers: wrapper, SoC, esta CLI e o RTL do acelerador
+_HERE = os.path.dirname(os.path.abspath(__file__))
+HEADER_SOURCES = [os.path.join(_HERE, name) for name in ("dot_product_wrapper.py", "dotp_soc.py", "soc_dot_product.py")]
+HEADER_SOURCES += sorted(glob.glob(os.path.join(_HERE, "..", "rtl", "*.sv")))
+
+
+def __getattr__(name):
+    # `from soc_dot_product import SoCWithDotProduct` continua valendo; o LiteX só é
+    # importado quando a classe é pedida
+    if name == "SoCWithDotProduct":
+        from dotp_soc import SoCWithDotProduct
+        return SoCWithDotProduct
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def headers_key(argv):
+    """sha256 das fontes do SoC e dos argumentos da CLI"""
+    h = hashlib.sha256()
+    for path in HEADER_SOURCES:
+        h.update(os.path.basename(path).encode() + b"\0")
+        with open(path, "rb") as f:
+            h.update(f.read())
+    h.update("\0".join(arg for arg in argv if arg != "--no-headers-cache").encode())
+    return h.hexdigest()
+
+
+def headers_cached(key):
+    """True se os headers gerados existem e vieram das mesmas entradas"""
+    try:
+        with open(HEADERS_STAMP) as f:
+            stamp = f.read().strip()
+    except OSError:
+        return False
+    return stamp == key and all(os.path.isfile(os.path.join(GENERATED_DIR, name)) for name in ("csr.h", "soc.h", "mem.h"))
+
+
+def _add_common_arguments(parser):
+    """Argumentos tratados antes de importar o LiteX (gravação e cache de headers)"""
     parser.add_argument("--prog-only", action="store_true", help="Apenas carregar bitstream (sem build)")
     parser.add_argument("--loader", default="openFPGALoader", choices=["openFPGALoader", "ecpprog"], help="Ferramenta de gravação")
     parser.add_argument("--loader-board", default="colorlight", help="Board para openFPGALoader (ex.: colorlight)")
     parser.add_argument("--bitstream", default=None, help="Caminho para o bitstream (.bit/.svf); se omitido, detecta em build/dotp/gateware")
     # Gera apenas headers/CSRs e artefatos de software, sem sintetizar gateware
     parser.add_argument("--headers-only", action="store_true", help="Gerar apenas headers/CSRs (sem build de gateware)")
-    args = parser.parse_args()
+    parser.add_argument("--no-headers-cache", action="store_true", help="Regenera os headers mesmo sem mudanças nas fontes/argumentos")
+    parser.add_argument("--no-bitstream-cache", action="store_true", help="Roda síntese/PnR mesmo com o bitstream em cache")
+    parser.add_argument("--bitstream-cache-dir", default=None, help="Diretório do cache de bitstreams (padrão: build/bitstream_cache)")
+    parser.add_argument("--bitstream-cache-size", default=1024, type=int, help="Tamanho máximo do cache de bitstreams em MiB (LRU)")
+
+
+def main():
+    argv = sys.argv[1:]
+    # Caminho rápido: sem LiteX para gravar ou reaproveitar headers (-h vai ao parser completo)
+    fast = argparse.ArgumentParser(add_help=False)
+    _add_common_arguments(fast)
+    args, _ = fast.parse_known_args(argv)
+    wants_help = "-h" in argv or "--help" in argv
 
     def _detect_bitstream(default_gateware_dir: str) -> str:
         if args.bitstream:
             return args.bitstream
-        # Procura por .bit, depois .svf
-        candidates = []
-        candidates += sorted(glob.glob(os.path.join(default_gateware_dir, "*.bit")))
-        candidates += sorted(glob.glob(os.path.join(default_gateware_dir, "*.svf")))
-        if candidates:
-            return candidates[0]
+        # Procura por .bit, depois .svf; o mais recente de cada tipo (nunca um antigo
+        # que apenas vem antes na ordem alfabética)
+        for ext in ("*.bit", "*.svf"):
+            candidates = glob.glob(os.path.join(default_gateware_dir, ext))
+            if candidates:
+                return max(candidates, key=os.path.getmtime)
         return None
 
     def _program_bitstream(bitstream_path: str) -> None:
@@ -95,20 +112,68 @@ def main():
     default_gateware_dir = os.path.join("build", "dotp", "gateware")
 
     # Modo apenas programar
-    if args.prog_only:
+    if args.prog_only and not wants_help:
         bit = _detect_bitstream(default_gateware_dir)
         if not bit:
             raise FileNotFoundError(f"Nenhum bitstream encontrado em {default_gateware_dir}. Faça o build primeiro ou passe --bitstream.")
         _program_bitstream(bit)
         return
 
+    # Headers em cache: mesmas fontes e argumentos da última geração
+    key = headers_key(argv)
+    if args.headers_only and not args.no_headers_cache and not wants_help and headers_cached(key):
+        print(f"Headers em cache (sem mudanças): {GENERATED_DIR}")
+        return
+
+    # O SoC (e o LiteX) primeiro: importar litex.build.parser antes de litex.soc é circular
+    from dotp_soc import SoCWithDotProduct
+    from litex.build.parser import LiteXArgumentParser
+    from litex.soc.integration.builder import Builder
+
+    parser = LiteXArgumentParser(description="SoC Colorlight + Acelerador Produto Escalar")
+    parser.add_target_argument("--board", default="i9")
+    parser.add_target_argument("--revision", default="7.2")
+    parser.add_target_argument("--sys-clk-freq", default=50e6, type=float)
+    parser.add_target_argument("--dotp-n", default=8, type=int, help="Elementos por vetor do acelerador")
+    parser.add_target_argument("--dotp-lanes", default=1, type=int, help="Multiplicadores em paralelo (divide --dotp-n)")
+    parser.add_target_argument("--dotp-pipelined", action="store_true", help="Usa o núcleo pipeline com FIFO de resultados")
+    parser.add_target_argument("--dotp-dma", action="store_true", help="Adiciona o mestre DMA (Wishbone) ao acelerador")
+    parser.add_target_argument("--dotp-queue", default=0, type=int, help="Fila de jobs com esta profundidade (0 desativa)")
+    parser.add_target_argument("--dotp-window", action="store_true", help="Operandos numa janela Wishbone (memória) em vez de CSRs")
+    parser.add_target_argument("--dotp-b-tiles", default=0, type=int, help="Modo GEMV: blocos de B residentes (0 desativa)")
+    parser.add_target_argument("--dotp-simd", action="store_true", help="Modos empacotados int16x2/int8x4 (CSR mode)")
+    parser.add_target_argument("--dotp-perf", action="store_true", help="Contadores de desempenho de 64 bits (CSRs dotp_perf_*)")
+    parser.add_target_argument("--dotp-irq", action="store_true", help="Evento done do acelerador como IRQ da CPU (EventManager)")
+    parser.add_target_argument("--dotp-impl", default="sv", choices=["sv", "migen"], help="Implementação do núcleo do acelerador")
+    parser.add_target_argument("--dotp-accels", default=1, type=int, help="Unidades independentes dotp0..dotpK-1 (despachante no firmware)")
+    parser.add_target_argument("--build", action="store_true")
+    parser.add_target_argument("--load", action="store_true")
+    _add_common_arguments(parser)
+    args = parser.parse_args(argv)
+
+    # Sem plataforma, o LiteXArgumentParser não registra --no-uart/--no-timer/--no-ctrl e
+    # soc_argdict devolve with_uart/with_timer/with_ctrl=False; mantém os padrões do SoC
+    soc_argdict = {k: v for k, v in parser.soc_argdict.items() if k not in ("with_uart", "with_timer", "with_ctrl")}
+
     soc = SoCWithDotProduct(
         board=args.board,
         revision=args.revision,
         sys_clk_freq=args.sys_clk_freq,
+        dotp_n=args.dotp_n,
+        dotp_lanes=args.dotp_lanes,
+        dotp_pipelined=args.dotp_pipelined,
+        dotp_dma=args.dotp_dma,
+        dotp_queue=args.dotp_queue,
+        dotp_window=args.dotp_window,
+        dotp_b_tiles=args.dotp_b_tiles,
+        dotp_simd=args.dotp_simd,
+        dotp_perf=args.dotp_perf,
+        dotp_irq=args.dotp_irq,
+        dotp_impl=args.dotp_impl,
+        dotp_accels=args.dotp_accels,
         # Workaround: ao gerar apenas headers, desabilitar SPI flash para evitar bug de CSR
         disable_spi_flash=args.headers_only,
-        **parser.soc_argdict,
+        **soc_argdict,
     )
     if args.headers_only:
         builder = Builder(soc, output_dir="build/dotp", csr_csv="build/dotp/csr.csv",
@@ -117,13 +182,24 @@ def main():
         soc.finalize()
         builder._generate_includes(with_bios=False)
         builder._generate_csr_map()
+        with open(HEADERS_STAMP, "w") as f:
+            f.write(key + "\n")
         return
     else:
         # Evita compilar BIOS/software durante a síntese de gateware para não exigir timer0
         builder = Builder(soc, output_dir="build/dotp", csr_csv="build/dotp/csr.csv", compile_software=False)
-        builder.build(run=args.build)
+        if args.build and not args.no_bitstream_cache:
+            # Síntese/PnR só quando Verilog, RTL, placa ou toolchain mudaram
+            from bitstream_cache import BitstreamCache, DEFAULT_CACHE_DIR, build_with_cache
+            cache = BitstreamCache(args.bitstream_cache_dir or DEFAULT_CACHE_DIR, args.bitstream_cache_size << 20)
+            params = dict(board=args.board, revision=args.revision, sys_clk_freq=args.sys_clk_freq)
+            bit, _ = build_with_cache(builder, soc, params, cache)
+        else:
+            builder.build(run=args.build)
+            bit = builder.get_bitstream_filename(mode="sram")
         if args.load:
-            bit = _detect_bitstream(builder.gateware_dir if hasattr(builder, "gateware_dir") else default_gateware_dir)
+            # Bitstream exato deste build (ou --bitstream), não o primeiro .bit do diretório
+            bit = args.bitstream or (bit if os.path.exists(bit) else None)
             if not bit:
                 raise FileNotFoundError(f"Nenhum bitstream encontrado em {builder.gateware_dir if hasattr(builder, 'gateware_dir') else default_gateware_dir}. Verifique o build.")
             _program_bitstream(bit)
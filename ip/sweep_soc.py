@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+
+"""
+Varredura do espaço de projeto: gera variantes do SoCWithDotProduct numa grade de
+frequências e configurações do acelerador, em paralelo (um processo e um diretório
+de build por ponto), e extrai dos logs do yosys e do nextpnr o uso de LUT/FF/DSP/BRAM
+e a Fmax atingida. A tabela final (CSV e JSON) traz também a vazão do acelerador
+(ops/s na frequência efetiva) e ops/s por LUT.
+
+Uso:
+    python ip/sweep_soc.py --freqs 50e6,60e6,75e6 --n 8,16 --lanes 1,2,4 --jobs 4
+    python ip/sweep_soc.py --parse-only              # refaz a tabela a partir dos logs
+
+Requer o toolchain ECP5 aberto (yosys, nextpnr-ecp5, ecppack; ver
+tools/install_ecp5_toolchain.sh).
+"""
+
+import argparse
+import contextlib
+import csv
+import itertools
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from firmware_sim import batch_cycles
+
+# Células do ECP5 relatadas na tabela
+YOSYS_CELLS = ["LUT4", "CCU2C", "TRELLIS_FF", "MULT18X18D", "DP16KD"]
+
+# Nome do log do script de build (yosys + nextpnr + ecppack) em cada gateware
+BUILD_LOG = "build.log"
+# Log da elaboração (LiteX) de cada ponto, fora do terminal compartilhado pelos processos
+ELAB_LOG  = "sweep.log"
+
+_STAT_COUNT_NAME = re.compile(r"^\s*(\d+)\s+([A-Za-z_$][\w$]*)\s*$")      # yosys >= 0.4x
+_STAT_NAME_COUNT = re.compile(r"^\s+([A-Za-z_$][\w$]*)\s+(\d+)\s*$")      # yosys antigo
+_PNR_UTIL  = re.compile(r"^Info:\s+(\w+):\s+(\d+)/\s*(\d+)\s+\d+%")
+_PNR_FMAX  = re.compile(r"Max frequency for clock\s+'([^']+)':\s+([\d.]+) MHz \((PASS|FAIL) at ([\d.]+) MHz\)")
+
+
+def point_name(p):
+    return f"f{p['sys_clk_freq']/1e6:g}_n{p['n']}_l{p['lanes']}{'_pipe' if p['pipelined'] else ''}"
+
+
+def parse_yosys_report(path):
+    """Contagem de células do último `stat` do relatório do yosys (<build>.rpt)"""
+    with open(path, errors="replace") as f:
+        text = f.read()
+    idx = text.rfind("Printing statistics")
+    if idx < 0:
+        return {}
+    cells = {}
+    for line in text[idx:].splitlines():
+        m = _STAT_COUNT_NAME.match(line)
+        if m:
+            count, name = int(m.group(1)), m.group(2)
+        else:
+            m = _STAT_NAME_COUNT.match(line)
+            if not m:
+                continue
+            name, count = m.group(1), int(m.group(2))
+        # A hierarquia completa vem por último: a última ocorrência prevalece
+        if name in YOSYS_CELLS:
+            cells[name] = count
+    return cells
+
+
+def parse_nextpnr_log(path):
+    """Uso do dispositivo {célula: (usado, total)} e Fmax {clock: (MHz, alvo, passou)}.
+    Para cada clock vale a última medida (após o roteamento)."""
+    util, clocks = {}, {}
+    with open(path, errors="replace") as f:
+        for line in f:
+            m = _PNR_UTIL.match(line)
+            if m:
+                util[m.group(1)] = (int(m.group(2)), int(m.group(3)))
+                continue
+            m = _PNR_FMAX.search(line)
+            if m:
+                clocks[m.group(1)] = (float(m.group(2)), float(m.group(4)), m.group(3) == "PASS")
+    return util, clocks
+
+
+def summarize(point, gateware_dir, build_name):
+    """Linha da tabela a partir dos logs de um ponto já construído"""
+    row = dict(name=point_name(point), sys_clk_mhz=point["sys_clk_freq"] / 1e6,
+               n=point["n"], lanes=point["lanes"], pipelined=int(point["pipelined"]))
+    rpt = os.path.join(gateware_dir, build_name + ".rpt")
+    log = os.path.join(gateware_dir, BUILD_LOG)
+    cells = parse_yosys_report(rpt) if os.path.isfile(rpt) else {}
+    util, clocks = parse_nextpnr_log(log) if os.path.isfile(log) else ({}, {})
+    row["lut4"]  = cells.get("LUT4")
+    row["comb"]  = util.get("TRELLIS_COMB", (None,))[0]
+    row["ff"]    = util.get("TRELLIS_FF", (cells.get("TRELLIS_FF"),))[0]
+    row["dsp"]   = util.get("MULT18X18D", (cells.get("MULT18X18D"),))[0]
+    row["bram"]  = util.get("DP16KD", (cells.get("DP16KD"),))[0]
+    # Clock mais lento: em geral o único (sys); com vários, é o que limita o SoC
+    if clocks:
+        fmax, _, _ = min(clocks.values())
+        row["fmax_mhz"]  = fmax
+        row["timing_ok"] = int(all(ok for _, _, ok in clocks.values()))
+    else:
+        row["fmax_mhz"]  = None
+        row["timing_ok"] = None
+    # Vazão: ciclos por operação do acelerador em regime (lote longo) na frequência
+    # efetiva (a de projeto, limitada pela Fmax)
+    ops = 1000
+    row["cycles_per_op"] = batch_cycles(ops, point["n"], point["lanes"], point["pipelined"]) / ops
+    f_eff = row["sys_clk_mhz"] if row["fmax_mhz"] is None else min(row["sys_clk_mhz"], row["fmax_mhz"])
+    row["ops_per_s"] = round(f_eff * 1e6 / row["cycles_per_op"])
+    luts = row["comb"] or row["lut4"]
+    row["ops_per_s_per_lut"] = round(row["ops_per_s"] / luts, 1) if luts else None
+    return row
+
+
+@contextlib.contextmanager
+def _redirect_output(path):
+    """Redireciona stdout/stderr do processo (fds 1 e 2) para `path`"""
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved = [os.dup(1), os.dup(2)]
+    with open(path, "w") as f:
+        os.dup2(f.fileno(), 1)
+        os.dup2(f.fileno(), 2)
+        try:
+            yield
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.dup2(saved[0], 1)
+            os.dup2(saved[1], 2)
+            os.close(saved[0])
+            os.close(saved[1])
+
+
+def build_point(point, out_root, board, revision, impl, parse_only=False):
+    """Gera (e, fora do --parse-only, constrói) um ponto; roda num processo do pool"""
+    out_dir      = os.path.join(out_root, point_name(point))
+    gateware_dir = os.path.join(out_dir, "gateware")
+    t0 = time.time()
+    status = "ok"
+    build_name = None
+    if not parse_only:
+        from dotp_soc import SoCWithDotProduct
+        from litex.soc.integration.builder import Builder
+        from bitstream_cache import run_gateware_script
+        os.makedirs(out_dir, exist_ok=True)
+        try:
+            with _redirect_output(os.path.join(out_dir, ELAB_LOG)):
+                soc = SoCWithDotProduct(board=board, revision=revision, sys_clk_freq=point["sys_clk_freq"],
+                    dotp_n=point["n"], dotp_lanes=point["lanes"], dotp_pipelined=point["pipelined"],
+                    dotp_impl=impl)
+                builder = Builder(soc, output_dir=out_dir, csr_csv=os.path.join(out_dir, "csr.csv"),
+                    compile_software=False)
+                builder.build(run=False)
+            build_name = soc.get_build_name()
+            run_gateware_script(gateware_dir, build_name, log=os.path.join(gateware_dir, BUILD_LOG))
+        except Exception as e:
+            status = f"erro: {e}"
+    if build_name is None:
+        # --parse-only (ou falha antes do script): o relatório do yosys dá o nome do build
+        rpts = [f for f in os.listdir(gateware_dir) if f.endswith(".rpt")] if os.path.isdir(gateware_dir) else []
+        build_name = rpts[0][:-4] if rpts else ""
+    row = summarize(point, gateware_dir, build_name)
+    row["status"]  = status
+    row["build_s"] = round(time.time() - t0, 1)
+    return row
+
+
+def parse_list(text, conv):
+    return [conv(x) for x in text.split(",") if x.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Varredura de frequência/configuração do SoC + acelerador (ECP5)")
+    parser.add_argument("--freqs", default="50e6,60e6", help="Frequências de sistema (Hz), separadas por vírgula")
+    parser.add_argument("--n", default="8", help="Elementos por vetor (lista)")
+    parser.add_argument("--lanes", default="1,2,4,8", help="Multiplicadores em paralelo (lista)")
+    parser.add_argument("--pipelined", default="0", help="Núcleo pipeline: 0, 1 ou 0,1")
+    parser.add_argument("--impl", default="sv", choices=["sv", "migen"], help="Implementação do núcleo")
+    parser.add_argument("--board", default="i9")
+    parser.add_argument("--revision", default="7.2")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Builds em paralelo")
+    parser.add_argument("--out-dir", default=os.path.join("build", "sweep"), help="Um subdiretório de build por ponto")
+    parser.add_argument("--parse-only", action="store_true", help="Não constrói; só relê os logs existentes")
+    args = parser.parse_args()
+
+    points = []
+    for freq, n, lanes, pipe in itertools.product(parse_list(args.freqs, float), parse_list(args.n, int),
+                                                  parse_list(args.lanes, int), parse_list(args.pipelined, int)):
+        if n % lanes:
+            print(f"Ignorando n={n} lanes={lanes} (n deve ser múltiplo de lanes)")
+            continue
+        points.append(dict(sys_clk_freq=freq, n=n, lanes=lanes, pipelined=bool(pipe)))
+    if not points:
+        parser.error("grade vazia")
+
+    print(f"{len(points)} ponto(s), {args.jobs} build(s) em paralelo, saída em {args.out_dir}")
+    rows = []
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = [pool.submit(build_point, p, args.out_dir, args.board, args.revision, args.impl, args.parse_only)
+                   for p in points]
+        for future in as_completed(futures):
+            row = future.result()
+            rows.append(row)
+            print(f"  {row['name']:>20}: {row['status']}, LUT={row['comb'] or row['lut4']}, "
+                  f"Fmax={row['fmax_mhz']} MHz, {row['ops_per_s_per_lut']} ops/s/LUT")
+
+    rows.sort(key=lambda r: (r["sys_clk_mhz"], r["n"], r["lanes"], r["pipelined"]))
+    os.makedirs(args.out_dir, exist_ok=True)
+    csv_path  = os.path.join(args.out_dir, "sweep.csv")
+    json_path = os.path.join(args.out_dir, "sweep.json")
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+    with open(json_path, "w") as f:
+        json.dump(rows, f, indent=2)
+    print(f"Tabela em {csv_path} e {json_path}")
+    if any(r["status"] != "ok" for r in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+"""
+Benchmarks (tools/bench.py): comparação com a linha de base nos dois sentidos
+(tempo menor é melhor, vazão maior é melhor), limiar por métrica, código de saída
+do `compare` e uma execução curta do grupo accelsim com os metadados da máquina.
+
+Uso:
+    python ip/test_bench.py
+    python -m pytest -q ip/test_bench.py
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+TOOLS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools")
+sys.path.insert(0, TOOLS)
+from bench import compare, metric, run_suite  # noqa: E402
+
+
+def result(**values):
+    """Resultado mínimo: nome -> (valor, sentido)"""
+    return {"meta": {}, "metrics": {name: metric(v, "x", better) for name, (v, better) in values.items()}}
+
+
+def test_compare_directions():
+    base = result(elab_s=(1.0, "lower"), ops_per_s=(1000.0, "higher"))
+    # Tempo 20% maior e vazão 5% menor: só o tempo passa do limiar de 10%
+    rows, regressions = compare(base, result(elab_s=(1.2, "lower"), ops_per_s=(950.0, "higher")), 0.10)
+    assert [row[0] for row in regressions] == ["elab_s"]
+    assert abs(dict((row[0], row[3]) for row in rows)["ops_per_s"] - 0.05) < 1e-9
+
+    # Melhorias nunca regridem; limiar próprio da métrica prevalece sobre o global
+    _, regressions = compare(base, result(elab_s=(0.5, "lower"), ops_per_s=(2000.0, "higher")), 0.0)
+    assert regressions == []
+    _, regressions = compare(base, result(elab_s=(1.2, "lower"), ops_per_s=(1000.0, "higher")), 0.10,
+                             {"elab_s": 0.3})
+    assert regressions == []
+
+    # Métricas ausentes na execução atual são ignoradas na comparação
+    rows, _ = compare(base, result(ops_per_s=(1000.0, "higher")))
+    assert [row[0] for row in rows] == ["ops_per_s"]
+
+
+def test_compare_exit_code():
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {}
+        for name, value in (("base", 1000.0), ("ok", 990.0), ("slow", 500.0)):
+            paths[name] = os.path.join(tmp, name + ".json")
+            with open(paths[name], "w") as f:
+                json.dump(result(ops_per_s=(value, "higher")), f)
+
+        def run(current):
+            return subprocess.run([sys.executable, os.path.join(TOOLS, "bench.py"), "compare",
+                                   paths["base"], paths[current]], capture_output=True, text=True)
+        assert run("ok").returncode == 0
+        slow = run("slow")
+        assert slow.returncode == 1 and "REGRESSÃO" in slow.stdout
+
+
+def test_run_accelsim():
+    out = run_suite(["accelsim"], repeat=1, quick=True, log=lambda *_: None)
+    assert out["meta"]["python"] and out["meta"]["cpu_count"]
+    assert out["meta"]["groups"] == ["accelsim"]
+    for name in ("accelsim_cycle_ops_per_s", "accelsim_fast_ops_per_s"):
+        assert out["metrics"][name]["value"] > 0
+        assert out["metrics"][name]["better"] == "higher"
+    json.dumps(out)
+
+
+def main():
+    for test in (test_compare_directions, test_compare_exit_code, test_run_accelsim):
+        test()
+        print(f"[OK] {test.__name__}")
+    print("Todos os testes passaram.")
+
+
+if __name__ == "__main__":
+    main()
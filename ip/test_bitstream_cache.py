@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+
+"""
+Cache de bitstreams: chave estável (ignora a data no cabeçalho do Verilog), acerto
+com o bitstream exato e evição LRU por tamanho. Não requer toolchain FPGA.
+
+Uso:
+    python ip/test_bitstream_cache.py
+    python -m pytest -q ip/test_bitstream_cache.py
+"""
+
+import os
+import tempfile
+import time
+
+from bitstream_cache import BitstreamCache
+
+BUILD_NAME = "colorlight_i5"
+PARAMS     = dict(board="i9", revision="7.2", sys_clk_freq=50e6)
+TOOLCHAIN  = "yosys: teste"
+
+
+def write_gateware(gateware_dir, date, body="assign x = 1;", bit=b"BIT", seed=1):
+    os.makedirs(gateware_dir, exist_ok=True)
+    with open(os.path.join(gateware_dir, BUILD_NAME + ".v"), "w") as f:
+        f.write(f"// Date       : {date}\n/*\n hierarquia\n*/\nmodule top();\n{body}\nendmodule\n")
+    with open(os.path.join(gateware_dir, BUILD_NAME + ".lpf"), "w") as f:
+        f.write("LOCATE COMP \"clk\" SITE \"P3\";\n")
+    with open(os.path.join(gateware_dir, BUILD_NAME + ".ys"), "w") as f:
+        f.write(f"read_verilog {BUILD_NAME}.v\nsynth_ecp5 -abc9 -top {BUILD_NAME}\n")
+    with open(os.path.join(gateware_dir, "build_" + BUILD_NAME + ".sh"), "w") as f:
+        f.write(f"set -e\nyosys {BUILD_NAME}.ys\nnextpnr-ecp5 --json {BUILD_NAME}.json --seed {seed}\n")
+    with open(os.path.join(gateware_dir, BUILD_NAME + ".bit"), "wb") as f:
+        f.write(bit)
+
+
+def gateware_key(cache, gateware_dir, params=PARAMS):
+    return cache.key(gateware_dir, BUILD_NAME, [(BUILD_NAME + ".v", "verilog", "work")], params, TOOLCHAIN)
+
+
+def test_key_and_restore():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = BitstreamCache(os.path.join(tmp, "cache"))
+        gw    = os.path.join(tmp, "gateware")
+        write_gateware(gw, "2025-01-01 10:00:00", bit=b"BIT-A")
+        key = gateware_key(cache, gw)
+        assert cache.restore(key, gw, BUILD_NAME) is None
+        cache.store(key, gw, BUILD_NAME, PARAMS)
+
+        # Nova geração do mesmo SoC: só a data muda -> mesma chave, bitstream exato
+        write_gateware(gw, "2025-01-02 11:00:00", bit=b"ANTIGO")
+        assert gateware_key(cache, gw) == key
+        bit = cache.restore(key, gw, BUILD_NAME)
+        with open(bit, "rb") as f:
+            assert f.read() == b"BIT-A"
+
+        # Verilog, opções do toolchain (seed), parâmetros da placa ou toolchain diferentes
+        # -> outra chave
+        write_gateware(gw, "2025-01-02 11:00:00", seed=2)
+        assert gateware_key(cache, gw) != key
+        write_gateware(gw, "2025-01-02 11:00:00")
+        assert gateware_key(cache, gw) == key
+        assert gateware_key(cache, gw, dict(PARAMS, sys_clk_freq=60e6)) != key
+        assert cache.key(gw, BUILD_NAME, [(BUILD_NAME + ".v", "verilog", "work")], PARAMS, "yosys: outro") != key
+        write_gateware(gw, "2025-01-02 11:00:00", body="assign x = 0;")
+        assert gateware_key(cache, gw) != key
+
+
+def test_lru_eviction():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = BitstreamCache(os.path.join(tmp, "cache"), max_bytes=2500)
+        gw    = os.path.join(tmp, "gateware")
+        keys  = []
+
+        def store(i, age):
+            write_gateware(gw, "2025-01-01", body=f"assign x = {i};", bit=bytes(1000))
+            keys.append(gateware_key(cache, gw))
+            cache.store(keys[-1], gw, BUILD_NAME, PARAMS)
+            t = time.time() - age
+            os.utime(os.path.join(cache.root, keys[-1], "entry.json"), (t, t))
+
+        store(0, age=100)
+        store(1, age=50)
+        # Uso recente da primeira entrada: a segunda passa a ser a menos usada
+        assert cache.restore(keys[0], gw, BUILD_NAME) is not None
+        store(2, age=0)
+        assert {key for _, _, key in cache.entries()} == {keys[0], keys[2]}
+
+
+def main():
+    for test in (test_key_and_restore, test_lru_eviction):
+        test()
+        print(f"[OK] {test.__name__}")
+    print("Todos os testes passaram.")
+
+
+if __name__ == "__main__":
+    main()
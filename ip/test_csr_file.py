@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+
+"""
+Banco de registradores CSR (ip/csr_file.py): mapa lido de um csr.csv do LiteX,
+acesso por endereço (palavras, blocos, "ro" ignorado, callbacks), registradores de
+64 bits em duas palavras e o modelo do acelerador sobre o mapa real e com duas
+instâncias no mesmo banco.
+
+Uso:
+    python ip/test_csr_file.py
+    python -m pytest -q ip/test_csr_file.py
+"""
+
+import os
+import tempfile
+
+import firmware_sim as fw
+from csr_file import CSRFile
+
+# Trecho de um csr.csv gerado por soc_dot_product.py --headers-only
+CSR_CSV = """\
+#--------------------------------------------------------------------------------
+# Auto-generated by LiteX
+#--------------------------------------------------------------------------------
+csr_base,dotp,0xf0000000,,
+csr_base,timer0,0xf0001800,,
+""" + "".join(f"csr_register,dotp_{vec}{i},0x{0xf0000000 + 4 * (8 * (vec == 'b') + i):08x},1,rw\n"
+              for vec in "ab" for i in range(8)) + """\
+csr_register,dotp_start,0xf0000040,1,rw
+csr_register,dotp_done,0xf0000044,1,ro
+csr_register,dotp_result_lo,0xf0000048,1,ro
+csr_register,dotp_result_hi,0xf000004c,1,ro
+csr_register,dotp_perf_control,0xf000005c,1,rw
+csr_register,dotp_perf_busy_cycles,0xf0000060,2,ro
+csr_register,timer0_load,0xf0001800,1,rw
+constant,config_clock_frequency,50000000,,
+constant,dotp_n,8,,
+constant,config_cpu_has_interrupt,None,,
+"""
+
+
+def load_csv(init=False):
+    """CSRFile do CSR_CSV (com init=True, via fw.init_csrs, como o simulador com --csr-csv)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "csr.csv")
+        with open(path, "w") as f:
+            f.write(CSR_CSV)
+        return fw.init_csrs(csv=path) if init else CSRFile.from_csv(path)
+
+
+def test_bus_access():
+    csrs = load_csv()
+    assert csrs.address("dotp_start") == 0xF0000040 and csrs.address("timer0_load") == 0xF0001800
+    assert csrs.constants["dotp_n"] == 8 and csrs.constants["config_cpu_has_interrupt"] is None
+
+    # Bloco com valores com e sem sinal; leitura em bloco e por nome
+    csrs.write_bulk(0xF0000000, [-1, 2, 0xFFFFFFFE, 4])
+    assert csrs.read_bulk(0xF0000000, 4) == [0xFFFFFFFF, 2, 0xFFFFFFFE, 4]
+    assert csrs.swords[csrs.index("dotp_a0")] == -1 and csrs["dotp_a3"] == 4
+
+    # Registrador "ro": escrita do barramento ignorada, o lado do hardware grava
+    csrs.write(0xF0000044, 1)
+    assert csrs["dotp_done"] == 0
+    csrs["dotp_done"] = 1
+    assert csrs.read(0xF0000044) == 1
+
+    # 64 bits: palavra mais significativa no menor endereço, como no LiteX
+    csrs["dotp_perf_busy_cycles"] = 0x0000000500000007
+    assert csrs.read_bulk(0xF0000060, 2) == [5, 7]
+
+    # Callbacks: escrita (com o valor) e efeito colateral da leitura
+    seen = []
+    csrs.on_write("dotp_start", lambda value: seen.append(("start", value)))
+    csrs.on_read("dotp_result_hi", lambda: seen.append(("pop",)))
+    csrs.write(0xF0000040, 1)
+    csrs.read(0xF000004C)
+    csrs.write_bulk(0xF0000038, [0, 0, 3])          # b6, b7, start
+    assert seen == [("start", 1), ("pop",), ("start", 3)]
+
+    for bad in (0xF0000002, 0xEFFFFFFC, 0xF0002000):
+        try:
+            csrs.read(bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"endereço 0x{bad:08X} aceito")
+
+
+def test_model_on_real_map():
+    """O modelo usa os endereços do csr.csv; operações e contadores como no mapa padrão"""
+    default = fw.init_csrs(8)
+    ref = fw.hw_dotp(fw.DotProductAccelSim(8, 2), list(range(8)), [3] * 8)
+
+    load_csv(init=True)
+    accel = fw.DotProductAccelSim(8, 2)
+    assert fw.hw_dotp(accel, list(range(8)), [3] * 8) == ref == 84
+    assert fw.csr_regs.read(0xF0000048) == 84 == default["dotp_result_lo"]
+    fw.dotp_perf_control_write(fw.PERF_SNAPSHOT, accel)
+    accel.tick()
+    assert fw.csr_regs["dotp_perf_busy_cycles"] == 4
+
+    # Fila exige push/tag/level/jobs/ready, ausentes neste mapa
+    try:
+        fw.DotProductAccelSim(8, 2, queue_depth=4)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("fila aceita sem os CSRs de push")
+
+
+def test_two_instances():
+    """Dois aceleradores no mesmo banco, em páginas CSR distintas"""
+    csrs = CSRFile.from_layout([("dotp", fw.dotp_csr_layout(8)), ("dotp1", fw.dotp_csr_layout(16))])
+    assert csrs.address("dotp1_a00") == csrs.address("dotp_a0") + 0x800
+    accel0 = fw.DotProductAccelSim(8, 1, csrs=csrs)
+    accel1 = fw.DotProductAccelSim(16, 4, csrs=csrs, prefix="dotp1", queue_depth=2)
+    csrs["dotp1_ready"] = 1
+    fw.hw_push(accel1, [2] * 16, [5] * 16, tag=7)
+    assert fw.hw_dotp(accel0, [1] * 8, [-1] * 8) == -8
+    while fw.hw_pop(accel1) is None:
+        accel1.tick()
+    assert accel1.perf["ops"] == 1 and accel0.perf["ops"] == 1
+    assert csrs["dotp_result_lo"] == 0xFFFFFFF8 and csrs["dotp1_level"] == 0
+
+
+def main():
+    for test in (test_bus_access, test_model_on_real_map, test_two_instances):
+        test()
+        print(f"[OK] {test.__name__}")
+    print("Todos os testes passaram.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+"""
+Mapa de CSRs exportado por ip/csr_top.py para a bancada cocotb: mesmos nomes, tamanhos
+e modos ro/rw do layout que o modelo de firmware usa (firmware_sim.dotp_csr_layout),
+inclusive ev_pending, que é CSRStatus mas é escrito para limpar o evento.
+
+Fila de jobs com o núcleo SV: as instâncias recebem os operandos do job na cabeça da
+FIFO (não os CSRs atuais), e a bancada cocotb com QUEUE=4 (pushes seguidos enquanto o
+núcleo calcula) dá os mesmos resultados e ciclos com os núcleos SV e Migen. Esta
+última roda só com cocotb e Verilator ou Icarus instalados.
+
+Uso:
+    python ip/test_csr_top.py
+    python -m pytest -q ip/test_csr_top.py
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+
+import pytest
+from migen.fhdl.specials import Instance
+
+from csr_file import CSRFile
+from csr_top import SourceList, export
+from dot_product_wrapper import DotProductAccel
+from firmware_sim import dotp_csr_layout
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def exported(**kwargs):
+    with tempfile.TemporaryDirectory() as tmp:
+        _, csv, _ = export(tmp, **kwargs)
+        return CSRFile.from_csv(csv)
+
+
+def test_modes_match_layout():
+    layout = {f"dotp_{name}": (words, mode) for name, words, mode in dotp_csr_layout(4)}
+    for kwargs in (dict(), dict(with_irq=True, queue_depth=4)):
+        csrs = exported(n=4, impl="migen", **kwargs)
+        for reg in csrs.regs.values():
+            assert (reg.words, reg.mode) == layout[reg.name], reg.name
+    assert csrs.regs["dotp_ev_pending"].mode == "rw"
+    assert csrs.regs["dotp_ev_status"].mode == "ro"
+    assert csrs.constants["dotp_n"] == 4
+
+
+def test_queue_operands_sv():
+    for pipelined in (False, True):
+        accel = DotProductAccel(SourceList(), 50e6, n=4, pipelined=pipelined, queue_depth=4)
+        inst = next(s for s in accel.get_fragment().specials if isinstance(s, Instance))
+        inputs = {item.name: item.expr for item in inst.items if isinstance(item, Instance.Input)}
+        assert inputs["a"] is accel.jobs_fifo.source.a, inst.of
+        assert inputs["b"] is accel.jobs_fifo.source.b, inst.of
+
+
+def test_cocotb_queue():
+    sims = [sim for sim, tool in (("verilator", "verilator"), ("icarus", "iverilog")) if shutil.which(tool)]
+    if not sims or not shutil.which("cocotb-config"):
+        pytest.skip("requer cocotb e Verilator ou Icarus")
+    reports = {}
+    for impl in ("sv", "migen"):
+        # Mesma seed na bancada: os dois núcleos recebem os mesmos operandos
+        run = subprocess.run(["make", "-C", os.path.join(ROOT, "tb", "cocotb"), f"SIM={sims[0]}",
+                              "N=8", "LANES=1", "PIPELINED=1", "QUEUE=4", f"IMPL={impl}"],
+                             capture_output=True, text=True)
+        assert run.returncode == 0, run.stdout[-3000:] + run.stderr[-3000:]
+        with open(os.path.join(ROOT, "build", "cocotb", f"n8_l1_p1_{impl}_q4", "latency.json")) as f:
+            reports[impl] = json.load(f)
+        del reports[impl]["config"]["impl"]
+    assert reports["sv"] == reports["migen"]
+
+
+def main():
+    for test in (test_modes_match_layout, test_queue_operands_sv, test_cocotb_queue):
+        test()
+        print(f"[OK] {test.__name__}")
+    print("Todos os testes passaram.")
+
+
+if __name__ == "__main__":
+    main()
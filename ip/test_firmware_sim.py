@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+
+"""
+Confere o modo rápido do simulador de firmware (salta de start a done) e o modo em
+lote (NumPy) contra a referência ciclo a ciclo: mesmos resultados, ciclos simulados
+e contadores. Também cobre o modelo da fila de jobs (push/pop com tag) e os modos
+empacotados int16/int8 (dotp_mode) e a demo com um csr.csv sem os contadores de
+desempenho (o mapa padrão do SoC).
+
+Uso:
+    python ip/test_firmware_sim.py
+    python -m pytest -q ip/test_firmware_sim.py
+"""
+
+import os
+import random
+import subprocess
+import sys
+import tempfile
+
+import firmware_sim as fw
+
+
+def test_fast_matches_cycle_accurate():
+    """Resultados, ciclos e contadores de desempenho idênticos nos dois modos"""
+    for n, lanes in [(8, 1), (8, 4), (16, 4), (6, 3), (8, 8)]:
+        ref, ref_results = fw.regress(200, n, lanes, fast=False, seed=n + lanes)
+        fast, fast_results = fw.regress(200, n, lanes, fast=True, seed=n + lanes)
+        assert fast_results == ref_results, f"n={n} lanes={lanes}: resultados diferentes"
+        assert fast.cycles == ref.cycles, f"n={n} lanes={lanes}: {fast.cycles} != {ref.cycles}"
+        assert fast.perf == ref.perf, f"n={n} lanes={lanes}: {fast.perf} != {ref.perf}"
+        assert ref.perf["latency_max"] == n // lanes
+
+
+def test_trace_hook():
+    """O hook de trace recebe start/done; sem hook o modelo fica silencioso"""
+    for fast in (False, True):
+        events = []
+        fw.init_csrs()
+        accel = fw.DotProductAccelSim(fast=fast, trace=lambda event, accel: events.append(event))
+        for k in range(3):
+            fw.hw_dotp(accel, [k] * 8, [1] * 8)
+        assert events == ["start", "done"] * 3
+
+
+def test_batch_matches_model():
+    """Lote NumPy (em blocos pequenos) igual ao modelo, inclusive no wraparound de 64 bits"""
+    # Sem NumPy o teste aparece como ignorado (skip), não como aprovado
+    import pytest
+    np = pytest.importorskip("numpy")
+    for n, lanes in [(8, 1), (16, 4)]:
+        rng = random.Random(n)
+        a = [[rng.getrandbits(32) - 2**31 for _ in range(n)] for _ in range(97)]
+        b = [[rng.getrandbits(32) - 2**31 for _ in range(n)] for _ in range(97)]
+        # Extremos: soma de n produtos 2**62 (dá a volta em 2**64)
+        a[0] = [-2**31] * n
+        b[0] = [-2**31] * n
+        results, cycles = fw.batch_dotp(np.array(a), np.array(b), lanes, chunk_rows=10)
+        assert results.dtype == np.int64 and results.shape == (97,)
+
+        fw.init_csrs(n)
+        accel = fw.DotProductAccelSim(n, lanes)
+        expected = [fw.hw_dotp(accel, x, y) for x, y in zip(a, b)]
+        assert results.tolist() == expected
+        assert cycles == accel.cycles
+
+
+def test_queue():
+    """Fila de jobs: tags e resultados na ordem, núcleo encadeando os jobs enquanto a
+    CPU trabalha e push descartado com a fila cheia"""
+    n, lanes = 8, 2
+    rng  = random.Random(1)
+    jobs = [([rng.getrandbits(32) - 2**31 for _ in range(n)],
+             [rng.getrandbits(32) - 2**31 for _ in range(n)]) for _ in range(20)]
+    expected = [(fw.sw_dotp(a, b) + 2**63) % 2**64 - 2**63 for a, b in jobs]
+    for fast in (False, True):
+        fw.init_csrs(n)
+        accel = fw.DotProductAccelSim(n, lanes, fast=fast, queue_depth=4, fifo_depth=4)
+        # CPU mais lenta que o núcleo: 3 ciclos de trabalho antes de cada push
+        out = fw.queue_run(accel, jobs, work=lambda k: [accel.tick() for _ in range(3)])
+        assert [tag for tag, _ in out] == list(range(20))
+        assert [result for _, result in out] == expected
+        assert accel.perf["ops"] == 20
+
+    # Jobs longos: o primeiro vai direto para o núcleo, dois ocupam a fila e o quarto
+    # push é descartado
+    fw.init_csrs(64)
+    accel = fw.DotProductAccelSim(64, 1, queue_depth=2)
+    for tag in range(4):
+        fw.hw_push(accel, [tag] * 64, [1] * 64, tag)
+    assert fw.dotp_ready_read() == 0 and fw.csr_regs["dotp_jobs"] == 2
+    out = []
+    while len(out) < 3:
+        popped = fw.hw_pop(accel)
+        if popped is None:
+            accel.tick()
+        else:
+            out.append(popped)
+    assert out == [(0, 0), (1, 64), (2, 128)]
+    for _ in range(100):
+        accel.tick()
+    assert fw.hw_pop(accel) is None
+
+
+def test_packed_modes():
+    """int16x2/int8x4: 2-4x elementos nas mesmas palavras e ciclos, soma exata em 64
+    bits; o modo volta a int32 depois de cada operação empacotada"""
+    n, lanes = 8, 2
+    rng = random.Random(3)
+    for mode, bits in [(fw.MODE_INT16, 16), (fw.MODE_INT8, 8)]:
+        count = n * 32 // bits
+        lo, hi = -2**(bits - 1), 2**(bits - 1) - 1
+        for extremes in (False, True):
+            a = [lo if extremes else rng.randint(lo, hi) for _ in range(count)]
+            b = [lo if extremes else rng.randint(lo, hi) for _ in range(count)]
+            assert fw.unpack_words(fw.pack_words(a, mode), mode) == a
+            for fast in (False, True):
+                fw.init_csrs(n)
+                accel = fw.DotProductAccelSim(n, lanes, fast=fast)
+                assert fw.hw_dotp_packed(accel, a, b, mode) == fw.sw_dotp(a, b)
+                assert accel.perf["latency_last"] == n // lanes
+                assert fw.csr_regs["dotp_mode"] == fw.MODE_INT32
+
+    # Na fila, o modo vai com o job (trocado entre dois pushes)
+    fw.init_csrs(n)
+    accel = fw.DotProductAccelSim(n, lanes, queue_depth=4)
+    words = [0x1201FF80] * n
+    for tag, mode in enumerate((fw.MODE_INT8, fw.MODE_INT32)):
+        fw.dotp_mode_write(mode)
+        fw.hw_push(accel, words, words, tag)
+    out = []
+    while len(out) < 2:
+        popped = fw.hw_pop(accel)
+        if popped is None:
+            accel.tick()
+        else:
+            out.append(popped)
+    assert out == [(0, fw.simd_dot(words, words, fw.MODE_INT8)), (1, fw.simd_dot(words, words))]
+
+
+def test_demo_without_perf():
+    """--csr-csv com o mapa padrão (with_perf=False): a demo roda sem o relatório dos contadores"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "csr.csv")
+        address = 0xF0000000
+        with open(path, "w") as f:
+            f.write(f"csr_base,dotp,0x{address:08x},,\n")
+            for name, words, mode in fw.dotp_csr_layout(8):
+                if name in ("push", "mode", "level", "ready", "tag", "jobs") or name.startswith(("ev_", "perf_")):
+                    continue
+                f.write(f"csr_register,dotp_{name},0x{address:08x},{words},{mode}\n")
+                address += 4 * words
+            f.write("constant,dotp_n,8,,\nconstant,dotp_lanes,1,,\n")
+        run = subprocess.run([sys.executable, fw.__file__, "--csr-csv", path], capture_output=True, text=True)
+        assert run.returncode == 0, run.stdout + run.stderr
+        assert "[OK] Resultado coincide!" in run.stdout
+        assert "Contadores do acelerador" not in run.stdout
+
+
+def main():
+    for test in (test_fast_matches_cycle_accurate, test_trace_hook, test_batch_matches_model, test_queue,
+                 test_packed_modes, test_demo_without_perf):
+        test()
+        print(f"[OK] {test.__name__}")
+    print("Todos os testes passaram.")
+
+
+if __name__ == "__main__":
+    main()
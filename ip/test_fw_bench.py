@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+
+"""
+Relatório do benchmark do firmware (tools/fw_bench_report.py): linhas "@bench" numa
+captura com carimbos de tempo e \\r\\n, bloco incompleto ignorado, médias por operação,
+speedup, divisão escrita/cálculo/leitura, vazão do despachante ("@dispatch") e
+código de saída com erros.
+
+Uso:
+    python ip/test_fw_bench.py
+    python -m pytest -q ip/test_fw_bench.py
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+TOOLS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools")
+sys.path.insert(0, TOOLS)
+from fw_bench_report import parse_bench, parse_dispatch, summarize, summarize_dispatch  # noqa: E402
+
+
+def bench_line(ds, sw, write, compute, read, errors=0):
+    fields = dict(sw=sw, sw_min=sw // 64, write=write, compute=compute, read=read,
+                  hw_min=(write + compute + read) // 64, errors=errors)
+    return f"@bench ds={ds}" + "".join(f" {k}=0x{v:016X}" for k, v in fields.items()) + "\r\n"
+
+
+def capture(*datasets, iters=64, clk=50_000_000, stamp=True):
+    """Captura como a de tools/capture_uart.py --timestamps"""
+    lines = ["LiteX Dot-Product Accelerator Demo\r\n",
+             f"@bench begin n=0x{8:016X} lanes=0x{1:016X} iters=0x{iters:016X} clk=0x{clk:016X} overhead=0x{18:016X}\r\n",
+             *[bench_line(*ds) for ds in datasets],
+             "@bench end\r\n", "Fim da demo.\r\n"]
+    if stamp:
+        lines = [f"[10:00:00.{i:03d}] {line}" for i, line in enumerate(lines)]
+    return lines
+
+
+def test_summary():
+    lines = capture(("demo", 6400, 4096, 1024, 512), ("aleatorio", 12800, 4096, 1024, 512))
+    bench = parse_bench(line.encode() for line in lines)
+    assert bench["config"] == dict(n=8, lanes=1, iters=64, clk=50_000_000, overhead=18)
+    rows = {row["dataset"]: row for row in summarize(bench)}
+    demo = rows["demo"]
+    assert demo["sw_cycles"] == 100 and demo["hw_cycles"] == 88
+    assert abs(demo["speedup"] - 100 / 88) < 1e-9
+    assert (demo["write_cycles"], demo["compute_cycles"], demo["read_cycles"]) == (64, 16, 8)
+    assert abs(demo["write_share"] + demo["compute_share"] + demo["read_share"] - 1) < 1e-9
+    assert abs(demo["hw_us"] - 88 / 50) < 1e-9
+    # Total: média por operação sobre os conjuntos
+    assert rows["total"]["sw_cycles"] == 150 and rows["total"]["hw_cycles"] == 88
+
+
+def test_incomplete_block():
+    # Uma execução interrompida antes de "@bench end" não conta; vale o último bloco completo
+    lines = capture(("demo", 6400, 4096, 1024, 512), stamp=False)
+    cut = capture(("demo", 1, 1, 1, 1), stamp=False)[:3]
+    bench = parse_bench(lines + cut)
+    assert bench["datasets"][0]["sw"] == 6400
+    assert parse_bench(cut) is None
+
+
+def test_cli_errors():
+    with tempfile.TemporaryDirectory() as tmp:
+        def run(lines):
+            path = os.path.join(tmp, "uart_log.txt")
+            with open(path, "w", newline="") as f:
+                f.writelines(lines)
+            return subprocess.run([sys.executable, os.path.join(TOOLS, "fw_bench_report.py"), path],
+                                  capture_output=True, text=True)
+        ok = run(capture(("demo", 6400, 4096, 1024, 512)))
+        assert ok.returncode == 0 and "1.14x" in ok.stdout
+        assert run(capture(("demo", 6400, 4096, 1024, 512, 3))).returncode == 1
+        assert run(["Fim da demo.\r\n"]).returncode == 1
+
+
+def dispatch_lines(cycles, jobs=32, clk=50_000_000, errors=0):
+    return [f"[10:00:01.{k:03d}] @dispatch units=0x{k + 1:016X} jobs=0x{jobs:016X} cycles=0x{c:016X} "
+            f"clk=0x{clk:016X} errors=0x{errors:016X}\r\n" for k, c in enumerate(cycles)]
+
+
+def test_dispatch():
+    # Vale a última execução (começa em units=1)
+    lines = dispatch_lines([9999, 1]) + dispatch_lines([3200, 1600, 1280])
+    rows = summarize_dispatch(parse_dispatch(line.encode() for line in lines))
+    assert [row["units"] for row in rows] == [1, 2, 3]
+    assert rows[0]["cycles_per_op"] == 100 and abs(rows[0]["ops_s"] - 500_000) < 1e-6
+    assert rows[1]["scaling"] == 2 and rows[2]["scaling"] == 2.5
+    assert abs(rows[2]["efficiency"] - 2.5 / 3) < 1e-9
+    assert parse_dispatch(capture(("demo", 1, 1, 1, 1))) == []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "uart_log.txt")
+        for errors, code in ((0, 0), (2, 1)):
+            with open(path, "w", newline="") as f:
+                f.writelines(["Fim da demo.\r\n"] + dispatch_lines([3200, 1600], errors=errors))
+            out = subprocess.run([sys.executable, os.path.join(TOOLS, "fw_bench_report.py"), path],
+                                 capture_output=True, text=True)
+            assert out.returncode == code and "2.00x" in out.stdout
+
+
+def main():
+    for test in (test_summary, test_incomplete_block, test_cli_errors, test_dispatch):
+        test()
+        print(f"[OK] {test.__name__}")
+    print("Todos os testes passaram.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+
+"""
+Simulação (migen) do wrapper completo com o núcleo Migen (impl="migen"): o teste
+escreve e lê os CSRs pelo barramento CSR do LiteX, como a CPU faria, e mede os
+ciclos de barramento por operação. Com a janela de operandos (with_window=True) os
+vetores vão pelo escravo Wishbone do acelerador. O fim de operação por polling de
+done é comparado com a IRQ do EventManager (latência e ciclos de CPU livres), e um
+start mantido em 1 gera uma única operação e um único evento done. Na fila
+de jobs (queue_depth > 0) a CPU enfileira operandos com tag e drena os resultados
+enquanto o núcleo executa os jobs em sequência. Nos modos empacotados (with_simd,
+CSR mode) cada palavra leva 2 int16 ou 4 int8.
+
+Uso:
+    python ip/test_migen_accel.py
+    python -m pytest -q ip/test_migen_accel.py
+"""
+
+import itertools
+import random
+
+from migen import *
+from litex.soc.interconnect import csr_bus
+
+from dot_product_wrapper import DotProductAccel
+from firmware_sim import MODE_INT16, MODE_INT8, simd_dot
+
+
+class CSRBench(Module):
+    def __init__(self, **kwargs):
+        # Com os contadores de desempenho (os testes conferem ops e latência por eles) e
+        # o EventManager (conclusão por IRQ)
+        self.submodules.dotp = DotProductAccel(None, 50e6, impl="migen", with_perf=True, with_irq=True, **kwargs)
+        # Banco de CSRs do acelerador na página 0 (barramento de 32 bits, como no SoC)
+        self.submodules.csrbank = csr_bus.CSRBankArray(self,
+            lambda name, memory: 0 if name == "dotp" else None, data_width=32, address_width=14)
+        self.bus = csr_bus.Interface(data_width=32, address_width=14)
+        self.submodules.csrcon = csr_bus.Interconnect(self.bus, self.csrbank.get_buses())
+
+        # Endereço (em palavras) de cada CSR, na mesma ordem do csr.csv
+        self.csr_addr = {}
+        addr = 0
+        for csr in self.csrbank.banks[0][1]:
+            self.csr_addr[csr.name] = addr
+            addr += (csr.size + 31)//32
+
+
+class CSRDriver:
+    """Acessos de CPU ao barramento CSR; conta os ciclos gastos"""
+    def __init__(self, bench):
+        self.bench  = bench
+        self.cycles = 0
+
+    def write(self, name, value):
+        yield from self.bench.bus.write(self.bench.csr_addr[name], value & 0xFFFFFFFF)
+        self.cycles += 1
+
+    def write_window(self, index, value):
+        # Store de palavra na janela de operandos: espera o ack do escravo
+        bus = self.bench.dotp.window.bus
+        yield bus.adr.eq(index)
+        yield bus.dat_w.eq(value & 0xFFFFFFFF)
+        yield bus.sel.eq(0b1111)
+        yield bus.we.eq(1)
+        yield bus.cyc.eq(1)
+        yield bus.stb.eq(1)
+        yield
+        self.cycles += 1
+        while not (yield bus.ack):
+            yield
+            self.cycles += 1
+        yield bus.cyc.eq(0)
+        yield bus.stb.eq(0)
+        yield bus.we.eq(0)
+
+    def delay(self, cycles):
+        for _ in range(cycles):
+            yield
+        self.cycles += cycles
+
+    def read(self, name, words=1):
+        # CSRs largos ocupam várias palavras, a mais significativa primeiro
+        bus   = self.bench.bus
+        value = 0
+        for i in range(words):
+            yield bus.adr.eq(self.bench.csr_addr[name] + i)
+            yield bus.re.eq(1)
+            yield
+            yield bus.re.eq(0)
+            yield                       # dat_r registrado no banco
+            value = (value << 32) | (yield bus.dat_r)
+            self.cycles += 2
+        return value
+
+
+# Ciclos entre as escritas de 1 e 0 em start (o done anterior leva 3 ciclos para cair)
+START_DELAY = 2
+
+
+def to_signed64(v):
+    return v - (1 << 64) if v >= (1 << 63) else v
+
+
+def random_vectors(rng, n):
+    a = [rng.randint(-2**31, 2**31 - 1) for _ in range(n)]
+    b = [rng.randint(-2**31, 2**31 - 1) for _ in range(n)]
+    return a, b, to_signed64(sum(x*y for x, y in zip(a, b)) & 0xFFFFFFFFFFFFFFFF)
+
+
+def run_csr_ops(ops=16, n=8, lanes=1, pipelined=False, seed=0, with_window=False, mode=None):
+    """Executa `ops` produtos escalares pelo barramento CSR (operandos na janela
+    Wishbone com with_window=True; palavras empacotadas no modo `mode`, com with_simd).
+    Retorna (resultados, esperados, ciclos de barramento por operação, contadores)."""
+    bench = CSRBench(n=n, lanes=lanes, pipelined=pipelined, with_window=with_window,
+        with_simd=mode is not None)
+    drv   = CSRDriver(bench)
+    rng   = random.Random(seed)
+    names = [csr.name for csr in bench.csrbank.banks[0][1]]
+    a_names = [name for name in names if name.startswith("a") and name[1:].isdigit()]
+    b_names = [name for name in names if name.startswith("b") and name[1:].isdigit()]
+    out = {"results": [], "expected": []}
+
+    def write_vectors(a, b):
+        if with_window:
+            for i, v in enumerate(a + b):
+                yield from drv.write_window(i, v)
+            return
+        for name, v in zip(a_names, a):
+            yield from drv.write(name, v)
+        for name, v in zip(b_names, b):
+            yield from drv.write(name, v)
+
+    def read_result():
+        lo = yield from drv.read("result_lo")
+        hi = yield from drv.read("result_hi")
+        out["results"].append(to_signed64((hi << 32) | lo))
+
+    def vectors():
+        a, b, expected = random_vectors(rng, n)
+        if mode is not None:
+            expected = to_signed64(simd_dot(a, b, mode) & 0xFFFFFFFFFFFFFFFF)
+        out["expected"].append(expected)
+        return a, b
+
+    def generator():
+        if mode is not None:
+            yield from drv.write("mode", mode)
+        yield from drv.write("perf_control", 0b01)   # clear
+        drv.cycles = 0
+        if not pipelined:
+            # Fluxo do firmware: operandos, pulso em start, espera done, lê o resultado
+            for _ in range(ops):
+                a, b = vectors()
+                yield from write_vectors(a, b)
+                # Como hw_start() no firmware: pulso com atraso até o done anterior cair
+                yield from drv.write("start", 1)
+                yield from drv.delay(START_DELAY)
+                yield from drv.write("start", 0)
+                while not (yield from drv.read("done")):
+                    pass
+                yield from read_result()
+        else:
+            # Enfileira todas as operações (respeitando ready) e depois drena a FIFO
+            for _ in range(ops):
+                a, b = vectors()
+                while not (yield from drv.read("ready")):
+                    pass
+                yield from write_vectors(a, b)
+                yield from drv.write("start", 1)
+            for _ in range(ops):
+                while not (yield from drv.read("done")):
+                    pass
+                yield from read_result()
+        out["cycles"] = drv.cycles
+        yield from drv.write("perf_control", 0b10)   # snapshot
+        out["perf"] = {}
+        for name in bench.dotp.perf.counters:
+            out["perf"][name] = yield from drv.read(f"perf_{name}", words=2)
+
+    run_simulation(bench, generator())
+    return out["results"], out["expected"], out["cycles"] / ops, out["perf"]
+
+
+def run_completion(ops=8, n=8, lanes=1, use_irq=False, seed=0):
+    """Operações sequenciais terminadas por polling de done ou pela IRQ "done" do
+    EventManager (o ISR só limpa o pendente e lê o resultado; a entrada/saída do trap
+    na CPU não é modelada). Retorna (resultados, esperados, latência média do start
+    até o fim observado, ciclos por operação em que a CPU fica fora do barramento)."""
+    bench = CSRBench(n=n, lanes=lanes)
+    drv   = CSRDriver(bench)
+    rng   = random.Random(seed)
+    names = [csr.name for csr in bench.csrbank.banks[0][1]]
+    a_names = [name for name in names if name.startswith("a") and name[1:].isdigit()]
+    b_names = [name for name in names if name.startswith("b") and name[1:].isdigit()]
+    out = {"results": [], "expected": [], "latency": 0, "free": 0}
+
+    def generator():
+        if use_irq:
+            yield from drv.write("ev_pending", 1)
+            yield from drv.write("ev_enable", 1)
+        for _ in range(ops):
+            a, b, expected = random_vectors(rng, n)
+            out["expected"].append(expected)
+            for name, v in zip(a_names + b_names, a + b):
+                yield from drv.write(name, v)
+            t0 = drv.cycles
+            yield from drv.write("start", 1)
+            yield from drv.delay(START_DELAY)
+            yield from drv.write("start", 0)
+            if use_irq:
+                # CPU em wfi (ou noutra tarefa) até a linha de IRQ subir
+                while not (yield bench.dotp.ev.irq):
+                    yield from drv.delay(1)
+                    out["free"] += 1
+                yield from drv.write("ev_pending", 1)
+            else:
+                while not (yield from drv.read("done")):
+                    pass
+            out["latency"] += drv.cycles - t0
+            lo = yield from drv.read("result_lo")
+            hi = yield from drv.read("result_hi")
+            out["results"].append(to_signed64((hi << 32) | lo))
+
+    run_simulation(bench, generator())
+    return out["results"], out["expected"], out["latency"] / ops, out["free"] / ops
+
+
+def run_queue(ops=16, n=8, lanes=1, pipelined=False, queue_depth=4, seed=0):
+    """Fila de jobs pelo barramento CSR: a CPU escreve os operandos e push(tag) enquanto
+    ready=1 e, quando a fila está cheia ou acabaram os jobs, drena os resultados.
+    Retorna (resultados por tag, esperados, ciclos de barramento por operação, contadores)."""
+    bench = CSRBench(n=n, lanes=lanes, pipelined=pipelined, queue_depth=queue_depth)
+    drv   = CSRDriver(bench)
+    rng   = random.Random(seed)
+    names = [csr.name for csr in bench.csrbank.banks[0][1]]
+    a_names = [name for name in names if name.startswith("a") and name[1:].isdigit()]
+    b_names = [name for name in names if name.startswith("b") and name[1:].isdigit()]
+    jobs = [random_vectors(rng, n) for _ in range(ops)]
+    out  = {"results": {}}
+
+    def pop_result():
+        tag = yield from drv.read("tag")
+        lo  = yield from drv.read("result_lo")
+        hi  = yield from drv.read("result_hi")
+        out["results"][tag] = to_signed64((hi << 32) | lo)
+
+    def generator():
+        yield from drv.write("perf_control", 0b01)   # clear
+        drv.cycles = 0
+        tag = 0
+        while len(out["results"]) < ops:
+            if tag < ops and (yield from drv.read("ready")):
+                a, b, _ = jobs[tag]
+                for name, v in zip(a_names + b_names, a + b):
+                    yield from drv.write(name, v)
+                yield from drv.write("push", tag)
+                tag += 1
+            elif (yield from drv.read("done")):
+                yield from pop_result()
+        out["cycles"] = drv.cycles
+        yield from drv.write("perf_control", 0b10)   # snapshot
+        out["perf"] = {}
+        for name in bench.dotp.perf.counters:
+            out["perf"][name] = yield from drv.read(f"perf_{name}", words=2)
+
+    run_simulation(bench, generator())
+    results = [out["results"].get(t) for t in range(ops)]
+    return results, [e for _, _, e in jobs], out["cycles"] / ops, out["perf"]
+
+
+def test_csr_sequential():
+    """Núcleo sequencial pelo barramento CSR: resultados e latência N/LANES"""
+    for n, lanes in [(8, 1), (8, 4), (16, 4)]:
+        results, expected, cycles, perf = run_csr_ops(4, n, lanes, seed=n + lanes)
+        assert results == expected, f"n={n} lanes={lanes}"
+        assert perf["ops"] == 4
+        assert perf["latency_max"] == n // lanes
+        print(f"  seq  n={n:2d} lanes={lanes}: {cycles:.1f} ciclos de barramento/op")
+
+
+def test_start_held():
+    """start mantido em 1 muito além de N/LANES ciclos: uma única operação (dispara na
+    escrita de 1, não em nível), como nos contadores e no resultado"""
+    for n, lanes in [(8, 1), (8, 4)]:
+        bench = CSRBench(n=n, lanes=lanes)
+        drv   = CSRDriver(bench)
+        names = [csr.name for csr in bench.csrbank.banks[0][1]]
+        out   = {}
+
+        def generator():
+            for name in names:
+                if name[0] in "ab" and name[1:].isdigit():
+                    yield from drv.write(name, 1 if name[0] == "a" else 2)
+            yield from drv.write("perf_control", 0b01)   # clear
+            yield from drv.write("start", 1)
+            yield from drv.delay(3 * (n // lanes) + 4)
+            yield from drv.write("start", 0)
+            yield from drv.delay(n // lanes + 4)
+            yield from drv.write("perf_control", 0b10)   # snapshot
+            out["ops"]  = yield from drv.read("perf_ops", words=2)
+            out["busy"] = yield from drv.read("perf_busy_cycles", words=2)
+            out["lo"]   = yield from drv.read("result_lo")
+
+        run_simulation(bench, generator())
+        assert out["ops"] == 1, f"n={n} lanes={lanes}: {out['ops']} operações"
+        assert out["busy"] == n // lanes
+        assert out["lo"] == 2 * n
+
+
+def test_csr_pipelined():
+    """Núcleo pipeline pelo barramento CSR: resultados em ordem via FIFO"""
+    for n, lanes in [(8, 1), (8, 8)]:
+        results, expected, cycles, perf = run_csr_ops(6, n, lanes, pipelined=True, seed=n + lanes)
+        assert results == expected, f"n={n} lanes={lanes}"
+        assert perf["ops"] == 6
+        print(f"  pipe n={n:2d} lanes={lanes}: {cycles:.1f} ciclos de barramento/op")
+
+
+def test_irq_completion():
+    """IRQ do EventManager: mesmos resultados, latência comparável à do polling e a
+    CPU livre durante o cálculo"""
+    for n, lanes in [(8, 1), (32, 4)]:
+        results, expected, poll_lat, poll_free = run_completion(4, n, lanes, use_irq=False, seed=n)
+        assert results == expected
+        results, expected, irq_lat, irq_free = run_completion(4, n, lanes, use_irq=True, seed=n)
+        assert results == expected, f"n={n} lanes={lanes}"
+        assert poll_free == 0
+        assert irq_free >= n // lanes - START_DELAY
+        assert irq_lat <= poll_lat + 2
+        print(f"  n={n:2d} lanes={lanes}: polling {poll_lat:.1f} ciclos/op, IRQ {irq_lat:.1f} "
+              f"ciclos/op ({irq_free:.1f} livres)")
+
+
+def test_irq_start_held():
+    """start mantido em 1 além de N/LANES ciclos: um único evento done (o ISR, que
+    limpa o pendente a cada IRQ, conta uma conclusão por start)"""
+    n, lanes = 8, 1
+    bench = CSRBench(n=n, lanes=lanes)
+    drv   = CSRDriver(bench)
+    out   = {"irqs": 0}
+
+    def generator():
+        yield from drv.write("ev_pending", 1)
+        yield from drv.write("ev_enable", 1)
+        yield from drv.write("start", 1)
+        level = 0
+        for _ in range(4 * (n // lanes)):
+            # Borda de subida da linha de IRQ: o ISR limpa o pendente (a linha cai
+            # alguns ciclos depois)
+            irq = yield bench.dotp.ev.irq
+            if irq and not level:
+                out["irqs"] += 1
+                yield from drv.write("ev_pending", 1)
+            else:
+                yield from drv.delay(1)
+            level = irq
+        yield from drv.write("start", 0)
+
+    run_simulation(bench, generator())
+    assert out["irqs"] == 1
+
+
+def test_queue():
+    """Fila de jobs: resultados com a tag certa, núcleo encadeando jobs sem a CPU"""
+    for n, lanes, pipelined in [(8, 1, False), (8, 4, False), (16, 2, True)]:
+        results, expected, cycles, perf = run_queue(10, n, lanes, pipelined, queue_depth=4, seed=n + lanes)
+        assert results == expected, f"n={n} lanes={lanes} pipelined={pipelined}"
+        assert perf["ops"] == 10
+        print(f"  fila n={n:2d} lanes={lanes}{' pipe' if pipelined else ''}: {cycles:.1f} ciclos de barramento/op")
+
+    # Jobs mais longos que a escrita dos operandos: a fila enche, ready cai e o núcleo
+    # não fica parado entre um job e o seguinte
+    bench = CSRBench(n=64, lanes=1, queue_depth=2)
+    drv   = CSRDriver(bench)
+    out   = {}
+
+    def generator():
+        for tag in range(4):
+            yield from drv.write("push", tag)
+        out["ready"] = yield from drv.read("ready")
+        out["jobs"]  = yield from drv.read("jobs")
+        busy = 0
+        for _ in range(64):
+            busy += yield bench.dotp.core.busy
+            yield
+        out["busy"] = busy
+
+    run_simulation(bench, generator())
+    assert out["ready"] == 0 and out["jobs"] == 2
+    assert out["busy"] >= 62
+
+
+def test_window():
+    """Operandos pela janela Wishbone: mesmos resultados, leitura de volta e sel"""
+    for n, lanes, pipelined in [(8, 1, False), (16, 4, False), (8, 2, True)]:
+        results, expected, cycles, perf = run_csr_ops(4, n, lanes, pipelined, seed=n, with_window=True)
+        assert results == expected, f"n={n} lanes={lanes} pipelined={pipelined}"
+        assert perf["ops"] == 4
+        print(f"  janela n={n:2d} lanes={lanes}{' pipe' if pipelined else ''}: {cycles:.1f} ciclos de barramento/op")
+
+    bench = CSRBench(n=8, with_window=True)
+    bus   = bench.dotp.window.bus
+    out   = {}
+
+    def generator():
+        yield from bus.write(3, 0x11223344)
+        yield from bus.write(8 + 5, 0xAABBCCDD)
+        yield from bus.write(3, 0x000000EE, sel=0b0001)   # store de byte
+        out["a3"]  = yield from bus.read(3)
+        out["b5"]  = yield from bus.read(8 + 5)
+        out["a"]   = yield bench.dotp.window.a
+
+    run_simulation(bench, generator())
+    assert out["a3"] == 0x112233EE
+    assert out["b5"] == 0xAABBCCDD
+    assert (out["a"] >> 96) & 0xFFFFFFFF == 0x112233EE
+
+
+def test_simd():
+    """Modos int16x2/int8x4: mesmos ciclos por operação com 2-4x elementos"""
+    for n, lanes, pipelined in [(8, 2, False), (8, 4, True)]:
+        _, _, base, _ = run_csr_ops(3, n, lanes, pipelined, seed=n)
+        for mode in (MODE_INT16, MODE_INT8):
+            results, expected, cycles, perf = run_csr_ops(3, n, lanes, pipelined, seed=n, mode=mode)
+            assert results == expected, f"n={n} lanes={lanes} pipelined={pipelined} mode={mode}"
+            assert cycles == base
+            if not pipelined:
+                assert perf["latency_max"] == n // lanes
+
+
+def main():
+    print("Acelerador (núcleo Migen) via barramento CSR")
+    print(f"{'modo':>6} {'operandos':>9} {'n':>4} {'lanes':>6} {'ciclos/op':>10} {'latência':>9} {'busy%':>6}")
+    for pipelined, with_window in itertools.product((False, True), (False, True)):
+        for n, lanes in [(8, 1), (8, 4), (8, 8), (16, 4), (32, 8)]:
+            results, expected, cycles, perf = run_csr_ops(16, n, lanes, pipelined, with_window=with_window)
+            total = perf["busy_cycles"] + perf["idle_cycles"]
+            status = "OK" if results == expected else "ERRO"
+            print(f"{'pipe' if pipelined else 'seq':>6} {'janela' if with_window else 'csr':>9} {n:>4} {lanes:>6} "
+                  f"{cycles:>10.1f} {perf['latency_max']:>9} {100.0*perf['busy_cycles']/total:>6.1f}  [{status}]")
+            if results != expected:
+                raise SystemExit(1)
+
+    print()
+    print("Fila de jobs (queue_depth=4): CPU enfileira e drena, núcleo encadeia os jobs")
+    print(f"{'modo':>6} {'n':>4} {'lanes':>6} {'ciclos/op':>10} {'busy%':>6}")
+    for pipelined in (False, True):
+        for n, lanes in [(8, 1), (8, 4), (16, 4), (32, 8)]:
+            results, expected, cycles, perf = run_queue(16, n, lanes, pipelined)
+            total = perf["busy_cycles"] + perf["idle_cycles"]
+            status = "OK" if results == expected else "ERRO"
+            print(f"{'pipe' if pipelined else 'seq':>6} {n:>4} {lanes:>6} {cycles:>10.1f} "
+                  f"{100.0*perf['busy_cycles']/total:>6.1f}  [{status}]")
+            if results != expected:
+                raise SystemExit(1)
+
+    print()
+    print("Fim de operação: polling de done x IRQ (EventManager)")
+    print(f"{'n':>4} {'lanes':>6} {'lat. polling':>13} {'lat. IRQ':>9} {'CPU livre/op':>13}")
+    for n, lanes in [(8, 1), (8, 8), (16, 4), (32, 1), (32, 8)]:
+        res_p, exp_p, poll_lat, _ = run_completion(16, n, lanes, use_irq=False)
+        res_i, exp_i, irq_lat, irq_free = run_completion(16, n, lanes, use_irq=True)
+        status = "OK" if (res_p, res_i) == (exp_p, exp_i) else "ERRO"
+        print(f"{n:>4} {lanes:>6} {poll_lat:>13.1f} {irq_lat:>9.1f} {irq_free:>13.1f}  [{status}]")
+        if status != "OK":
+            raise SystemExit(1)
+
+    print()
+    print("Precisão dos operandos (with_simd): elementos por operação nas mesmas palavras")
+    print(f"{'modo':>6} {'precisão':>9} {'n':>4} {'lanes':>6} {'elementos':>10} {'ciclos/elem':>12}")
+    for pipelined in (False, True):
+        for n, lanes in [(8, 1), (8, 4)]:
+            for mode, name, per_word in [(None, "int32", 1), (MODE_INT16, "int16", 2), (MODE_INT8, "int8", 4)]:
+                results, expected, cycles, _ = run_csr_ops(8, n, lanes, pipelined, mode=mode)
+                status = "OK" if results == expected else "ERRO"
+                print(f"{'pipe' if pipelined else 'seq':>6} {name:>9} {n:>4} {lanes:>6} {n*per_word:>10} "
+                      f"{cycles/(n*per_word):>12.2f}  [{status}]")
+                if results != expected:
+                    raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+"""
+Várias unidades do acelerador (firmware_sim.MultiAccelSim): mapa dotp0..dotpK-1 como
+em SoCWithDotProduct(dotp_accels=K), despachante com coleta fora de ordem, execução
+das unidades num ThreadPoolExecutor e vazão agregada por número de unidades.
+
+Uso:
+    python ip/test_multi_accel.py
+    python -m pytest -q ip/test_multi_accel.py
+"""
+
+import random
+
+import firmware_sim as fw
+
+
+def random_jobs(num, n=8, seed=0):
+    rng = random.Random(seed)
+    return [([rng.getrandbits(32) - (1 << 31) for _ in range(n)],
+             [rng.getrandbits(32) - (1 << 31) for _ in range(n)]) for _ in range(num)]
+
+
+def test_unit_map():
+    assert fw.unit_prefixes(1) == ["dotp"]
+    csrs = fw.init_csrs(8, units=3)
+    assert csrs.address("dotp2_start") == csrs.address("dotp0_start") + 2 * 0x800
+    assert "dotp_start" not in csrs
+
+
+def test_dispatch_out_of_order():
+    """Unidade 1 mais rápida (LANES=4): termina antes e os resultados voltam fora de
+    ordem, cada um na posição do seu job"""
+    jobs = random_jobs(12)
+    multi = fw.MultiAccelSim(2, 8, 1)
+    multi.units[1] = fw.DotProductAccelSim(8, 4, csrs=multi.csrs, prefix="dotp1")
+    results, order = fw.dispatch(multi, jobs)
+    assert results == [fw.hw_dotp_reference(a, b) for a, b in jobs]
+    assert sorted(order) == list(range(len(jobs))) and order != sorted(order)
+    assert multi.units[1].perf["ops"] > multi.units[0].perf["ops"]
+
+    try:
+        fw.dispatch(fw.MultiAccelSim(2, fast=True), jobs)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("despacho aceito com unidades no modo rápido")
+
+
+def test_threaded():
+    jobs = random_jobs(40, n=16)
+    multi = fw.MultiAccelSim(4, 16, 2, fast=True)
+    assert multi.run_threaded(jobs) == [fw.hw_dotp_reference(a, b) for a, b in jobs]
+    # 10 jobs por unidade, 8 + 1 ciclos cada (com a captura de start)
+    assert [unit.cycles for unit in multi.units] == [90] * 4
+
+
+def test_scaling():
+    rows = fw.dispatch_scaling(4, num=64)
+    assert [row["units"] for row in rows] == [1, 2, 3, 4]
+    assert all(b["ops_per_cycle"] > a["ops_per_cycle"] for a, b in zip(rows, rows[1:]))
+    assert all(row["scaling"] <= row["units"] for row in rows) and rows[-1]["scaling"] > 3
+    # Com a CPU gastando mais que a latência por job, mais unidades quase não ajudam
+    slow = fw.dispatch_scaling(4, num=64, issue_cycles=40)
+    assert slow[-1]["scaling"] < 1.2
+
+
+def main():
+    for test in (test_unit_map, test_dispatch_out_of_order, test_threaded, test_scaling):
+        test()
+        print(f"[OK] {test.__name__}")
+    print("Todos os testes passaram.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+
+"""
+Regressão paralela (tools/regress_tb.py) sem iverilog: divisão da faixa de seeds em
+shards (cobertura, sem sobreposição, último shard menor) e leitura das falhas de um
+vvp falso que imprime "[ERRO] seed=" como o testbench, com e sem --keep-going.
+
+Uso:
+    python ip/test_regress_tb.py
+    python -m pytest -q ip/test_regress_tb.py
+"""
+
+import os
+import stat
+import sys
+import tempfile
+
+TOOLS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools")
+sys.path.insert(0, TOOLS)
+from regress_tb import ERROR_RE, make_shards, run_shard  # noqa: E402
+
+# vvp falso: +numseeds/+seedstart como o testbench; para no primeiro erro ($fatal) e
+# aborta sem saída na seed `abort`
+FAKE_VVP = """\
+import sys
+args = dict(arg[1:].split("=", 1) for arg in sys.argv[1:] if arg.startswith("+"))
+bad, abort = {bad!r}, {abort!r}
+start = int(args["seedstart"])
+for seed in range(start, start + int(args["numseeds"])):
+    if seed == abort:
+        sys.exit(2)
+    if seed in bad:
+        print(f"[ERRO] seed={{seed}} esperado=1 (0x0000000000000001) obtido=0 (0x0000000000000000)")
+        print("FATAL: tb_dot_product_accel.sv:108")
+        sys.exit(1)
+print("Todos os testes passaram.")
+"""
+
+
+def fake_vvp(tmp, bad=(), abort=None):
+    path = os.path.join(tmp, "vvp")
+    with open(path, "w") as f:
+        f.write(f"#!{sys.executable}\n" + FAKE_VVP.format(bad=set(bad), abort=abort))
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+    return path
+
+
+def test_make_shards():
+    for seed_start, seeds, shard_size in [(1, 100, 10), (1, 101, 10), (7, 3, 10), (0, 1, 1), (-5, 23, 4)]:
+        shards = make_shards(seed_start, seeds, shard_size)
+        covered = [s for start, count in shards for s in range(start, start + count)]
+        # Cobertura exata, em ordem e sem sobreposição
+        assert covered == list(range(seed_start, seed_start + seeds))
+        assert all(0 < count <= shard_size for _, count in shards)
+        # Só o último shard fica com o resto
+        assert all(count == shard_size for _, count in shards[:-1])
+        assert shards[-1][1] == seeds - shard_size * (len(shards) - 1)
+    assert make_shards(1, 101, 10)[-1] == (101, 1)
+
+
+def test_error_line():
+    line = "[ERRO] seed=-12 esperado=3 (0x0000000000000003) obtido=0 (0x0000000000000000)"
+    assert int(ERROR_RE.search("[OK] seed=4 resultado=0\n" + line).group(1)) == -12
+    assert ERROR_RE.search("[OK] seed=4 resultado=0 (0x0000000000000000)") is None
+
+
+def test_run_shard():
+    with tempfile.TemporaryDirectory() as tmp:
+        vvp = fake_vvp(tmp, bad=(5, 9))
+        ok = run_shard("tb.vvp", 10, 5, vvp=vvp)
+        assert ok["failures"] == [] and ok["seeds_run"] == 5 and ok["returncode"] == 0
+
+        # Para na primeira falha: seeds 1..5 executadas
+        stop = run_shard("tb.vvp", 1, 11, vvp=vvp)
+        assert [f["seed"] for f in stop["failures"]] == [5] and stop["seeds_run"] == 5
+        assert stop["failures"][0]["output"].startswith("[ERRO] seed=5 ")
+
+        # --keep-going: retoma na seed seguinte à que falhou e cobre o shard inteiro
+        keep = run_shard("tb.vvp", 1, 11, keep_going=True, vvp=vvp)
+        assert [f["seed"] for f in keep["failures"]] == [5, 9] and keep["seeds_run"] == 11
+        assert keep["returncode"] == 0
+
+        # Falha sem linha [ERRO]: seed desconhecida, sem retomada
+        vvp = fake_vvp(tmp, abort=3)
+        aborted = run_shard("tb.vvp", 1, 11, keep_going=True, vvp=vvp)
+        assert [f["seed"] for f in aborted["failures"]] == [None] and aborted["returncode"] == 2
+
+
+def main():
+    for test in (test_make_shards, test_error_line, test_run_shard):
+        test()
+        print(f"[OK] {test.__name__}")
+    print("Todos os testes passaram.")
+
+
+if __name__ == "__main__":
+    main()
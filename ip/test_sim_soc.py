@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+
+"""
+Execução do simulador do SoC (ip/sim_soc.py, run_firmware) com um Vsim falso: a UART
+vai para o log até o fim da demo e o prazo encerra um firmware travado mesmo sem
+nenhuma saída nova.
+
+Uso:
+    python ip/test_sim_soc.py
+    python -m pytest -q ip/test_sim_soc.py
+"""
+
+import os
+import stat
+import tempfile
+import time
+
+from sim_soc import END_MARKER, run_firmware
+
+
+def fake_vsim(gateware_dir, script):
+    """obj_dir/Vsim como script de shell"""
+    path = os.path.join(gateware_dir, "obj_dir", "Vsim")
+    os.makedirs(os.path.dirname(path))
+    with open(path, "w") as f:
+        f.write("#!/bin/sh\n" + script)
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+
+
+def test_end_marker():
+    with tempfile.TemporaryDirectory() as tmp:
+        fake_vsim(tmp, f"printf 'Demo\\r\\n{END_MARKER}\\r\\n'\nsleep 30\n")
+        log = os.path.join(tmp, "uart_log.txt")
+        t0 = time.monotonic()
+        lines = run_firmware(tmp, log, timeout=20)
+        assert lines == ["Demo", END_MARKER]
+        assert time.monotonic() - t0 < 10
+        with open(log) as f:
+            assert f.read() == f"Demo\n{END_MARKER}\n"
+
+
+def test_timeout_without_output():
+    # Firmware preso em while (!hw_done()); depois da primeira linha, nada mais chega
+    with tempfile.TemporaryDirectory() as tmp:
+        fake_vsim(tmp, "echo 'LiteX Dot-Product Accelerator Demo'\nsleep 30\n")
+        t0 = time.monotonic()
+        assert run_firmware(tmp, os.path.join(tmp, "uart_log.txt"), timeout=1) is None
+        assert time.monotonic() - t0 < 10
+
+
+def main():
+    for test in (test_end_marker, test_timeout_without_output):
+        test()
+        print(f"[OK] {test.__name__}")
+    print("Todos os testes passaram.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+
+"""
+Leitura dos logs do yosys (formatos novo e antigo do `stat`) e do nextpnr usada pela
+varredura de projeto (ip/sweep_soc.py). Não requer toolchain FPGA.
+
+Uso:
+    python ip/test_sweep_soc.py
+    python -m pytest -q ip/test_sweep_soc.py
+"""
+
+import os
+import tempfile
+
+import sweep_soc
+
+YOSYS_NEW = """
+3.51. Printing statistics.
+
+=== colorlight_i5 ===
+        8 cells
+        8   MULT18X18D
+     1077   LUT4
+
+=== design hierarchy ===
+        8   MULT18X18D
+       92   CCU2C
+     3210   LUT4
+     2646   TRELLIS_FF
+"""
+
+YOSYS_OLD = """
+2.49. Printing statistics.
+
+=== colorlight_i5 ===
+
+   Number of cells:               5765
+     CCU2C                         380
+     DP16KD                          8
+     LUT4                         3510
+     MULT18X18D                      4
+     TRELLIS_FF                   2100
+"""
+
+NEXTPNR = """Info: Device utilisation:
+Info: \t          TRELLIS_IO:    10/  365     2%
+Info: \t              DP16KD:     8/  108     7%
+Info: \t          MULT18X18D:     4/   72     5%
+Info: \t        TRELLIS_COMB:  3526/43848     8%
+Info: \t          TRELLIS_FF:  2045/43848     4%
+Info: Max frequency for clock '$glbnet$crg_clkout': 80.10 MHz (PASS at 60.00 MHz)
+Info: Routing..
+Info: Max frequency for clock '$glbnet$crg_clkout': 57.20 MHz (FAIL at 60.00 MHz)
+"""
+
+
+def parse_text(func, text):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "log")
+        with open(path, "w") as f:
+            f.write(text)
+        return func(path)
+
+
+def test_yosys_stat_formats():
+    """Último stat (hierarquia completa) nos dois formatos de saída do yosys"""
+    new = parse_text(sweep_soc.parse_yosys_report, YOSYS_NEW)
+    assert new == {"MULT18X18D": 8, "CCU2C": 92, "LUT4": 3210, "TRELLIS_FF": 2646}
+    old = parse_text(sweep_soc.parse_yosys_report, YOSYS_OLD)
+    assert old == {"CCU2C": 380, "DP16KD": 8, "LUT4": 3510, "MULT18X18D": 4, "TRELLIS_FF": 2100}
+
+
+def test_nextpnr_and_summary():
+    """Uso pós-PnR, Fmax após o roteamento e vazão limitada pela Fmax"""
+    util, clocks = parse_text(sweep_soc.parse_nextpnr_log, NEXTPNR)
+    assert util["TRELLIS_COMB"] == (3526, 43848) and util["DP16KD"] == (8, 108)
+    assert clocks == {"$glbnet$crg_clkout": (57.2, 60.0, False)}
+
+    with tempfile.TemporaryDirectory() as gw:
+        with open(os.path.join(gw, "top.rpt"), "w") as f:
+            f.write(YOSYS_NEW)
+        with open(os.path.join(gw, sweep_soc.BUILD_LOG), "w") as f:
+            f.write(NEXTPNR)
+        point = dict(sys_clk_freq=60e6, n=8, lanes=4, pipelined=False)
+        row = sweep_soc.summarize(point, gw, "top")
+    assert row["name"] == "f60_n8_l4"
+    assert (row["lut4"], row["comb"], row["dsp"], row["bram"]) == (3210, 3526, 4, 8)
+    assert row["fmax_mhz"] == 57.2 and row["timing_ok"] == 0
+    # N/LANES + 1 ciclos por operação no núcleo sequencial, a 57.2 MHz
+    assert row["cycles_per_op"] == 3
+    assert row["ops_per_s"] == round(57.2e6 / 3)
+    assert row["ops_per_s_per_lut"] == round(row["ops_per_s"] / 3526, 1)
+
+
+def main():
+    for test in (test_yosys_stat_formats, test_nextpnr_and_summary):
+        test()
+        print(f"[OK] {test.__name__}")
+    print("Todos os testes passaram.")
+
+
+if __name__ == "__main__":
+    main()
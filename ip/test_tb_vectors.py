@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+
+"""
+Arquivos de estímulo do testbench (tools/tb_vectors.py) sem iverilog: linhas do
+$readmemh com o elemento N-1 nos dígitos mais significativos (relidas por um parser
+independente), resultados de 64 bits com sinal relidos como o golden de batch_dotp e
+o corpus de casos de borda.
+
+Uso:
+    python ip/test_tb_vectors.py
+    python -m pytest -q ip/test_tb_vectors.py
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+TOOLS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools")
+sys.path.insert(0, TOOLS)
+from tb_vectors import INT32_MAX, INT32_MIN, batch_dotp, corner_vectors, read_results, write_vectors  # noqa: E402
+
+
+def parse_vector_line(line, n):
+    """Linha do $readmemh -> elementos 0..N-1 (signed); o elemento i ocupa os bits
+    [32*i +: 32] da palavra, ou seja, o N-1 vem primeiro na linha"""
+    assert len(line) == 8 * n
+    words = [int(line[8 * (n - 1 - i):8 * (n - i)], 16) for i in range(n)]
+    return [w - (1 << 32) if w >> 31 else w for w in words]
+
+
+def random_vectors(m, n, seed):
+    rng = np.random.default_rng(seed)
+    a = rng.integers(INT32_MIN, INT32_MAX + 1, size=(m, n), dtype=np.int32)
+    b = rng.integers(INT32_MIN, INT32_MAX + 1, size=(m, n), dtype=np.int32)
+    return a, b
+
+
+def test_hex_round_trip():
+    for n in (1, 3, 8, 16):
+        a, b = random_vectors(25, n, seed=n)
+        a[0] = np.arange(n)          # ordem visível: 0, 1, ..., n-1
+        expected, _ = batch_dotp(a, b)
+        with tempfile.TemporaryDirectory() as tmp:
+            prefix = os.path.join(tmp, "vec0000")
+            write_vectors(prefix, a, b, expected)
+            for name, v in (("a", a), ("b", b)):
+                with open(f"{prefix}_{name}.hex") as f:
+                    lines = f.read().splitlines()
+                assert [parse_vector_line(line, n) for line in lines] == v.tolist()
+            with open(f"{prefix}_a.hex") as f:
+                # Elemento N-1 nos dígitos mais significativos
+                assert f.readline().strip() == "".join(f"{i:08x}" for i in reversed(range(n)))
+            # O golden gravado volta igual (sinal incluído) pelo leitor de resultados
+            assert read_results(f"{prefix}_expected.hex").tolist() == expected.tolist()
+
+
+def test_read_results_sign():
+    a, b = corner_vectors(8)
+    expected, _ = batch_dotp(a, b)
+    assert expected.min() < 0 < expected.max()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "vec_result.hex")
+        # Dump do testbench: $fwrite("%016h") com o resultado de 64 bits
+        with open(path, "w") as f:
+            f.writelines(f"{int(v) & (2**64 - 1):016x}\n" for v in expected)
+        got = read_results(path)
+        assert got.dtype == np.int64 and got.tolist() == expected.tolist()
+
+        with open(path, "w") as f:
+            f.write("ffffffffffffffff\n8000000000000000\n7fffffffffffffff\n")
+        assert read_results(path).tolist() == [-1, -2**63, 2**63 - 1]
+
+        with open(path, "w") as f:
+            f.write("00000000000000xx\n")
+        with pytest.raises(ValueError):
+            read_results(path)
+
+
+def test_corner_vectors():
+    for n in (1, 8, 16):
+        a, b = corner_vectors(n)
+        assert a.dtype == b.dtype == np.int32 and a.shape == b.shape == (100, n)
+        # Todas as combinações de padrões: cada par (A, B) aparece uma vez (com n=1
+        # vários padrões coincidem)
+        if n > 1:
+            assert len({(x.tobytes(), y.tobytes()) for x, y in zip(a, b)}) == 100
+        assert a.min() == INT32_MIN and a.max() == INT32_MAX
+    # n * (-2**31)**2 dá a volta no acumulador de 64 bits
+    a, b = corner_vectors(8)
+    row = next(i for i in range(100) if (a[i] == INT32_MIN).all() and (b[i] == INT32_MIN).all())
+    assert batch_dotp(a, b)[0][row] == (8 * 2**62) % 2**64
+
+
+def main():
+    for test in (test_hex_round_trip, test_read_results_sign, test_corner_vectors):
+        test()
+        print(f"[OK] {test.__name__}")
+    print("Todos os testes passaram.")
+
+
+if __name__ == "__main__":
+    main()
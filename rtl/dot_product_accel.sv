@@ -1,40 +1,42 @@
 // dot_product_accel.sv
-// Acelerador de Produto Escalar 8x32-bit (signed) com resultado 64-bit (signed)
+// Acelerador de Produto Escalar Nx32-bit (signed) com resultado 64-bit (signed)
 // Interface simples: start/done e leitura do resultado
-// Implementação sequencial: 8 ciclos por operação
+// Implementação com LANES multiplicadores em paralelo e redução por árvore de
+// somadores: N/LANES ciclos por operação (N=8, LANES=1 -> 8 ciclos)
+// Com accumulate=1 no start, o acumulador não é zerado: o resultado soma o da operação
+// anterior (linhas maiores que N encadeadas em blocos, sem soma de 64 bits na CPU)
+// Com SIMD=1, mode (amostrado em start) empacota 2 int16 ou 4 int8 por palavra: 2-4x
+// mais elementos pelos mesmos N/LANES ciclos, acumulados em 64 bits
 
 `timescale 1ns/1ps
 
-module dot_product_accel (
+module dot_product_accel #(
+    parameter int N     = 8,           // elementos por vetor
+    parameter int LANES = 1,           // multiplicadores em paralelo (N múltiplo de LANES)
+    parameter bit SIMD  = 0            // 1: modos empacotados int16x2/int8x4 (porta mode)
+) (
     input  logic                 clk,
     input  logic                 rst,          // síncrono, ativo alto
 
     // Controle
     input  logic                 start,        // pulso de 1 ciclo (ou nível) para iniciar
+    input  logic                 accumulate,   // amostrado em start: 1 mantém o acumulador
+    input  logic [1:0]           mode,         // amostrado em start: 0 int32, 1 int16x2, 2 int8x4
     output logic                 done,         // fica em 1 até novo start ou reset
+    output logic                 busy,         // 1 enquanto a operação está em curso
 
-    // Operandos (signed 32-bit)
-    input  logic signed [31:0]   a0,
-    input  logic signed [31:0]   a1,
-    input  logic signed [31:0]   a2,
-    input  logic signed [31:0]   a3,
-    input  logic signed [31:0]   a4,
-    input  logic signed [31:0]   a5,
-    input  logic signed [31:0]   a6,
-    input  logic signed [31:0]   a7,
-    input  logic signed [31:0]   b0,
-    input  logic signed [31:0]   b1,
-    input  logic signed [31:0]   b2,
-    input  logic signed [31:0]   b3,
-    input  logic signed [31:0]   b4,
-    input  logic signed [31:0]   b5,
-    input  logic signed [31:0]   b6,
-    input  logic signed [31:0]   b7,
+    // Operandos (signed 32-bit) empacotados: elemento i em a[32*i +: 32]
+    input  logic [N*32-1:0]      a,
+    input  logic [N*32-1:0]      b,
 
     // Resultado (signed 64-bit)
     output logic signed [63:0]   result
 );
 
+    localparam int STEPS = N / LANES;                            // ciclos por operação
+    localparam int IW    = (STEPS > 1) ? $clog2(STEPS) : 1;      // largura do índice
+    localparam int TL    = (LANES > 1) ? (1 << $clog2(LANES)) : 1; // folhas da árvore
+
     // Estados
     typedef enum logic [1:0] {
         S_IDLE = 2'b00,
@@ -45,34 +47,74 @@ module dot_product_accel (
     state_t state, state_n;
 
     // Registradores internos para latência/consistência dos dados
-    logic signed [31:0] A [0:7];
-    logic signed [31:0] B [0:7];
+    logic signed [31:0] A [0:N-1];
+    logic signed [31:0] B [0:N-1];
+    logic [1:0]         M;               // mode da operação em curso
 
-    logic [3:0]               idx;      // 0..7
-    logic [3:0]               idx_n;
+    logic [IW-1:0]            idx;      // 0..STEPS-1
+    logic [IW-1:0]            idx_n;
     logic signed [63:0]       acc;      // acumulador
     logic signed [63:0]       acc_n;
-    logic signed [63:0]       prod;     // produto intermediário
+    logic signed [63:0]       prod;     // soma dos produtos das LANES no passo atual
 
     // Latch dos operandos em start
     always_ff @(posedge clk) begin
         if (rst) begin
-            A[0] <= '0; A[1] <= '0; A[2] <= '0; A[3] <= '0;
-            A[4] <= '0; A[5] <= '0; A[6] <= '0; A[7] <= '0;
-            B[0] <= '0; B[1] <= '0; B[2] <= '0; B[3] <= '0;
-            B[4] <= '0; B[5] <= '0; B[6] <= '0; B[7] <= '0;
+            for (int i = 0; i < N; i++) begin
+                A[i] <= '0;
+                B[i] <= '0;
+            end
+            M <= '0;
         end else if (start && (state != S_RUN)) begin
-            A[0] <= a0; A[1] <= a1; A[2] <= a2; A[3] <= a3;
-            A[4] <= a4; A[5] <= a5; A[6] <= a6; A[7] <= a7;
-            B[0] <= b0; B[1] <= b1; B[2] <= b2; B[3] <= b3;
-            B[4] <= b4; B[5] <= b5; B[6] <= b6; B[7] <= b7;
+            for (int i = 0; i < N; i++) begin
+                A[i] <= a[32*i +: 32];
+                B[i] <= b[32*i +: 32];
+            end
+            M <= mode;
         end
     end
 
-    // Multiplicação signed 32x32 -> 64 bits
-    always_comb begin
-        prod = $signed(A[idx]) * $signed(B[idx]);
-    end
+    // Produto de uma palavra de cada operando (signed 64 bits). Com SIMD=1, mode
+    // reinterpreta a palavra: 1 = 2 lanes int16, 2 = 4 lanes int8 (lane 0 nos bits
+    // menos significativos), com a soma das lanes; 0 (ou 3) = int32.
+    function automatic logic signed [63:0] word_mul(input logic [31:0] x, input logic [31:0] y,
+                                                    input logic [1:0] m);
+        begin
+            if (SIMD && m == 2'd1)
+                word_mul = 64'($signed(x[15:0])  * $signed(y[15:0]))
+                         + 64'($signed(x[31:16]) * $signed(y[31:16]));
+            else if (SIMD && m == 2'd2)
+                word_mul = 64'($signed(x[7:0])   * $signed(y[7:0]))
+                         + 64'($signed(x[15:8])  * $signed(y[15:8]))
+                         + 64'($signed(x[23:16]) * $signed(y[23:16]))
+                         + 64'($signed(x[31:24]) * $signed(y[31:24]));
+            else
+                word_mul = $signed(x) * $signed(y);
+        end
+    endfunction
+
+    // Multiplicações de palavra -> 64 bits (uma por lane) e árvore de somadores.
+    // tree[TL-1 .. 2*TL-2] são as folhas; o nó k soma os filhos 2k+1 e 2k+2;
+    // a raiz (nó 0) é a soma parcial do passo. Lanes de preenchimento valem 0.
+    wire [64*(2*TL-1)-1:0] tree;
+
+    genvar g;
+    generate
+        for (g = 0; g < TL; g = g + 1) begin : g_leaf
+            if (g < LANES) begin : g_mul
+                assign tree[64*(TL-1+g) +: 64] = word_mul(A[idx*LANES + g], B[idx*LANES + g], M);
+            end else begin : g_pad
+                assign tree[64*(TL-1+g) +: 64] = 64'd0;
+            end
+        end
+        for (g = 0; g < TL - 1; g = g + 1) begin : g_add
+            assign tree[64*g +: 64] = tree[64*(2*g+1) +: 64] + tree[64*(2*g+2) +: 64];
+        end
+    endgenerate
+
+    assign prod = $signed(tree[63:0]);
+
+    assign busy = (state == S_RUN);
 
     // Próximos estados/valores
     always_comb begin
@@ -83,24 +125,24 @@ module dot_product_accel (
     case (state)
             S_IDLE: begin
                 if (start) begin
-                    idx_n = 4'd0;
-                    acc_n = 64'sd0;
+                    idx_n = '0;
+                    acc_n = accumulate ? acc : 64'sd0;
                     state_n = S_RUN;
                 end
             end
             S_RUN: begin
-                acc_n = acc + prod; // acumula produto do índice atual
-                if (idx == 4'd7) begin
+                acc_n = acc + prod; // acumula produtos do passo atual
+                if (idx == STEPS - 1) begin
                     state_n = S_DONE;
                 end else begin
-                    idx_n = idx + 4'd1;
+                    idx_n = idx + 1'b1;
                 end
             end
             S_DONE: begin
                 // Mantém DONE até novo start
                 if (start) begin
-                    idx_n = 4'd0;
-                    acc_n = 64'sd0;
+                    idx_n = '0;
+                    acc_n = accumulate ? acc : 64'sd0;
                     state_n = S_RUN;
                 end
             end
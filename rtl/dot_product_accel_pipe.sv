@@ -0,0 +1,179 @@
+// dot_product_accel_pipe.sv
+// Variante pipeline do acelerador de produto escalar Nx32-bit (signed) -> 64-bit
+// Entrada e saída com handshake valid/ready; um novo par de vetores é aceito a cada
+// N/LANES ciclos, sem esperar o resultado do anterior. Com SIMD=1, mode (capturado
+// com os operandos) empacota 2 int16 ou 4 int8 por palavra, como em dot_product_accel.
+//
+// Estágios (todos registrados):
+//   S0: operandos latched + sequenciador de passos (LANES elementos por passo)
+//   S1: LANES multiplicações de palavra -> 64 (32x32, 2x 16x16 ou 4x 8x8)
+//   S2: árvore de somadores dos produtos do passo
+//   S3: acumulação; no último passo o resultado vai para o registrador de saída
+// Se a saída não for consumida (out_valid && !out_ready), todo o pipeline pára.
+
+`timescale 1ns/1ps
+
+module dot_product_accel_pipe #(
+    parameter int N     = 8,           // elementos por vetor
+    parameter int LANES = 1,           // multiplicadores em paralelo (N múltiplo de LANES)
+    parameter bit SIMD  = 0            // 1: modos empacotados int16x2/int8x4 (porta mode)
+) (
+    input  logic                 clk,
+    input  logic                 rst,          // síncrono, ativo alto
+
+    // Entrada: operandos empacotados (elemento i em a[32*i +: 32])
+    input  logic                 in_valid,
+    output logic                 in_ready,
+    input  logic [N*32-1:0]      a,
+    input  logic [N*32-1:0]      b,
+    input  logic [1:0]           mode,         // 0 int32, 1 int16x2, 2 int8x4
+
+    // Saída: resultado signed 64-bit
+    output logic                 out_valid,
+    input  logic                 out_ready,
+    output logic signed [63:0]   out_result
+);
+
+    localparam int STEPS = N / LANES;                            // passos por operação
+    localparam int IW    = (STEPS > 1) ? $clog2(STEPS) : 1;      // largura do índice
+    localparam int TL    = (LANES > 1) ? (1 << $clog2(LANES)) : 1; // folhas da árvore
+
+    // Avanço global do pipeline (pára quando a saída está cheia e não é consumida)
+    logic en;
+    assign en = !out_valid || out_ready;
+
+    // ---------------------------------------------------------------- S0
+    logic signed [31:0] A [0:N-1];
+    logic signed [31:0] B [0:N-1];
+    logic [1:0]         M;                   // mode do conjunto em curso
+    logic               busy;                // há passos a emitir
+    logic [IW-1:0]      idx;
+    logic               last_step;
+
+    assign last_step = (idx == STEPS - 1);
+    // Aceita um novo conjunto quando ocioso ou no ciclo em que o último passo é emitido
+    assign in_ready  = en && (!busy || last_step);
+
+    always_ff @(posedge clk) begin
+        if (rst) begin
+            busy <= 1'b0;
+            idx  <= '0;
+            for (int i = 0; i < N; i++) begin
+                A[i] <= '0;
+                B[i] <= '0;
+            end
+            M    <= '0;
+        end else if (en) begin
+            if (in_valid && in_ready) begin
+                for (int i = 0; i < N; i++) begin
+                    A[i] <= a[32*i +: 32];
+                    B[i] <= b[32*i +: 32];
+                end
+                M    <= mode;
+                busy <= 1'b1;
+                idx  <= '0;
+            end else if (busy) begin
+                if (last_step) begin
+                    busy <= 1'b0;
+                    idx  <= '0;
+                end else begin
+                    idx  <= idx + 1'b1;
+                end
+            end
+        end
+    end
+
+    // ---------------------------------------------------------------- S1
+    // Produto de palavra como em dot_product_accel.sv (soma das lanes empacotadas)
+    function automatic logic signed [63:0] word_mul(input logic [31:0] x, input logic [31:0] y,
+                                                    input logic [1:0] m);
+        begin
+            if (SIMD && m == 2'd1)
+                word_mul = 64'($signed(x[15:0])  * $signed(y[15:0]))
+                         + 64'($signed(x[31:16]) * $signed(y[31:16]));
+            else if (SIMD && m == 2'd2)
+                word_mul = 64'($signed(x[7:0])   * $signed(y[7:0]))
+                         + 64'($signed(x[15:8])  * $signed(y[15:8]))
+                         + 64'($signed(x[23:16]) * $signed(y[23:16]))
+                         + 64'($signed(x[31:24]) * $signed(y[31:24]));
+            else
+                word_mul = $signed(x) * $signed(y);
+        end
+    endfunction
+
+    logic [64*TL-1:0] m_prod;
+    logic             m_valid, m_first, m_last;
+
+    always_ff @(posedge clk) begin
+        if (rst) begin
+            m_valid <= 1'b0;
+            m_first <= 1'b0;
+            m_last  <= 1'b0;
+            m_prod  <= '0;
+        end else if (en) begin
+            m_valid <= busy;
+            m_first <= (idx == 0);
+            m_last  <= last_step;
+            for (int l = 0; l < TL; l++) begin
+                if (l < LANES)
+                    m_prod[64*l +: 64] <= word_mul(A[idx*LANES + l], B[idx*LANES + l], M);
+                else
+                    m_prod[64*l +: 64] <= 64'd0;
+            end
+        end
+    end
+
+    // ---------------------------------------------------------------- S2
+    // tree[TL-1 .. 2*TL-2] são as folhas; o nó k soma os filhos 2k+1 e 2k+2
+    wire [64*(2*TL-1)-1:0] tree;
+
+    genvar g;
+    generate
+        for (g = 0; g < TL; g = g + 1) begin : g_leaf
+            assign tree[64*(TL-1+g) +: 64] = m_prod[64*g +: 64];
+        end
+        for (g = 0; g < TL - 1; g = g + 1) begin : g_add
+            assign tree[64*g +: 64] = tree[64*(2*g+1) +: 64] + tree[64*(2*g+2) +: 64];
+        end
+    endgenerate
+
+    logic signed [63:0] s_sum;
+    logic               s_valid, s_first, s_last;
+
+    always_ff @(posedge clk) begin
+        if (rst) begin
+            s_valid <= 1'b0;
+            s_first <= 1'b0;
+            s_last  <= 1'b0;
+            s_sum   <= '0;
+        end else if (en) begin
+            s_valid <= m_valid;
+            s_first <= m_first;
+            s_last  <= m_last;
+            s_sum   <= $signed(tree[63:0]);
+        end
+    end
+
+    // ---------------------------------------------------------------- S3
+    logic signed [63:0] acc;
+    logic signed [63:0] acc_n;
+
+    assign acc_n = (s_first ? 64'sd0 : acc) + s_sum;
+
+    always_ff @(posedge clk) begin
+        if (rst) begin
+            acc        <= '0;
+            out_valid  <= 1'b0;
+            out_result <= '0;
+        end else if (en) begin
+            if (s_valid) begin
+                acc <= acc_n;
+            end
+            out_valid <= s_valid && s_last;
+            if (s_valid && s_last) begin
+                out_result <= acc_n;
+            end
+        end
+    end
+
+endmodule
@@ -0,0 +1,301 @@
+"""
+Bancada cocotb do wrapper DotProductAccel pelo barramento CSR do LiteX.
+
+O DUT é o Verilog gerado por ip/csr_top.py (wrapper + banco de CSRs, com o núcleo SV
+de rtl/ ou o Migen), acessado como a CPU acessa: uma escrita ou uma leitura de
+palavra por ciclo, com o dado lido registrado no banco. Os resultados são conferidos
+contra o modelo NumPy (firmware_sim.batch_dotp) e cada operação é medida em ciclos
+de barramento: escrita dos operandos, start até done visível e leitura do resultado.
+
+No núcleo sequencial, cada escrita de 1 em start dispara uma operação. A bancada
+varre o atraso entre as escritas de 1 e 0 em start até além de N/LANES e confere nos
+contadores de desempenho que o núcleo executa uma única operação, mesmo com start
+ainda em 1 quando chega em DONE. Também mede por quantos ciclos done ainda mostra o
+valor da operação anterior.
+
+Com a fila de jobs (QUEUE no Makefile, CSR push no lugar de start), test_queue
+substitui test_latency. Os pushes saem em sequência, trocando um operando entre eles,
+enquanto o núcleo ainda calcula: os jobs esperam na fila, e cada resultado (com sua
+tag) só confere se o núcleo usar os operandos copiados no push, não os CSRs atuais.
+
+As medidas vão para COCOTB_LATENCY_REPORT (JSON). Os valores esperados não ficam no
+código: com LATENCY_BASELINE (por padrão tb/cocotb/baseline/<config>.json, medido com
+a própria bancada), qualquer contagem de ciclos maior que a da linha de base, ou uma
+margem de start menor, falha o teste.
+
+Uso (ver tb/cocotb/Makefile):
+    make cocotb                              # N=8 LANES=1, Verilator (ou Icarus)
+    make cocotb N=16 LANES=4 PIPELINED=1 COCOTB_SIM=verilator
+    make -C tb/cocotb PIPELINED=1 QUEUE=4 IMPL=migen
+"""
+
+import json
+import os
+import sys
+
+import cocotb
+import pytest
+from cocotb.clock import Clock
+from cocotb.triggers import ClockCycles, FallingEdge, RisingEdge
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "..", "ip"))
+from csr_file import CSRFile                                  # noqa: E402
+from firmware_sim import PERF_CLEAR, PERF_SNAPSHOT, batch_dotp, np  # noqa: E402
+
+OPS = int(os.environ.get("OPS", "32"))
+
+# Mapa do DUT, exportado pelo Makefile. Sem ele (pytest na raiz do repositório) o
+# módulo é ignorado: a bancada só roda pelo Makefile/cocotb
+CSR_CSV = os.environ.get("DOTP_CSR_CSV")
+if CSR_CSV is None:
+    pytest.skip("bancada cocotb: rode com make -C tb/cocotb", allow_module_level=True)
+
+# Fila de jobs no DUT: decide qual dos testes roda
+QUEUED = "dotp_push" in CSRFile.from_csv(CSR_CSV)
+
+# Jobs enfileirados antes de ler os resultados (cabem na FIFO de resultados padrão)
+QUEUE_ROUND = 8
+
+# Medidas comparadas com a linha de base (menor é melhor)
+LATENCY_KEYS = ("write_cycles", "start_to_done", "readback_cycles", "op_cycles", "core_latency", "done_fall",
+                "queue_cycles")
+
+
+class CSRBus:
+    """Mestre do barramento CSR: sinais mudam na borda de descida, o banco amostra na
+    de subida; cada acesso conta um ciclo em `cycles`"""
+    def __init__(self, dut, csrs):
+        self.dut    = dut
+        self.csrs   = csrs
+        self.has_re = hasattr(dut, "csr_re")
+        self.cycles = 0
+
+    def word(self, name):
+        return self.csrs.address(f"dotp_{name}") >> 2
+
+    async def write(self, name, value):
+        dut = self.dut
+        dut.csr_adr.value   = self.word(name)
+        dut.csr_dat_w.value = value & 0xFFFFFFFF
+        dut.csr_we.value    = 1
+        await RisingEdge(dut.sys_clk)
+        await FallingEdge(dut.sys_clk)
+        dut.csr_we.value = 0
+        self.cycles += 1
+
+    async def read(self, name, words=1):
+        # Registradores largos: várias palavras, a mais significativa primeiro
+        dut   = self.dut
+        value = 0
+        for k in range(words):
+            dut.csr_adr.value = self.word(name) + k
+            if self.has_re:
+                dut.csr_re.value = 1
+            await RisingEdge(dut.sys_clk)          # banco registra dat_r nesta borda
+            await FallingEdge(dut.sys_clk)
+            if self.has_re:
+                dut.csr_re.value = 0
+            value = (value << 32) | int(dut.csr_dat_r.value)
+            self.cycles += 1
+        return value
+
+    async def idle(self, cycles):
+        if cycles:
+            await ClockCycles(self.dut.sys_clk, cycles, rising=False)
+        self.cycles += cycles
+
+
+async def setup(dut):
+    csrs = CSRFile.from_csv(CSR_CSV)
+    cocotb.start_soon(Clock(dut.sys_clk, 10, "ns").start())
+    bus = CSRBus(dut, csrs)
+    dut.csr_we.value = 0
+    dut.csr_adr.value = 0
+    dut.csr_dat_w.value = 0
+    if bus.has_re:
+        dut.csr_re.value = 0
+    dut.sys_rst.value = 1
+    await ClockCycles(dut.sys_clk, 4)
+    await FallingEdge(dut.sys_clk)
+    dut.sys_rst.value = 0
+    return bus, csrs.constants
+
+
+def random_vectors(num, n, seed=0):
+    rng = np.random.default_rng(seed)
+    a = rng.integers(-2**31, 2**31, size=(num, n), dtype=np.int32)
+    b = rng.integers(-2**31, 2**31, size=(num, n), dtype=np.int32)
+    # Cantos: extremos de int32 (wraparound do acumulador de 64 bits)
+    a[0, :] = np.iinfo(np.int32).min
+    b[0, :] = np.iinfo(np.int32).min
+    return a, b
+
+
+async def write_vectors(bus, a, b, n):
+    digits = len(str(n - 1))
+    for vec, values in (("a", a), ("b", b)):
+        for i, v in enumerate(values):
+            await bus.write(f"{vec}{i:0{digits}d}", int(v))
+
+
+async def read_result(bus):
+    lo = await bus.read("result_lo")
+    hi = await bus.read("result_hi")
+    value = (hi << 32) | lo
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+async def perf_counter(bus, name):
+    # O campo snapshot pulsa no ciclo seguinte à escrita; os CSRs mudam na borda depois
+    await bus.write("perf_control", PERF_SNAPSHOT)
+    await bus.idle(2)
+    return await bus.read(f"perf_{name}", words=2)
+
+
+async def start_pulse(bus, delay):
+    """Escreve 1 e, `delay` ciclos depois, 0 em start; lê done até cair e até subir.
+    Retorna os ciclos da borda da escrita de start até a leitura de done=0 e até a
+    de done=1 (com done=0 antes do start, a primeira leitura já conta como queda)."""
+    await bus.write("start", 1)
+    t0 = bus.cycles
+    await bus.idle(delay)
+    await bus.write("start", 0)
+    while await bus.read("done"):
+        pass
+    fall = bus.cycles - t0
+    while not await bus.read("done"):
+        pass
+    return fall, bus.cycles - t0
+
+
+def write_report(report):
+    path = os.environ.get("COCOTB_LATENCY_REPORT")
+    if path:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+    baseline = os.environ.get("LATENCY_BASELINE")
+    if baseline and os.path.isfile(baseline):
+        with open(baseline) as f:
+            base = json.load(f)
+        if base.get("config") != report["config"]:
+            raise AssertionError(f"linha de base de outra configuração: {base.get('config')} != {report['config']}")
+        worse = [f"{key}: {base[key]} -> {report[key]}" for key in LATENCY_KEYS
+                 if key in base and report.get(key) is not None and report[key] > base[key]]
+        assert not worse, "latência pior que a linha de base: " + ", ".join(worse)
+
+
+@cocotb.test(skip=QUEUED)
+async def test_latency(dut):
+    """Operações aleatórias pelo barramento CSR: resultados x NumPy e ciclos por fase"""
+    bus, constants = await setup(dut)
+    n, lanes = constants["dotp_n"], constants["dotp_lanes"]
+    pipelined = bool(constants["dotp_pipelined"])
+    steps = n // lanes
+    a, b = random_vectors(OPS, n)
+    expected, _ = batch_dotp(a, b, lanes)
+
+    writes, dones, reads, latencies = [], [], [], []
+    for k in range(OPS):
+        c0 = bus.cycles
+        await write_vectors(bus, a[k], b[k], n)
+        writes.append(bus.cycles - c0)
+        if pipelined:
+            # Escrita de 1 enfileira os operandos; done = FIFO de resultados não vazia
+            await bus.write("start", 1)
+            t0 = bus.cycles
+            while not await bus.read("done"):
+                pass
+            dones.append(bus.cycles - t0)
+        else:
+            _, cycles = await start_pulse(bus, 0)
+            dones.append(cycles)
+        c0 = bus.cycles
+        result = await read_result(bus)
+        reads.append(bus.cycles - c0)
+        assert result == int(expected[k]), f"op {k}: esperado={int(expected[k])} obtido={result}"
+        latencies.append(await perf_counter(bus, "latency_last"))
+
+    # A latência não depende dos dados
+    assert len(set(dones)) == 1, f"start até done variou: {sorted(set(dones))}"
+    assert len(set(latencies)) == 1, f"latência do núcleo variou: {sorted(set(latencies))}"
+    start_to_done = dones[0]
+
+    report = {
+        "config": {"n": n, "lanes": lanes, "pipelined": pipelined, "impl": constants["dotp_impl"]},
+        "ops": OPS,
+        "write_cycles": writes[0],
+        "start_to_done": start_to_done,
+        "readback_cycles": reads[0],
+        # start_to_done já inclui a escrita de 0 em start (núcleo sequencial)
+        "op_cycles": writes[0] + 1 + start_to_done + reads[0],
+        "core_latency": latencies[0],
+    }
+    if not pipelined:
+        report.update(await sweep_start_hold(bus, steps))
+    dut._log.info("Latência por operação (ciclos do barramento CSR): " + ", ".join(
+        f"{key}={value}" for key, value in report.items() if key != "config"))
+    write_report(report)
+
+
+async def sweep_start_hold(bus, steps):
+    """Núcleo sequencial: start mantido em 1 por até N/LANES + 2 ciclos depois da
+    escrita dispara uma única operação; ciclos até done (da operação anterior) cair"""
+    n = bus.csrs.constants["dotp_n"]
+    await write_vectors(bus, [1] * n, [2] * n, n)
+    done_fall, _ = await start_pulse(bus, 0)
+    for delay in range(steps + 3):
+        await bus.write("perf_control", PERF_CLEAR)
+        await bus.write("start", 1)
+        await bus.idle(delay)
+        await bus.write("start", 0)
+        # Tempo para um reinício indevido terminar antes de contar as operações
+        await bus.idle(steps + 4)
+        ops = await perf_counter(bus, "ops")
+        assert await read_result(bus) == 2 * n
+        assert ops == 1, f"start mantido por {delay} ciclos: {ops} operações"
+    return {"done_fall": done_fall}
+
+
+@cocotb.test(skip=not QUEUED)
+async def test_queue(dut):
+    """Fila de jobs: pushes seguidos mudando um operando por job, resultados e tags x NumPy"""
+    bus, constants = await setup(dut)
+    n, lanes = constants["dotp_n"], constants["dotp_lanes"]
+    a, b = random_vectors(OPS, n)
+    # Job k: os operandos do job k-1 com o elemento k % n de A trocado (uma escrita por push)
+    jobs_a = np.repeat(a[:1], OPS, axis=0)
+    for k in range(1, OPS):
+        jobs_a[k:, k % n] = a[k, k % n]
+    jobs_b = np.repeat(b[:1], OPS, axis=0)
+    expected, _ = batch_dotp(jobs_a, jobs_b, lanes)
+    digits = len(str(n - 1))
+
+    await write_vectors(bus, jobs_a[0], jobs_b[0], n)
+    c0 = bus.cycles
+    for first in range(0, OPS, QUEUE_ROUND):
+        jobs = range(first, min(first + QUEUE_ROUND, OPS))
+        for k in jobs:
+            if k:
+                await bus.write(f"a{k % n:0{digits}d}", int(jobs_a[k, k % n]))
+            while not await bus.read("ready"):
+                pass
+            await bus.write("push", k & 0xFF)
+        for k in jobs:
+            while not await bus.read("done"):
+                pass
+            tag = await bus.read("tag")
+            result = await read_result(bus)
+            assert tag == k & 0xFF, f"job {k}: tag {tag}"
+            assert result == int(expected[k]), f"job {k}: esperado={int(expected[k])} obtido={result}"
+
+    report = {
+        "config": {"n": n, "lanes": lanes, "pipelined": bool(constants["dotp_pipelined"]),
+                   "impl": constants["dotp_impl"], "queue_depth": constants["dotp_queue_depth"]},
+        "ops": OPS,
+        # Do primeiro push até a leitura do último resultado
+        "queue_cycles": bus.cycles - c0,
+    }
+    dut._log.info(f"Fila de jobs: {OPS} jobs em {report['queue_cycles']} ciclos do barramento CSR")
+    write_report(report)
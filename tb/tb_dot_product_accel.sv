@@ -1,22 +1,32 @@
 // tb_dot_product_accel.sv
 `timescale 1ns/1ps
 
-module tb_dot_product_accel;
+module tb_dot_product_accel #(
+    parameter int N     = 8,   // sobrescreva com iverilog -Ptb_dot_product_accel.N=...
+    parameter int LANES = 1,
+    parameter int VEC_DEPTH = 1024  // vetores por arquivo no modo +vecprefix (tools/tb_vectors.py)
+);
     logic clk;
     logic rst;
     logic start;
+    logic accumulate;
+    logic [1:0] mode;   // 0 int32, 1 int16x2, 2 int8x4 (DUT com SIMD=1)
     logic done;
-    logic signed [31:0] a[0:7];
-    logic signed [31:0] b[0:7];
-    logic signed [31:0] a0,a1,a2,a3,a4,a5,a6,a7;
-    logic signed [31:0] b0,b1,b2,b3,b4,b5,b6,b7;
+    logic signed [31:0] a[0:N-1];
+    logic signed [31:0] b[0:N-1];
+    logic [N*32-1:0] a_bus;
+    logic [N*32-1:0] b_bus;
     logic signed [63:0] result;
+    // Modos controlados por plusargs (ver abaixo), usados em run_case
+    integer fullrange;
+    integer quiet;
+    // Valor inicial da referência (resultado anterior quando accumulate=1)
+    longint signed acc_base;
 
     // DUT
-    dot_product_accel dut(
-        .clk(clk), .rst(rst), .start(start), .done(done),
-        .a0(a0), .a1(a1), .a2(a2), .a3(a3), .a4(a4), .a5(a5), .a6(a6), .a7(a7),
-        .b0(b0), .b1(b1), .b2(b2), .b3(b3), .b4(b4), .b5(b5), .b6(b6), .b7(b7),
+    dot_product_accel #(.N(N), .LANES(LANES), .SIMD(1)) dut(
+        .clk(clk), .rst(rst), .start(start), .accumulate(accumulate), .mode(mode), .done(done),
+        .a(a_bus), .b(b_bus),
         .result(result)
     );
 
@@ -24,6 +34,24 @@ module tb_dot_product_accel;
     initial clk = 0;
     always #5 clk = ~clk;
 
+    // Referência de uma palavra no modo atual (soma das lanes empacotadas)
+    function automatic longint signed ref_mul(input logic [31:0] x, input logic [31:0] y);
+        longint signed s;
+        begin
+            s = 0;
+            if (mode == 2'd1) begin
+                for (int h = 0; h < 2; h++)
+                    s += longint'($signed(x[16*h +: 16])) * longint'($signed(y[16*h +: 16]));
+            end else if (mode == 2'd2) begin
+                for (int q = 0; q < 4; q++)
+                    s += longint'($signed(x[8*q +: 8])) * longint'($signed(y[8*q +: 8]));
+            end else begin
+                s = longint'($signed(x)) * longint'($signed(y));
+            end
+            ref_mul = s;
+        end
+    endfunction
+
     // Task de aplicação de vetores e checagem
     task run_case(input integer seed);
         integer i;
@@ -33,22 +61,33 @@ module tb_dot_product_accel;
             // Gera dados determinísticos a partir da seed
             s1 = seed;
             s2 = seed + 32;
-            for (i=0;i<8;i=i+1) begin
+            for (i=0;i<N;i=i+1) begin
                 a[i] = $signed($random(s1));
                 b[i] = $signed($random(s2));
             end
-            // Limita faixas para evitar overflow extremo nos testes
-            for (i=0;i<8;i=i+1) begin
-                a[i][31:16] = '0; // 16-bit efetivo
-                b[i][31:16] = '0;
+            if (fullrange == 0) begin
+                // Limita faixas para evitar overflow extremo nos testes
+                for (i=0;i<N;i=i+1) begin
+                    a[i][31:16] = '0; // 16-bit efetivo
+                    b[i][31:16] = '0;
+                end
+            end else if (seed % 64 == 0) begin
+                // Faixa completa: a cada 64 seeds, só extremos (-2^31 / 2^31-1),
+                // forçando o wraparound do acumulador de 64 bits
+                for (i=0;i<N;i=i+1) begin
+                    a[i] = a[i][0] ? 32'sh8000_0000 : 32'sh7FFF_FFFF;
+                    b[i] = b[i][0] ? 32'sh8000_0000 : 32'sh7FFF_FFFF;
+                end
+            end
+            for (i=0;i<N;i=i+1) begin
+                a_bus[32*i +: 32] = a[i];
+                b_bus[32*i +: 32] = b[i];
             end
-            {a0,a1,a2,a3,a4,a5,a6,a7} = {a[0],a[1],a[2],a[3],a[4],a[5],a[6],a[7]};
-            {b0,b1,b2,b3,b4,b5,b6,b7} = {b[0],b[1],b[2],b[3],b[4],b[5],b[6],b[7]};
 
             // SW referência
-            sw_sum = 0;
-            for (i=0;i<8;i=i+1) begin
-                sw_sum += longint'(a[i]) * longint'(b[i]);
+            sw_sum = acc_base;
+            for (i=0;i<N;i=i+1) begin
+                sw_sum += ref_mul(a[i], b[i]);
             end
 
             // Pulso de start
@@ -67,28 +106,100 @@ module tb_dot_product_accel;
             if (result !== sw_sum) begin
                 $display("[ERRO] seed=%0d esperado=%0d (0x%016h) obtido=%0d (0x%016h)", seed, sw_sum, sw_sum, result, result);
                 $fatal(1);
-            end else begin
+            end else if (quiet == 0) begin
                 $display("[OK] seed=%0d resultado=%0d (0x%016h)", seed, result, result);
             end
         end
     endtask
 
+    // Encadeamento: o segundo bloco (accumulate=1) soma ao resultado do primeiro
+    task run_chain(input integer seed);
+        begin
+            run_case(seed);
+            acc_base   = result;
+            accumulate = 1'b1;
+            run_case(seed + 1);
+            accumulate = 1'b0;
+            acc_base   = 0;
+        end
+    endtask
+
+    // Modos empacotados: palavras com 32 bits aleatórios (todas as lanes preenchidas)
+    task run_packed(input integer seed, input logic [1:0] m);
+        integer saved;
+        begin
+            saved     = fullrange;
+            fullrange = 1;
+            mode      = m;
+            run_case(seed);
+            mode      = 2'd0;
+            fullrange = saved;
+        end
+    endtask
+
+    // Modo arquivo: operandos carregados com $readmemh (uma linha de N*8 dígitos hex por
+    // vetor, elemento i nos bits [32*i +: 32]), aplicados em sequência; os resultados
+    // vão para <prefix>_result.hex e a comparação com o golden é feita no Python.
+    logic [N*32-1:0] a_mem [0:VEC_DEPTH-1];
+    logic [N*32-1:0] b_mem [0:VEC_DEPTH-1];
+
+    task run_file_vectors(input string prefix, input integer numvecs);
+        integer k, fd;
+        begin
+            $readmemh({prefix, "_a.hex"}, a_mem, 0, numvecs - 1);
+            $readmemh({prefix, "_b.hex"}, b_mem, 0, numvecs - 1);
+            fd = $fopen({prefix, "_result.hex"}, "w");
+            if (fd == 0) begin
+                $display("[ERRO] não foi possível criar %s_result.hex", prefix);
+                $fatal(1);
+            end
+            for (k = 0; k < numvecs; k = k + 1) begin
+                a_bus = a_mem[k];
+                b_bus = b_mem[k];
+                // start em DONE inicia direto a próxima operação (sem passar por IDLE)
+                @(posedge clk);
+                start <= 1'b1;
+                @(posedge clk);
+                start <= 1'b0;
+                while (done) @(posedge clk);
+                while (!done) @(posedge clk);
+                $fdisplay(fd, "%016h", result);
+            end
+            $fclose(fd);
+            $display("Vetores processados: %0d", numvecs);
+        end
+    endtask
+
     // Controle por plusargs:
     // +numseeds=N     -> executa N seeds sequenciais (se 0, usa modo padrão)
     // +seedstart=S    -> primeira seed (padrão 1)
     // +vcd=0          -> desabilita geração de VCD (padrão 1/habilitado)
+    // +fullrange=1    -> operandos com os 32 bits com sinal (padrão: 16 bits efetivos)
+    // +quiet=1        -> omite as linhas [OK] por seed (regressões longas)
+    // +vecprefix=P    -> modo arquivo: lê P_a.hex/P_b.hex e grava P_result.hex
+    // +numvecs=K      -> vetores no modo arquivo (até VEC_DEPTH)
     integer numseeds;
     integer seedstart;
     integer vcd_en;
+    integer numvecs;
+    string  vecprefix;
 
     initial begin
         // Defaults
         numseeds  = 0;
         seedstart = 1;
         vcd_en    = 1;
+        fullrange = 0;
+        quiet     = 0;
+        numvecs   = 0;
+        vecprefix = "";
         void'($value$plusargs("numseeds=%d", numseeds));
         void'($value$plusargs("seedstart=%d", seedstart));
         void'($value$plusargs("vcd=%d", vcd_en));
+        void'($value$plusargs("fullrange=%d", fullrange));
+        void'($value$plusargs("quiet=%d", quiet));
+        void'($value$plusargs("vecprefix=%s", vecprefix));
+        void'($value$plusargs("numvecs=%d", numvecs));
 
         if (vcd_en != 0) begin
             $dumpfile("sim/dot_product_accel.vcd");
@@ -96,11 +207,23 @@ module tb_dot_product_accel;
         end
         rst   = 1;
         start = 0;
-        a0=0;a1=0;a2=0;a3=0;a4=0;a5=0;a6=0;a7=0;
-        b0=0;b1=0;b2=0;b3=0;b4=0;b5=0;b6=0;b7=0;
+        accumulate = 0;
+        mode       = 2'd0;
+        acc_base   = 0;
+        a_bus = '0;
+        b_bus = '0;
         repeat(5) @(posedge clk);
         rst = 0;
 
+        if (vecprefix != "") begin
+            if (numvecs <= 0 || numvecs > VEC_DEPTH) begin
+                $display("[ERRO] +numvecs=%0d fora de 1..VEC_DEPTH (%0d)", numvecs, VEC_DEPTH);
+                $fatal(1);
+            end
+            run_file_vectors(vecprefix, numvecs);
+            $finish;
+        end
+
         if (numseeds > 0) begin
             for (integer k = 0; k < numseeds; k = k + 1) begin
                 run_case(seedstart + k);
@@ -110,6 +233,9 @@ module tb_dot_product_accel;
             run_case(1);
             run_case(42);
             run_case(2025);
+            run_chain(7);
+            run_packed(11, 2'd1);
+            run_packed(12, 2'd2);
         end
 
         $display("Todos os testes passaram.");
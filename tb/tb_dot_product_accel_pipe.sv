@@ -0,0 +1,137 @@
+// tb_dot_product_accel_pipe.sv
+// Testbench da variante pipeline: envia pares de vetores em sequência, sem esperar
+// resultados, e confere a saída (em ordem) contra a referência calculada no simulador.
+`timescale 1ns/1ps
+
+module tb_dot_product_accel_pipe #(
+    parameter int N     = 8,   // sobrescreva com iverilog -Ptb_dot_product_accel_pipe.N=...
+    parameter int LANES = 1
+);
+    localparam int MAXOPS = 4096;
+
+    logic clk;
+    logic rst;
+    logic in_valid;
+    logic in_ready;
+    logic [N*32-1:0] a_bus;
+    logic [N*32-1:0] b_bus;
+    logic out_valid;
+    logic out_ready;
+    logic signed [63:0] out_result;
+
+    // DUT
+    dot_product_accel_pipe #(.N(N), .LANES(LANES)) dut(
+        .clk(clk), .rst(rst),
+        .in_valid(in_valid), .in_ready(in_ready), .a(a_bus), .b(b_bus), .mode(2'd0),
+        .out_valid(out_valid), .out_ready(out_ready), .out_result(out_result)
+    );
+
+    // Clock 10ns -> 100MHz
+    initial clk = 0;
+    always #5 clk = ~clk;
+
+    // Resultados esperados, na ordem de envio
+    longint signed expected [0:MAXOPS-1];
+
+    // Gera o conjunto de operandos `k` (determinístico a partir da seed) e sua referência
+    task gen_operands(input integer seed, input integer k);
+        integer i;
+        integer s1, s2;
+        logic signed [31:0] ai, bi;
+        longint signed sw_sum;
+        begin
+            s1 = seed + 2*k;
+            s2 = seed + 2*k + 1;
+            sw_sum = 0;
+            for (i=0;i<N;i=i+1) begin
+                ai = $signed($random(s1));
+                bi = $signed($random(s2));
+                a_bus[32*i +: 32] <= ai;   // NBA: sem corrida com a amostragem do DUT
+                b_bus[32*i +: 32] <= bi;
+                sw_sum += longint'(ai) * longint'(bi);
+            end
+            expected[k] = sw_sum;
+        end
+    endtask
+
+    // Controle por plusargs:
+    // +numops=N   -> operações enviadas (padrão 64, máximo MAXOPS)
+    // +seed=S     -> seed base (padrão 1)
+    // +stall=1    -> out_ready aleatório (testa a contrapressão)
+    // +vcd=0      -> desabilita geração de VCD (padrão 1/habilitado)
+    integer numops;
+    integer seed;
+    integer stall;
+    integer vcd_en;
+    integer sent;
+    integer received;
+    integer cycles;
+    integer first_out;
+    integer rs;
+
+    // Envio: mantém in_valid alto enquanto houver operações
+    always @(posedge clk) begin
+        if (!rst && in_valid && in_ready) begin
+            sent <= sent + 1;
+            if (sent + 1 < numops) gen_operands(seed, sent + 1);
+            else                   in_valid <= 1'b0;
+        end
+    end
+
+    // Recepção e checagem
+    always @(posedge clk) begin
+        if (!rst) begin
+            cycles <= cycles + 1;
+            if (out_valid && out_ready) begin
+                if (out_result !== expected[received]) begin
+                    $display("[ERRO] op=%0d esperado=%0d (0x%016h) obtido=%0d (0x%016h)",
+                             received, expected[received], expected[received], out_result, out_result);
+                    $fatal(1);
+                end
+                if (received == 0) first_out <= cycles;
+                received <= received + 1;
+            end
+            if (stall != 0) out_ready <= ($random(rs) % 3) != 0;
+        end
+    end
+
+    initial begin
+        // Defaults
+        numops = 64;
+        seed   = 1;
+        stall  = 0;
+        vcd_en = 1;
+        void'($value$plusargs("numops=%d", numops));
+        void'($value$plusargs("seed=%d", seed));
+        void'($value$plusargs("stall=%d", stall));
+        void'($value$plusargs("vcd=%d", vcd_en));
+        if (numops > MAXOPS) numops = MAXOPS;
+
+        if (vcd_en != 0) begin
+            $dumpfile("sim/dot_product_accel_pipe.vcd");
+            $dumpvars(0, tb_dot_product_accel_pipe);
+        end
+        rs        = seed;
+        sent      = 0;
+        received  = 0;
+        cycles    = 0;
+        first_out = 0;
+        rst       = 1;
+        in_valid  = 0;
+        out_ready = 1;
+        a_bus     = '0;
+        b_bus     = '0;
+        repeat(5) @(posedge clk);
+        gen_operands(seed, 0);
+        in_valid <= 1;
+        rst      <= 0;
+
+        while (received < numops) @(posedge clk);
+
+        $display("[OK] %0d operações, latência=%0d ciclos, %0.2f ciclos/op (N=%0d LANES=%0d)",
+                 numops, first_out, (cycles - first_out) * 1.0 / ((numops > 1) ? numops - 1 : 1), N, LANES);
+        $display("Todos os testes passaram.");
+        $finish;
+    end
+
+endmodule
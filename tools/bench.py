@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Benchmarks do fluxo Python (elaboração, geração de headers) e dos modelos do
+acelerador, com histórico em JSON e comparação contra uma linha de base.
+
+Grupos (--only, separados por vírgula):
+  elab      tempo de elaboração do DotProductAccel (construção + get_fragment)
+  headers   tempo de parede de `soc_dot_product.py --headers-only` (sem cache e em cache)
+  accelsim  DotProductAccelSim: ops/s ciclo a ciclo e no modo rápido; vazão do lote NumPy;
+            ops/ciclo do despachante com 1 e 4 unidades (MultiAccelSim)
+  rtl       simulação RTL: núcleo Migen pelo barramento CSR (migen.sim) e, com iverilog
+            no PATH, seeds/s do testbench SV
+
+Cada métrica é o melhor de --repeat execuções (menor tempo / maior vazão). O JSON traz
+os metadados da máquina (CPU, Python, versões, commit); --history acrescenta cada
+execução num arquivo JSON Lines.
+
+Exemplos:
+  python tools/bench.py run --out sim/bench.json --history sim/bench_history.jsonl
+  cp sim/bench.json sim/bench_baseline.json                # fixa a linha de base
+  python tools/bench.py compare sim/bench_baseline.json sim/bench.json --threshold 0.15
+  python tools/bench.py compare base.json novo.json --metric-threshold headers_only_s=0.3
+
+`compare` termina com código 1 se alguma métrica piorar mais que o limiar.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IP   = os.path.join(ROOT, "ip")
+sys.path.insert(0, IP)
+
+GROUPS = ("elab", "headers", "accelsim", "rtl")
+
+# Configurações elaboradas no grupo elab: (nome, kwargs do DotProductAccel)
+ELAB_CONFIGS = [
+    ("n8_l1",        dict(n=8, lanes=1)),
+    ("n16_l4_pipe",  dict(n=16, lanes=4, pipelined=True)),
+    ("n8_l2_queue",  dict(n=8, lanes=2, queue_depth=8)),
+    ("migen_n8_l2",  dict(n=8, lanes=2, impl="migen")),
+]
+
+
+def metric(value, unit, better):
+    return {"value": value, "unit": unit, "better": better}
+
+
+def best_time(fn, repeat):
+    """Menor tempo de parede (s) de `repeat` chamadas de fn()"""
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best
+
+
+# -------------------------------------------------------------------------------------
+# Grupos
+# -------------------------------------------------------------------------------------
+
+def bench_elab(repeat, quick=False):
+    from litex.build.generic_platform import IOStandard, Pins
+    from litex.build.lattice import LatticePlatform
+    from dot_product_wrapper import DotProductAccel
+
+    io = [("clk25", 0, Pins("P3"), IOStandard("LVCMOS33"))]
+    out = {}
+    for name, kwargs in ELAB_CONFIGS[:2] if quick else ELAB_CONFIGS:
+        def elaborate():
+            platform = LatticePlatform("LFE5U-25F-6BG381C", io, toolchain="trellis")
+            DotProductAccel(platform, 50e6, **kwargs).get_fragment()
+        out[f"elab_{name}_s"] = metric(best_time(elaborate, repeat), "s", "lower")
+    return out
+
+
+def bench_headers(repeat, quick=False):
+    script = os.path.join(IP, "soc_dot_product.py")
+    with tempfile.TemporaryDirectory() as d:
+        def run(*extra):
+            # build/dotp relativo ao diretório de trabalho: o diretório temporário
+            proc = subprocess.run([sys.executable, script, "--headers-only", *extra],
+                                  cwd=d, capture_output=True, text=True)
+            if proc.returncode != 0:
+                raise RuntimeError(f"--headers-only falhou:\n{proc.stdout[-2000:]}{proc.stderr[-2000:]}")
+        cold = best_time(lambda: run("--no-headers-cache"), repeat)
+        cached = best_time(run, repeat)
+    return {"headers_only_s": metric(cold, "s", "lower"),
+            "headers_only_cached_s": metric(cached, "s", "lower")}
+
+
+def bench_accelsim(repeat, quick=False):
+    import random
+    import firmware_sim as fw
+
+    rng = random.Random(0)
+    n, lanes = 8, 1
+    pairs = [([rng.randint(-2**31, 2**31 - 1) for _ in range(n)],
+              [rng.randint(-2**31, 2**31 - 1) for _ in range(n)]) for _ in range(64)]
+    out = {}
+    for fast, ops in ((False, 300 if quick else 3000), (True, 1000 if quick else 20000)):
+        def run_ops():
+            fw.init_csrs(n)
+            accel = fw.DotProductAccelSim(n, lanes, fast=fast)
+            for k in range(ops):
+                a, b = pairs[k % len(pairs)]
+                fw.hw_dotp(accel, a, b)
+        dt = best_time(run_ops, repeat)
+        out[f"accelsim_{'fast' if fast else 'cycle'}_ops_per_s"] = metric(ops / dt, "ops/s", "higher")
+
+    # Vazão simulada (determinística) do despachante: regressões no modelo multiunidade
+    rows = fw.dispatch_scaling(4, num=64 if quick else 256, n=n, lanes=lanes)
+    for row in (rows[0], rows[-1]):
+        out[f"accelsim_dispatch_x{row['units']}_ops_per_cycle"] = metric(row["ops_per_cycle"], "ops/ciclo", "higher")
+
+    if fw.np is not None:
+        m = 20000 if quick else 500000
+        np_rng = fw.np.random.default_rng(0)
+        a = np_rng.integers(-2**31, 2**31, size=(m, n), dtype=fw.np.int32)
+        b = np_rng.integers(-2**31, 2**31, size=(m, n), dtype=fw.np.int32)
+        dt = best_time(lambda: fw.batch_dotp(a, b, lanes), repeat)
+        out["accelsim_batch_vectors_per_s"] = metric(m / dt, "vetores/s", "higher")
+    return out
+
+
+def bench_rtl(repeat, quick=False):
+    from test_migen_accel import run_csr_ops
+
+    out = {}
+    ops = 8 if quick else 64
+    for name, kwargs in (("seq_n8_l2", dict(n=8, lanes=2)), ("pipe_n8_l8", dict(n=8, lanes=8, pipelined=True))):
+        def simulate():
+            results, expected, _, _ = run_csr_ops(ops, seed=1, **kwargs)
+            if results != expected:
+                raise AssertionError(f"núcleo Migen {name}: resultados diferem")
+        out[f"rtl_migen_{name}_ops_per_s"] = metric(ops / best_time(simulate, repeat), "ops/s", "higher")
+
+    if shutil.which("iverilog") and shutil.which("vvp"):
+        from regress_tb import compile_tb, run_shard
+        seeds = 200 if quick else 2000
+        with tempfile.TemporaryDirectory() as d:
+            vvp_file = compile_tb(8, 1, d)
+            def run_seeds():
+                shard = run_shard(vvp_file, 0, seeds)
+                if shard["failures"]:
+                    raise AssertionError("testbench SV falhou")
+            out["rtl_iverilog_seeds_per_s"] = metric(seeds / best_time(run_seeds, repeat), "seeds/s", "higher")
+    return out
+
+
+BENCHES = {"elab": bench_elab, "headers": bench_headers, "accelsim": bench_accelsim, "rtl": bench_rtl}
+
+
+# -------------------------------------------------------------------------------------
+# Metadados, execução e comparação
+# -------------------------------------------------------------------------------------
+
+def _cpu_model():
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+def _git(*args):
+    try:
+        proc = subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return proc.stdout.strip() if proc.returncode == 0 else None
+
+
+def machine_metadata():
+    from importlib import metadata
+    versions = {}
+    for pkg in ("litex", "migen", "numpy", "pyserial"):
+        try:
+            versions[pkg] = metadata.version(pkg)
+        except metadata.PackageNotFoundError:
+            versions[pkg] = None
+    status = _git("status", "--porcelain", "--untracked-files=no")
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "host": platform.node(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu": _cpu_model(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "versions": versions,
+        "git_commit": _git("rev-parse", "HEAD"),
+        "git_dirty": bool(status) if status is not None else None,
+        "iverilog": shutil.which("iverilog") is not None,
+    }
+
+
+def run_suite(groups=GROUPS, repeat=3, quick=False, log=print):
+    """Executa os grupos pedidos; retorna {"meta": ..., "metrics": {nome: métrica}}"""
+    result = {"meta": machine_metadata(), "metrics": {}}
+    result["meta"].update(repeat=repeat, quick=quick, groups=list(groups))
+    for group in groups:
+        t0 = time.perf_counter()
+        metrics = BENCHES[group](repeat, quick)
+        result["metrics"].update(metrics)
+        log(f"[{group}] {time.perf_counter() - t0:.1f} s")
+        for name, m in metrics.items():
+            log(f"  {name:<34} {m['value']:>14.4g} {m['unit']}")
+    return result
+
+
+def compare(baseline, current, threshold=0.10, overrides=None):
+    """Compara as métricas em comum. Retorna (linhas, regressões); cada linha é
+    (nome, base, atual, variação relativa no sentido "pior", limiar, regrediu)."""
+    overrides = overrides or {}
+    rows, regressions = [], []
+    for name, base in sorted(baseline["metrics"].items()):
+        cur = current["metrics"].get(name)
+        if cur is None or not base["value"]:
+            continue
+        delta = (cur["value"] - base["value"]) / base["value"]
+        worse = delta if base["better"] == "lower" else -delta
+        limit = overrides.get(name, threshold)
+        row = (name, base["value"], cur["value"], worse, limit, worse > limit)
+        rows.append(row)
+        if row[-1]:
+            regressions.append(row)
+    return rows, regressions
+
+
+def _load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def cmd_run(args):
+    groups = [g for g in args.only.split(",") if g] if args.only else list(GROUPS)
+    unknown = [g for g in groups if g not in BENCHES]
+    if unknown:
+        sys.exit(f"Grupo(s) desconhecido(s): {', '.join(unknown)} (opções: {', '.join(GROUPS)})")
+    result = run_suite(groups, args.repeat, args.quick)
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"Resultados em {args.out}")
+    if args.history:
+        with open(args.history, "a") as f:
+            f.write(json.dumps(result) + "\n")
+        print(f"Execução acrescentada a {args.history}")
+
+
+def cmd_compare(args):
+    baseline, current = _load(args.baseline), _load(args.current)
+    overrides = {}
+    for item in args.metric_threshold:
+        name, _, value = item.partition("=")
+        overrides[name] = float(value)
+    for key in ("cpu", "python", "host"):
+        if baseline["meta"].get(key) != current["meta"].get(key):
+            print(f"Aviso: {key} difere da linha de base ({baseline['meta'].get(key)} -> {current['meta'].get(key)})")
+
+    rows, regressions = compare(baseline, current, args.threshold, overrides)
+    print(f"{'métrica':<34} {'base':>12} {'atual':>12} {'piora':>8} {'limiar':>7}")
+    for name, base, cur, worse, limit, bad in rows:
+        print(f"{name:<34} {base:>12.4g} {cur:>12.4g} {worse:>+8.1%} {limit:>7.0%}{'  REGRESSÃO' if bad else ''}")
+    missing = sorted(set(baseline["metrics"]) - set(current["metrics"]))
+    if missing:
+        print(f"Ausentes na execução atual: {', '.join(missing)}")
+    if regressions:
+        print(f"[ERRO] {len(regressions)} métrica(s) regrediram além do limiar")
+        sys.exit(1)
+    print("[OK] Nenhuma regressão além do limiar")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks do acelerador com histórico e comparação")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Executa os benchmarks e grava o JSON")
+    run.add_argument("--only", default="", help=f"Grupos separados por vírgula ({','.join(GROUPS)}); padrão: todos")
+    run.add_argument("--repeat", type=int, default=3, help="Execuções por métrica (vale a melhor)")
+    run.add_argument("--quick", action="store_true", help="Tamanhos reduzidos (fumaça/CI)")
+    run.add_argument("--out", default=os.path.join("sim", "bench.json"), help="JSON de saída")
+    run.add_argument("--history", default=None, help="Acrescenta a execução a este arquivo JSON Lines")
+    run.set_defaults(func=cmd_run)
+
+    cmp_ = sub.add_parser("compare", help="Compara com a linha de base; código 1 se houver regressão")
+    cmp_.add_argument("baseline", help="JSON da linha de base")
+    cmp_.add_argument("current", nargs="?", default=os.path.join("sim", "bench.json"), help="JSON atual")
+    cmp_.add_argument("--threshold", type=float, default=0.10, help="Piora relativa tolerada (0.10 = 10%%)")
+    cmp_.add_argument("--metric-threshold", action="append", default=[], metavar="NOME=LIMIAR",
+                      help="Limiar próprio de uma métrica (repetível)")
+    cmp_.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,25 @@
 """
 Captura a saída da UART e salva em um arquivo de log.
 
-Exemplo:
+Uma thread dedicada lê a porta (bloqueando na serial, sem laço de sleep) e entrega os
+blocos num buffer em anel limitado; a thread principal escreve em lote (uma escrita
+por rodada), normaliza as quebras de linha, ecoa no console e faz fsync periódico.
+Se a escrita não acompanhar a leitura, o anel descarta os blocos mais antigos e conta
+os bytes perdidos (overrun) na linha de estatísticas.
+
+Exemplos:
   python tools/capture_uart.py --port /dev/ttyUSB0 --baud 115200 --out docs/uart_log.txt
+  python tools/capture_uart.py --port /dev/ttyUSB0 --baud 3000000 --timestamps \\
+      --max-bytes 10000000 --backups 5 --stats-interval 2 --no-echo
 
 Pressione Ctrl+C para encerrar manualmente.
 """
 import argparse
+import collections
+import os
+import re
 import sys
+import threading
 import time
 
 try:
@@ -17,6 +29,221 @@ except ImportError:
     print("Erro: módulo pyserial não encontrado. Instale com: pip install pyserial")
     sys.exit(1)
 
+_NEWLINE = re.compile(rb"\r\n?")
+
+
+class RingBuffer:
+    """Blocos (instante, bytes) entre a thread leitora e a escritora, limitado a
+    `capacity` bytes. Cheio, descarta os blocos mais antigos e soma-os em `dropped`."""
+    def __init__(self, capacity=1 << 20):
+        self.capacity = capacity
+        self.chunks   = collections.deque()
+        self.size     = 0
+        self.dropped  = 0
+        self.cond     = threading.Condition()
+
+    def put(self, stamp, data):
+        with self.cond:
+            self.chunks.append((stamp, data))
+            self.size += len(data)
+            while self.size > self.capacity and len(self.chunks) > 1:
+                _, old = self.chunks.popleft()
+                self.size    -= len(old)
+                self.dropped += len(old)
+            self.cond.notify()
+
+    def drain(self, timeout=None):
+        """Todos os blocos pendentes; espera até `timeout` se não houver nenhum"""
+        with self.cond:
+            if not self.chunks and timeout:
+                self.cond.wait(timeout)
+            chunks = list(self.chunks)
+            self.chunks.clear()
+            self.size = 0
+            return chunks
+
+    def wake(self):
+        with self.cond:
+            self.cond.notify_all()
+
+
+class LineFormatter:
+    """Normaliza \\r\\n e \\r para \\n (também com o par partido entre blocos) e,
+    opcionalmente, prefixa cada linha com o instante de chegada do bloco."""
+    def __init__(self, timestamps=False):
+        self.timestamps = timestamps
+        self.pending_cr = False
+        self.line_start = True
+
+    @staticmethod
+    def stamp(t):
+        return time.strftime("[%H:%M:%S", time.localtime(t)).encode() + b".%03d] " % (int(t * 1000) % 1000)
+
+    def feed(self, data, t=None):
+        if self.pending_cr:
+            data = b"\r" + data
+        # Um \r no fim pode ser metade de um \r\n: decide no próximo bloco
+        self.pending_cr = data.endswith(b"\r")
+        if self.pending_cr:
+            data = data[:-1]
+        data = _NEWLINE.sub(b"\n", data)
+        if not self.timestamps or not data:
+            return data
+        stamp = self.stamp(time.time() if t is None else t)
+        lines = data.split(b"\n")
+        out = []
+        for i, line in enumerate(lines):
+            last = i == len(lines) - 1
+            if self.line_start and (line or not last):
+                out.append(stamp)
+            out.append(line)
+            if not last:
+                out.append(b"\n")
+                self.line_start = True
+            elif line:
+                self.line_start = False
+        return b"".join(out)
+
+    def finish(self):
+        """Resto pendente ao encerrar (um \\r final vira \\n)"""
+        if not self.pending_cr:
+            return b""
+        self.pending_cr = False
+        return self.feed(b"\r\n")
+
+
+class RotatingWriter:
+    """Arquivo de log com rotação por tamanho (out -> out.1 -> ... -> out.<backups>)
+    e fsync no máximo a cada `fsync_interval` segundos."""
+    def __init__(self, path, append=False, max_bytes=0, backups=3, fsync_interval=1.0):
+        self.path           = path
+        self.max_bytes      = max_bytes
+        self.backups        = backups
+        self.fsync_interval = fsync_interval
+        self.rotations      = 0
+        self.f    = open(path, "ab" if append else "wb")
+        self.size = self.f.tell()
+        self.last_sync = time.monotonic()
+
+    def rotate(self):
+        self.f.close()
+        if self.backups > 0:
+            for k in range(self.backups - 1, 0, -1):
+                if os.path.exists(f"{self.path}.{k}"):
+                    os.replace(f"{self.path}.{k}", f"{self.path}.{k + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        self.f    = open(self.path, "wb")
+        self.size = 0
+        self.rotations += 1
+
+    def write(self, data):
+        if self.max_bytes and self.size and self.size + len(data) > self.max_bytes:
+            self.rotate()
+        self.f.write(data)
+        self.f.flush()
+        self.size += len(data)
+
+    def maybe_sync(self, now):
+        if now - self.last_sync >= self.fsync_interval:
+            os.fsync(self.f.fileno())
+            self.last_sync = now
+
+    def close(self):
+        self.f.flush()
+        os.fsync(self.f.fileno())
+        self.f.close()
+
+
+def format_bytes(v):
+    if v < 1000:
+        return f"{v:.0f} B"
+    for unit in ("kB", "MB", "GB"):
+        v /= 1000
+        if v < 1000 or unit == "GB":
+            return f"{v:.1f} {unit}"
+
+
+class Capture:
+    """Captura da porta `ser` (pyserial ou objeto com read/in_waiting) para `writer`"""
+    def __init__(self, ser, writer, buffer_bytes=1 << 20, timestamps=False, echo=None,
+                 flush_interval=0.05, stats_interval=0.0, stats_out=sys.stderr):
+        self.ser            = ser
+        self.writer         = writer
+        self.ring           = RingBuffer(buffer_bytes)
+        self.formatter      = LineFormatter(timestamps)
+        self.echo           = echo
+        self.flush_interval = flush_interval
+        self.stats_interval = stats_interval
+        self.stats_out      = stats_out
+        self.bytes_in       = 0
+        self.error          = None
+        self.elapsed        = 0.0
+        self.stop_event     = threading.Event()
+
+    def _read_loop(self):
+        while not self.stop_event.is_set():
+            try:
+                # Bloqueia até 1 byte (ou o timeout da porta) e então leva tudo o que chegou
+                data = self.ser.read(self.ser.in_waiting or 1)
+            except Exception as e:
+                self.error = e
+                break
+            if data:
+                self.bytes_in += len(data)
+                self.ring.put(time.time(), data)
+        self.stop_event.set()
+        self.ring.wake()
+
+    def _write_batch(self, chunks):
+        out = b"".join(self.formatter.feed(data, t) for t, data in chunks)
+        if not out:
+            return
+        self.writer.write(out)
+        if self.echo is not None:
+            try:
+                self.echo.write(out)
+                self.echo.flush()
+            except Exception:
+                pass
+
+    def stats_line(self, elapsed, since_bytes=None, since_elapsed=None):
+        rate_bytes = self.bytes_in if since_bytes is None else self.bytes_in - since_bytes
+        rate_time  = elapsed if since_elapsed is None else elapsed - since_elapsed
+        rate = rate_bytes / rate_time if rate_time > 0 else 0.0
+        return (f"[stats] {format_bytes(rate)}/s, {format_bytes(self.bytes_in)} em {elapsed:.1f} s, "
+                f"overrun: {format_bytes(self.ring.dropped)} perdidos, rotações: {self.writer.rotations}")
+
+    def run(self, duration=None):
+        """Captura até Ctrl+C, erro da porta, stop() ou `duration` segundos"""
+        reader = threading.Thread(target=self._read_loop, daemon=True)
+        t0 = time.monotonic()
+        last_stats = (t0, 0)
+        reader.start()
+        try:
+            while not self.stop_event.is_set():
+                self._write_batch(self.ring.drain(self.flush_interval))
+                now = time.monotonic()
+                self.writer.maybe_sync(now)
+                if self.stats_interval and now - last_stats[0] >= self.stats_interval:
+                    print(self.stats_line(now - t0, last_stats[1], last_stats[0] - t0), file=self.stats_out)
+                    last_stats = (now, self.bytes_in)
+                if duration is not None and now - t0 >= duration:
+                    break
+        finally:
+            self.stop_event.set()
+            reader.join(timeout=2.0)
+            self._write_batch(self.ring.drain())
+            tail = self.formatter.finish()
+            if tail:
+                self.writer.write(tail)
+            self.writer.close()
+            self.elapsed = time.monotonic() - t0
+        return self.elapsed
+
+    def stop(self):
+        self.stop_event.set()
+        self.ring.wake()
+
 
 def main():
     parser = argparse.ArgumentParser(description="Captura UART -> arquivo de log")
@@ -25,10 +252,15 @@ def main():
     parser.add_argument("--out", default="docs/uart_log.txt", help="Arquivo de saída")
     parser.add_argument("--timeout", type=float, default=0.2, help="Timeout de leitura em segundos")
     parser.add_argument("--append", action="store_true", help="Acrescenta ao arquivo em vez de sobrescrever")
+    parser.add_argument("--timestamps", action="store_true", help="Prefixa cada linha com [HH:MM:SS.mmm] da chegada")
+    parser.add_argument("--max-bytes", type=int, default=0, help="Rotaciona o log ao passar deste tamanho (0 = sem rotação)")
+    parser.add_argument("--backups", type=int, default=3, help="Arquivos antigos mantidos na rotação (out.1 ... out.N)")
+    parser.add_argument("--fsync-interval", type=float, default=1.0, help="Segundos entre fsyncs do log")
+    parser.add_argument("--buffer-bytes", type=int, default=1 << 20, help="Tamanho do anel entre leitura e escrita")
+    parser.add_argument("--stats-interval", type=float, default=0.0, help="Segundos entre linhas de estatística (0 = só no fim)")
+    parser.add_argument("--no-echo", action="store_true", help="Não ecoa no console")
     args = parser.parse_args()
 
-    mode = "ab" if args.append else "wb"
-
     print(f"Abrindo porta {args.port} @ {args.baud} baud...")
     try:
         ser = serial.Serial(args.port, args.baud, timeout=args.timeout)
@@ -37,28 +269,19 @@ def main():
         sys.exit(1)
 
     print(f"Gravando em {args.out}. Pressione Ctrl+C para parar.")
-    with open(args.out, mode) as f:
-        try:
-            while True:
-                data = ser.read(1024)
-                if data:
-                    # Normaliza quebras de linha para \n no arquivo
-                    data = data.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
-                    f.write(data)
-                    f.flush()
-                    # Também ecoa no console
-                    try:
-                        sys.stdout.buffer.write(data)
-                        sys.stdout.flush()
-                    except Exception:
-                        pass
-                else:
-                    # Pequeno descanso para não ocupar 100% CPU
-                    time.sleep(0.01)
-        except KeyboardInterrupt:
-            print("\nCaptura encerrada pelo usuário.")
-        finally:
-            ser.close()
+    writer = RotatingWriter(args.out, append=args.append, max_bytes=args.max_bytes, backups=args.backups,
+                            fsync_interval=args.fsync_interval)
+    capture = Capture(ser, writer, buffer_bytes=args.buffer_bytes, timestamps=args.timestamps,
+                      echo=None if args.no_echo else sys.stdout.buffer, stats_interval=args.stats_interval)
+    try:
+        capture.run()
+    except KeyboardInterrupt:
+        print("\nCaptura encerrada pelo usuário.")
+    finally:
+        ser.close()
+    if capture.error is not None:
+        print(f"\nErro na porta: {capture.error}")
+    print(capture.stats_line(capture.elapsed), file=sys.stderr)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Relatório do benchmark de ciclos do firmware (make -C ip BENCH_ITERS=K).
+
+O firmware imprime, para cada conjunto de vetores, linhas "@bench" com as somas de
+ciclos (timer0 uptime, já descontado o custo da leitura do timer) de K iterações:
+
+  @bench begin n=0x... lanes=0x... iters=0x... clk=0x... overhead=0x...
+  @bench ds=demo sw=0x... sw_min=0x... write=0x... compute=0x... read=0x... hw_min=0x... errors=0x...
+  @bench end
+
+Este script lê uma captura da UART (tools/capture_uart.py, com ou sem --timestamps)
+ou o log de uma simulação (build/sim/uart_log.txt de ip/sim_soc.py) e calcula, por
+conjunto, ciclos por operação do software e do caminho completo do hardware, o
+speedup e a divisão do tempo do hardware entre escrita dos CSRs, cálculo (start até
+done) e leitura do resultado.
+
+Exemplos:
+  python tools/fw_bench_report.py build/sim/uart_log.txt
+  python tools/fw_bench_report.py docs/uart_log.txt --json sim/fw_bench.json
+
+Com várias unidades (--dotp-accels K), o despachante do firmware imprime uma linha
+por número de unidades usadas, e o relatório mostra a vazão agregada (operações/s)
+e o ganho sobre uma unidade:
+
+  @dispatch units=0x... jobs=0x... cycles=0x... clk=0x... errors=0x...
+
+Termina com código 1 se não houver bloco "@bench" completo nem linhas "@dispatch"
+ou se algum resultado do hardware diferir do software.
+"""
+import argparse
+import json
+import re
+import sys
+
+BENCH_RE = re.compile(r"@bench\s+(.*)$")
+DISPATCH_RE = re.compile(r"@dispatch\s+(.*)$")
+FIELD_RE = re.compile(r"(\w+)=(\S+)")
+
+# Fases do caminho do hardware, na ordem em que ocorrem
+HW_PHASES = ("write", "compute", "read")
+
+
+def _value(text):
+    try:
+        return int(text, 0)
+    except ValueError:
+        return text
+
+
+def parse_bench(lines):
+    """Extrai o último bloco "@bench" completo das linhas (str ou bytes).
+    Retorna {"config": {...}, "datasets": [{"ds": nome, ...}]} ou None."""
+    block, done = None, None
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode(errors="replace")
+        m = BENCH_RE.search(line.rstrip("\r\n"))
+        if not m:
+            continue
+        body = m.group(1).strip()
+        fields = {key: _value(val) for key, val in FIELD_RE.findall(body)}
+        if body.startswith("begin"):
+            block = {"config": fields, "datasets": []}
+        elif body.startswith("end"):
+            if block is not None:
+                done, block = block, None
+        elif block is not None and "ds" in fields:
+            block["datasets"].append(fields)
+    return done
+
+
+def summarize(bench):
+    """Métricas por operação de cada conjunto e o total de todos eles"""
+    config = bench["config"]
+    iters  = config.get("iters") or 1
+    clk    = config.get("clk") or 0
+    rows   = []
+    for ds in bench["datasets"] + [_total(bench["datasets"])]:
+        hw = sum(ds[phase] for phase in HW_PHASES)
+        row = {
+            "dataset": ds["ds"],
+            "sw_cycles": ds["sw"] / iters,
+            "hw_cycles": hw / iters,
+            "speedup": ds["sw"] / hw if hw else None,
+            "errors": ds["errors"],
+        }
+        for phase in HW_PHASES:
+            row[f"{phase}_cycles"] = ds[phase] / iters
+            row[f"{phase}_share"]  = ds[phase] / hw if hw else 0.0
+        if "sw_min" in ds:
+            row["sw_min_cycles"] = ds["sw_min"]
+            row["hw_min_cycles"] = ds["hw_min"]
+        if clk:
+            row["sw_us"] = 1e6 * row["sw_cycles"] / clk
+            row["hw_us"] = 1e6 * row["hw_cycles"] / clk
+        rows.append(row)
+    return rows
+
+
+def _total(datasets):
+    total = {"ds": "total"}
+    for key in ("sw", "errors") + HW_PHASES:
+        total[key] = sum(ds[key] for ds in datasets)
+    # Média por operação sobre todos os conjuntos: o total conta len(datasets) vezes iters
+    n = max(len(datasets), 1)
+    for key in ("sw",) + HW_PHASES:
+        total[key] /= n
+    return total
+
+
+def parse_dispatch(lines):
+    """Linhas "@dispatch" da última execução (a que começa no último units=1).
+    Retorna [{"units": k, "jobs": ..., "cycles": ..., ...}] ou []."""
+    runs = []
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode(errors="replace")
+        m = DISPATCH_RE.search(line.rstrip("\r\n"))
+        if not m:
+            continue
+        fields = {key: _value(val) for key, val in FIELD_RE.findall(m.group(1))}
+        if fields.get("units") == 1:
+            runs = []
+        runs.append(fields)
+    return runs
+
+
+def summarize_dispatch(runs):
+    """Ciclos por operação, vazão agregada e ganho sobre uma unidade para cada K"""
+    rows = []
+    base = None
+    for run in runs:
+        cycles, jobs, clk = run["cycles"], run["jobs"], run.get("clk") or 0
+        ops_per_cycle = jobs / cycles if cycles else 0.0
+        base = base or ops_per_cycle
+        row = {
+            "units": run["units"],
+            "cycles_per_op": cycles / jobs if jobs else None,
+            "ops_per_cycle": ops_per_cycle,
+            "scaling": ops_per_cycle / base if base else None,
+            "errors": run["errors"],
+        }
+        row["efficiency"] = row["scaling"] / run["units"] if row["scaling"] is not None else None
+        if clk:
+            row["ops_s"] = ops_per_cycle * clk
+        rows.append(row)
+    return rows
+
+
+def print_dispatch(rows, out=sys.stdout):
+    clk = "ops_s" in rows[0]
+    print(f"{'unidades':>8} {'ciclos/op':>10} {'ganho':>7} {'eficiência':>10}"
+          + (f" {'ops/s':>12}" if clk else ""), file=out)
+    for row in rows:
+        line = (f"{row['units']:>8} {row['cycles_per_op']:>10.1f} {row['scaling']:>6.2f}x "
+                f"{row['efficiency']:>10.0%}")
+        if clk:
+            line += f" {row['ops_s']:>12,.0f}"
+        if row["errors"]:
+            line += f"  [ERRO] {row['errors']} resultado(s) diferente(s)"
+        print(line, file=out)
+
+
+def print_report(bench, rows, out=sys.stdout):
+    config = bench["config"]
+    clk = config.get("clk") or 0
+    print(f"Benchmark do firmware: N={config.get('n')} LANES={config.get('lanes')}, "
+          f"{config.get('iters')} iterações por conjunto"
+          + (f", clock {clk / 1e6:g} MHz" if clk else "")
+          + f", custo do timer descontado: {config.get('overhead')} ciclos", file=out)
+    print(f"{'conjunto':<10} {'SW/op':>9} {'HW/op':>9} {'speedup':>8} "
+          f"{'escrita':>14} {'cálculo':>14} {'leitura':>14}"
+          + (f" {'SW µs':>8} {'HW µs':>8}" if clk else ""), file=out)
+    for row in rows:
+        speedup = f"{row['speedup']:.2f}x" if row["speedup"] is not None else "-"
+        phases = " ".join(f"{row[f'{p}_cycles']:>7.1f} ({row[f'{p}_share']:>3.0%})" for p in HW_PHASES)
+        line = f"{row['dataset']:<10} {row['sw_cycles']:>9.1f} {row['hw_cycles']:>9.1f} {speedup:>8} {phases}"
+        if clk:
+            line += f" {row['sw_us']:>8.2f} {row['hw_us']:>8.2f}"
+        if row["errors"]:
+            line += f"  [ERRO] {row['errors']} resultado(s) diferente(s)"
+        print(line, file=out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Relatório de speedup a partir das linhas @bench do firmware")
+    parser.add_argument("log", help="Captura da UART ou log da simulação")
+    parser.add_argument("--json", default=None, help="Grava configuração e métricas neste JSON")
+    args = parser.parse_args()
+
+    with open(args.log, "rb") as f:
+        lines = f.readlines()
+    bench    = parse_bench(lines)
+    dispatch = parse_dispatch(lines)
+    if (bench is None or not bench["datasets"]) and not dispatch:
+        sys.exit(f"Nenhum bloco @bench completo nem linhas @dispatch em {args.log} "
+                 "(compile o firmware com BENCH_ITERS=K ou use --dotp-accels K)")
+    report, errors = {}, 0
+    if bench is not None and bench["datasets"]:
+        rows = summarize(bench)
+        print_report(bench, rows)
+        report.update(config=bench["config"], datasets=rows)
+        errors += rows[-1]["errors"]
+    if dispatch:
+        rows = summarize_dispatch(dispatch)
+        print(f"Despacho em {rows[-1]['units']} unidades, {dispatch[-1]['jobs']} jobs por medida:")
+        print_dispatch(rows)
+        report["dispatch"] = rows
+        errors += sum(row["errors"] for row in rows)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Métricas em {args.json}")
+    if errors:
+        print("[ERRO] Resultados do hardware diferem do software")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
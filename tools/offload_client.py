@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Cliente do modo offload: envia lotes de pares de vetores pela UART com várias
+requisições em voo, confere os resultados com o produto escalar em software e
+relata a vazão (vetores/s) e os percentis de latência por lote.
+
+O dispositivo pode ser a placa (firmware_dotp.c, após a demo) ou o substituto em pty:
+  python ip/offload_sim.py --n 8 --lanes 2
+  python tools/offload_client.py --port /dev/pts/3 --vectors 4096 --batch-size 16 --inflight 4
+
+Exemplo com a placa:
+  python tools/offload_client.py --port /dev/ttyUSB0 --baud 115200 --vectors 1024
+"""
+import argparse
+import os
+import random
+import sys
+
+try:
+    import serial
+except ImportError:
+    print("Erro: módulo pyserial não encontrado. Instale com: pip install pyserial")
+    sys.exit(1)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "ip"))
+from firmware_sim import sw_dotp  # noqa: E402
+from offload_proto import OffloadClient, OffloadError  # noqa: E402
+
+
+def wrap64(v):
+    v &= 0xFFFFFFFFFFFFFFFF
+    return v - (1 << 64) if v >> 63 else v
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offload de produtos escalares pela UART")
+    parser.add_argument("--port", required=True, help="Porta serial (ex.: /dev/ttyUSB0 ou o pty do offload_sim.py)")
+    parser.add_argument("--baud", type=int, default=115200, help="Baudrate (default: 115200)")
+    parser.add_argument("--vectors", type=int, default=1024, help="Pares de vetores a calcular")
+    parser.add_argument("--batch-size", type=int, default=16, help="Pares por quadro (limitado ao batch_max do dispositivo)")
+    parser.add_argument("--inflight", type=int, default=2, help="Lotes enviados sem resposta")
+    parser.add_argument("--timeout", type=float, default=5.0, help="Timeout por resposta em segundos")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    try:
+        ser = serial.Serial(args.port, args.baud, timeout=0.05)
+    except Exception as e:
+        print(f"Falha ao abrir {args.port}: {e}")
+        sys.exit(1)
+
+    client = OffloadClient(ser, timeout=args.timeout)
+    try:
+        n, lanes, batch_max = client.info()
+        batch_size = min(args.batch_size, batch_max)
+        print(f"Dispositivo: n={n}, lanes={lanes}, batch_max={batch_max}; "
+              f"lotes de {batch_size}, {args.inflight} em voo")
+        rng = random.Random(args.seed)
+        pairs = [([rng.randint(-2**31, 2**31 - 1) for _ in range(n)],
+                  [rng.randint(-2**31, 2**31 - 1) for _ in range(n)]) for _ in range(args.vectors)]
+        results, stats = client.run(pairs, batch_size=batch_size, inflight=args.inflight)
+    except OffloadError as e:
+        print(f"Erro: {e}")
+        sys.exit(1)
+    finally:
+        ser.close()
+
+    # Referência com o mesmo wraparound de 64 bits do acumulador
+    errors = sum(r != wrap64(sw_dotp(a, b)) for r, (a, b) in zip(results, pairs))
+    print(f"{stats['vectors']} vetores em {stats['batches']} lotes, {stats['elapsed_s']:.3f} s: "
+          f"{stats['vectors_per_s']:.0f} vetores/s")
+    print(f"Latência por lote: p50={stats['latency_p50_s']*1e3:.2f} ms  "
+          f"p95={stats['latency_p95_s']*1e3:.2f} ms  p99={stats['latency_p99_s']*1e3:.2f} ms")
+    if errors:
+        print(f"[ERRO] {errors} resultado(s) diferem do software")
+        sys.exit(1)
+    print("[OK] Todos os resultados coincidem com o software")
+
+
+if __name__ == "__main__":
+    main()
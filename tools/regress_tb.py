@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Regressão paralela do testbench tb/tb_dot_product_accel.sv.
+
+Compila o testbench uma vez (iverilog) e divide a faixa de seeds em shards,
+executados em paralelo por instâncias de `vvp` (+numseeds/+seedstart, sem VCD e
+em modo silencioso). Ao final grava um relatório JSON com o resultado agregado e
+a vazão (seeds/s) de cada shard.
+
+Exemplos:
+  python tools/regress_tb.py --seeds 100000
+  python tools/regress_tb.py --seeds 1000000 --full-range --n 16 --lanes 4 --jobs 32
+  python tools/regress_tb.py --seeds 100000 --keep-going --report sim/nightly.json
+
+Com --keep-going, um shard que falha é retomado a partir da seed seguinte à que
+falhou (o testbench para no primeiro $fatal), e todas as seeds com erro são listadas.
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RTL  = os.path.join(ROOT, "rtl", "dot_product_accel.sv")
+TB   = os.path.join(ROOT, "tb", "tb_dot_product_accel.sv")
+
+PASS_MARKER = "Todos os testes passaram."
+ERROR_RE    = re.compile(r"\[ERRO\] seed=(-?\d+)")
+
+
+def compile_tb(n, lanes, out_dir, iverilog="iverilog"):
+    """Compila o testbench para N/LANES e retorna o caminho do .vvp"""
+    os.makedirs(out_dir, exist_ok=True)
+    vvp_file = os.path.join(out_dir, f"regress_n{n}_l{lanes}.vvp")
+    cmd = [iverilog, "-g2012",
+           f"-Ptb_dot_product_accel.N={n}", f"-Ptb_dot_product_accel.LANES={lanes}",
+           "-o", vvp_file, RTL, TB]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"Falha ao compilar o testbench:\n{proc.stdout}{proc.stderr}")
+    return vvp_file
+
+
+def make_shards(seed_start, seeds, shard_size):
+    """Lista de (primeira seed, número de seeds) cobrindo a faixa toda"""
+    return [(s, min(shard_size, seed_start + seeds - s))
+            for s in range(seed_start, seed_start + seeds, shard_size)]
+
+
+def run_shard(vvp_file, start, count, full_range=False, keep_going=False, vvp="vvp"):
+    """Executa as seeds [start, start+count) e retorna o resumo do shard"""
+    failures = []
+    seeds_run = 0
+    returncode = 0
+    next_seed, remaining = start, count
+    t0 = time.time()
+    while remaining > 0:
+        cmd = [vvp, "-n", vvp_file, f"+numseeds={remaining}", f"+seedstart={next_seed}",
+               "+vcd=0", "+quiet=1", f"+fullrange={int(full_range)}"]
+        # O testbench grava o VCD em sim/ relativo ao diretório de trabalho
+        proc = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
+        returncode = proc.returncode
+        if returncode == 0 and PASS_MARKER in proc.stdout:
+            seeds_run += remaining
+            break
+        m = ERROR_RE.search(proc.stdout)
+        if m is None:
+            # Falha sem seed identificável (ex.: vvp abortou): não há como retomar
+            failures.append({"seed": None, "output": (proc.stdout + proc.stderr)[-2000:]})
+            break
+        seed = int(m.group(1))
+        failures.append({"seed": seed, "output": m.string[m.start():].splitlines()[0]})
+        seeds_run += seed - next_seed + 1
+        remaining -= seed - next_seed + 1
+        next_seed = seed + 1
+        if not keep_going:
+            break
+    wall = time.time() - t0
+    return {
+        "seed_start": start,
+        "numseeds": count,
+        "seeds_run": seeds_run,
+        "failures": failures,
+        "returncode": returncode,
+        "wall_s": round(wall, 3),
+        "seeds_per_s": round(seeds_run / wall, 1) if wall > 0 else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regressão paralela (shards de seeds) do tb_dot_product_accel")
+    parser.add_argument("--seeds", type=int, default=10000, help="Número total de seeds")
+    parser.add_argument("--seed-start", type=int, default=1, help="Primeira seed")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Instâncias de vvp em paralelo")
+    parser.add_argument("--shard-size", type=int, default=0,
+                        help="Seeds por shard (padrão: ~4 shards por job, no máximo 50000)")
+    parser.add_argument("--n", type=int, default=8, help="Elementos por vetor (parâmetro N)")
+    parser.add_argument("--lanes", type=int, default=1, help="Multiplicadores em paralelo (parâmetro LANES)")
+    parser.add_argument("--full-range", action="store_true", help="Operandos com 32 bits com sinal (+fullrange=1)")
+    parser.add_argument("--keep-going", action="store_true", help="Continua após falhas e lista todas as seeds com erro")
+    parser.add_argument("--build-dir", default=os.path.join(ROOT, "sim"), help="Diretório do .vvp compilado")
+    parser.add_argument("--report", default=os.path.join(ROOT, "sim", "regress_report.json"), help="Relatório JSON")
+    parser.add_argument("--iverilog", default="iverilog", help="Executável do iverilog")
+    parser.add_argument("--vvp", default="vvp", help="Executável do vvp")
+    args = parser.parse_args()
+
+    if args.seeds <= 0 or args.jobs <= 0:
+        parser.error("--seeds e --jobs devem ser positivos")
+    shard_size = args.shard_size or max(1, min(50000, -(-args.seeds // (args.jobs * 4))))
+    shards = make_shards(args.seed_start, args.seeds, shard_size)
+
+    print(f"Compilando testbench (N={args.n}, LANES={args.lanes})...")
+    try:
+        vvp_file = compile_tb(args.n, args.lanes, args.build_dir, args.iverilog)
+    except (OSError, RuntimeError) as e:
+        print(f"Erro: {e}")
+        sys.exit(1)
+
+    print(f"{args.seeds} seeds em {len(shards)} shards de até {shard_size}, {args.jobs} jobs"
+          f"{' (faixa completa)' if args.full_range else ''}...")
+    t0 = time.time()
+    results = []
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        futures = [pool.submit(run_shard, vvp_file, start, count, args.full_range, args.keep_going, args.vvp)
+                   for start, count in shards]
+        for done, future in enumerate(as_completed(futures), 1):
+            shard = future.result()
+            results.append(shard)
+            status = "OK" if not shard["failures"] else f"ERRO ({len(shard['failures'])})"
+            print(f"  [{done}/{len(shards)}] seeds {shard['seed_start']}..{shard['seed_start'] + shard['numseeds'] - 1}: "
+                  f"{status}, {shard['seeds_per_s']} seeds/s")
+    wall = time.time() - t0
+
+    results.sort(key=lambda shard: shard["seed_start"])
+    failed_seeds = sorted(f["seed"] for shard in results for f in shard["failures"] if f["seed"] is not None)
+    failed_shards = sum(1 for shard in results if shard["failures"])
+    seeds_run = sum(shard["seeds_run"] for shard in results)
+    report = {
+        "config": {
+            "n": args.n,
+            "lanes": args.lanes,
+            "full_range": args.full_range,
+            "seed_start": args.seed_start,
+            "seeds": args.seeds,
+            "jobs": args.jobs,
+            "shard_size": shard_size,
+            "keep_going": args.keep_going,
+        },
+        "passed": failed_shards == 0,
+        "seeds_run": seeds_run,
+        "failed_seeds": failed_seeds,
+        "failed_shards": failed_shards,
+        "wall_s": round(wall, 3),
+        "seeds_per_s": round(seeds_run / wall, 1) if wall > 0 else None,
+        "shards": results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.report)), exist_ok=True)
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"{seeds_run}/{args.seeds} seeds em {wall:.1f} s ({report['seeds_per_s']} seeds/s); relatório em {args.report}")
+    if failed_shards:
+        print(f"[ERRO] {failed_shards} shard(s) com falha; seeds: {failed_seeds[:20]}{' ...' if len(failed_seeds) > 20 else ''}")
+        sys.exit(1)
+    print("[OK] Todos os shards passaram.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Estímulo em arquivo para o testbench tb/tb_dot_product_accel.sv.
+
+Gera (ou carrega) pares de vetores, grava operandos e resultados esperados (NumPy,
+mesmo wraparound de 64 bits do RTL) em arquivos hex, roda o testbench no modo
++vecprefix (operandos via $readmemh, aplicados em sequência) e compara em bloco os
+resultados gravados pelo simulador com o golden.
+
+Fontes de vetores (combináveis):
+  --random M      M pares aleatórios com os 32 bits com sinal
+  --corners       corpus de casos de borda (zeros, ±1, extremos, sinais alternados)
+  --input F.npz   vetores capturados (arrays `a` e `b` com shape (M, N))
+
+Exemplos:
+  python tools/tb_vectors.py --random 100000 --corners
+  python tools/tb_vectors.py --input captura.npz --n 16 --lanes 4 --jobs 8
+  python tools/tb_vectors.py --corners --generate-only --out-dir sim/vectors
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RTL  = os.path.join(ROOT, "rtl", "dot_product_accel.sv")
+TB   = os.path.join(ROOT, "tb", "tb_dot_product_accel.sv")
+
+# Modelo em lote do acelerador (NumPy) compartilhado com o simulador de firmware
+sys.path.insert(0, os.path.join(ROOT, "ip"))
+from firmware_sim import batch_dotp, np  # noqa: E402
+
+INT32_MIN = -2**31
+INT32_MAX = 2**31 - 1
+
+
+def corner_vectors(n):
+    """Corpus de borda: combinações de padrões extremos para A e B"""
+    idx = np.arange(n)
+    patterns = [
+        np.zeros(n, dtype=np.int64),
+        np.ones(n, dtype=np.int64),
+        -np.ones(n, dtype=np.int64),
+        np.full(n, INT32_MIN),
+        np.full(n, INT32_MAX),
+        np.where(idx % 2, INT32_MIN, INT32_MAX),
+        np.where(idx % 2, -1, 1),
+        np.where(idx % 2, INT32_MIN, 1),
+        np.where(idx == 0, INT32_MIN, 0),
+        np.where(idx == n - 1, INT32_MAX, 0),
+    ]
+    a = np.array([pa for pa in patterns for _ in patterns])
+    b = np.array([pb for _ in patterns for pb in patterns])
+    return a.astype(np.int32), b.astype(np.int32)
+
+
+def load_vectors(args):
+    """Junta as fontes pedidas em dois arrays int32 (M, N)"""
+    parts = []
+    if args.input:
+        data = np.load(args.input)
+        a, b = np.asarray(data["a"]), np.asarray(data["b"])
+        if a.ndim != 2 or a.shape != b.shape or a.shape[1] != args.n:
+            raise ValueError(f"{args.input}: esperado a, b com shape (M, {args.n}); recebido {a.shape} e {b.shape}")
+        parts.append((a.astype(np.int32), b.astype(np.int32)))
+    if args.corners:
+        parts.append(corner_vectors(args.n))
+    if args.random:
+        rng = np.random.default_rng(args.seed)
+        parts.append((rng.integers(INT32_MIN, INT32_MAX + 1, size=(args.random, args.n), dtype=np.int32),
+                      rng.integers(INT32_MIN, INT32_MAX + 1, size=(args.random, args.n), dtype=np.int32)))
+    if not parts:
+        raise ValueError("nenhuma fonte de vetores (use --random, --corners e/ou --input)")
+    return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+
+
+def to_hex_lines(words, digits):
+    """Linhas hex de `digits` dígitos a partir de um array de palavras big-endian (M, ...)"""
+    text = words.tobytes().hex()
+    return "\n".join(text[i:i + digits] for i in range(0, len(text), digits)) + "\n"
+
+
+def write_vectors(prefix, a, b, expected):
+    """Grava <prefix>_a.hex, _b.hex (elemento N-1 nos dígitos mais significativos) e _expected.hex"""
+    n = a.shape[1]
+    for name, v in (("a", a), ("b", b)):
+        with open(f"{prefix}_{name}.hex", "w") as f:
+            f.write(to_hex_lines(np.ascontiguousarray(v[:, ::-1]).astype(">u4"), n * 8))
+    with open(f"{prefix}_expected.hex", "w") as f:
+        f.write(to_hex_lines(expected.astype(">i8"), 16))
+
+
+def read_results(path):
+    """Lê o dump do testbench (uma palavra de 64 bits hex por linha) como int64"""
+    with open(path) as f:
+        text = "".join(line.strip() for line in f)
+    try:
+        return np.frombuffer(bytes.fromhex(text), dtype=">i8").astype(np.int64)
+    except ValueError:
+        raise ValueError(f"{path}: resultado com X/Z ou formato inválido")
+
+
+def compile_tb(n, lanes, depth, out_dir, iverilog="iverilog"):
+    os.makedirs(out_dir, exist_ok=True)
+    vvp_file = os.path.join(out_dir, f"vectors_n{n}_l{lanes}_d{depth}.vvp")
+    cmd = [iverilog, "-g2012",
+           f"-Ptb_dot_product_accel.N={n}", f"-Ptb_dot_product_accel.LANES={lanes}",
+           f"-Ptb_dot_product_accel.VEC_DEPTH={depth}",
+           "-o", vvp_file, RTL, TB]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"Falha ao compilar o testbench:\n{proc.stdout}{proc.stderr}")
+    return vvp_file
+
+
+def run_chunk(vvp_file, prefix, count, vvp="vvp"):
+    """Roda o testbench sobre um bloco de vetores e retorna os resultados (int64)"""
+    cmd = [vvp, "-n", vvp_file, f"+vecprefix={prefix}", f"+numvecs={count}", "+vcd=0"]
+    proc = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0 or "Vetores processados" not in proc.stdout:
+        raise RuntimeError(f"vvp falhou em {prefix}:\n{(proc.stdout + proc.stderr)[-2000:]}")
+    return read_results(f"{prefix}_result.hex")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estímulo em arquivo + golden NumPy para o tb_dot_product_accel")
+    parser.add_argument("--random", type=int, default=0, help="Pares aleatórios (32 bits com sinal)")
+    parser.add_argument("--corners", action="store_true", help="Inclui o corpus de casos de borda")
+    parser.add_argument("--input", help="Arquivo .npz com arrays `a` e `b` (M, N)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed dos vetores aleatórios")
+    parser.add_argument("--n", type=int, default=8, help="Elementos por vetor (parâmetro N)")
+    parser.add_argument("--lanes", type=int, default=1, help="Multiplicadores em paralelo (parâmetro LANES)")
+    parser.add_argument("--chunk", type=int, default=1 << 16, help="Vetores por execução do vvp (VEC_DEPTH)")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Execuções de vvp em paralelo")
+    parser.add_argument("--out-dir", default=os.path.join(ROOT, "sim", "vectors"), help="Diretório dos arquivos hex")
+    parser.add_argument("--generate-only", action="store_true", help="Só grava os arquivos (sem simular)")
+    parser.add_argument("--iverilog", default="iverilog", help="Executável do iverilog")
+    parser.add_argument("--vvp", default="vvp", help="Executável do vvp")
+    args = parser.parse_args()
+
+    if np is None:
+        print("Erro: módulo numpy não encontrado. Instale com: pip install numpy")
+        sys.exit(1)
+    try:
+        a, b = load_vectors(args)
+        expected, _ = batch_dotp(a, b, args.lanes)
+    except (OSError, KeyError, ValueError) as e:
+        print(f"Erro: {e}")
+        sys.exit(1)
+    m = len(a)
+
+    # Um conjunto de arquivos por bloco de até --chunk vetores
+    os.makedirs(args.out_dir, exist_ok=True)
+    chunks = []
+    for k, lo in enumerate(range(0, m, args.chunk)):
+        hi = min(lo + args.chunk, m)
+        prefix = os.path.join(os.path.abspath(args.out_dir), f"vec{k:04d}")
+        write_vectors(prefix, a[lo:hi], b[lo:hi], expected[lo:hi])
+        chunks.append((prefix, lo, hi))
+    print(f"{m} vetores (N={args.n}) em {len(chunks)} bloco(s) gravados em {args.out_dir}")
+    if args.generate_only:
+        return
+
+    try:
+        vvp_file = compile_tb(args.n, args.lanes, min(args.chunk, m), args.out_dir, args.iverilog)
+        t0 = time.time()
+        with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+            results = list(pool.map(lambda c: run_chunk(vvp_file, c[0], c[2] - c[1], args.vvp), chunks))
+        wall = time.time() - t0
+    except (OSError, RuntimeError, ValueError) as e:
+        print(f"Erro: {e}")
+        sys.exit(1)
+
+    # Comparação em bloco com o golden
+    got = np.concatenate(results)
+    if got.shape != expected.shape:
+        print(f"[ERRO] {got.size} resultados para {m} vetores")
+        sys.exit(1)
+    bad = np.flatnonzero(got != expected)
+    print(f"{m} vetores simulados em {wall:.1f} s ({m / wall:.0f} vetores/s)")
+    if bad.size:
+        for i in bad[:10]:
+            print(f"[ERRO] vetor {i}: esperado=0x{int(expected[i]) & (2**64 - 1):016X} "
+                  f"obtido=0x{int(got[i]) & (2**64 - 1):016X}")
+        print(f"[ERRO] {bad.size} de {m} vetores diferentes")
+        sys.exit(1)
+    print("[OK] Todos os resultados coincidem com o golden.")
+
+
+if __name__ == "__main__":
+    main()